@@ -0,0 +1,4 @@
+"""Performance benchmarks of the client against an in-process stub server.
+
+Run them with ``python -m benchmarks``, see ``python -m benchmarks --help``.
+"""
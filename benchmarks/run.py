@@ -0,0 +1,354 @@
+"""Runs the benchmarks and reports the results as JSON."""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from devo_ml.modelmanager import Client, engines
+from devo_ml.modelmanager.auth import HttpDevoStandAloneTokenAuth
+from devo_ml.modelmanager.downloader import FileSystemDownloader
+
+from .stub_server import StubServer
+
+
+MB = 1024 * 1024
+
+SUITES = ("import", "get_models", "download", "upload", "concurrency")
+
+IMPORT_STATEMENTS = [
+    "import devo_ml.modelmanager",
+    "from devo_ml.modelmanager import Client",
+    "from devo_ml.modelmanager import get_model",
+    "from devo_ml.modelmanager import AsyncClient",
+]
+
+DEFAULT_CATALOG_SIZES = [10, 100, 1000, 10000, 100000]
+DEFAULT_IMAGE_SIZES = [1 * MB, 16 * MB, 128 * MB, 512 * MB]
+FULL_IMAGE_SIZES = DEFAULT_IMAGE_SIZES + [2048 * MB]
+QUICK_CATALOG_SIZES = [10, 1000]
+QUICK_IMAGE_SIZES = [1 * MB, 16 * MB]
+DEFAULT_WORKERS = [1, 2, 4, 8, 16]
+
+
+def create_client(url: str, path: str = ".", **kwargs) -> Client:
+    return Client(
+        url,
+        HttpDevoStandAloneTokenAuth("benchmark"),
+        downloader=FileSystemDownloader(path),
+        **kwargs
+    )
+
+
+def summarize(timings: List[float]) -> dict:
+    timings = sorted(timings)
+    return {
+        "min": timings[0],
+        "median": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "max": timings[-1],
+    }
+
+
+def measure(call: Callable[[], object], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def get_peak_rss() -> Optional[int]:
+    """Gets the peak resident set size in bytes of the current process."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_python(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return time.perf_counter() - start
+
+
+def _time_import(statement: str) -> Tuple[float, float]:
+    # The import is timed by the interpreter running it, so the time to
+    # start the interpreter, and its noise, is left out
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; print(time.perf_counter() - start)"
+    )
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        stdout=subprocess.PIPE
+    )
+    return float(process.stdout), time.perf_counter() - start
+
+
+def bench_import(repeat: int):
+    # Every import runs in a new interpreter
+    baseline = statistics.median(_run_python("pass") for _ in range(repeat))
+    results = []
+    for statement in IMPORT_STATEMENTS:
+        timings = [_time_import(statement) for _ in range(repeat)]
+        results.append({
+            "statement": statement,
+            "seconds": summarize([t[0] for t in timings]),
+            "process_seconds": summarize([t[1] for t in timings]),
+        })
+    return {"interpreter_seconds": baseline, "imports": results}
+
+
+def bench_get_models(server: StubServer, sizes: List[int], repeat: int):
+    results = []
+    with create_client(server.url) as client:
+        for size in sizes:
+            server.set_catalog(size)
+            client.get_models()
+            timings = measure(client.get_models, repeat)
+            iter_timings = measure(
+                lambda: sum(1 for _ in client.iter_models()),
+                repeat
+            )
+            results.append({
+                "models": size,
+                "bytes": len(server.catalog_body),
+                "seconds": summarize(timings),
+                "iter_seconds": summarize(iter_timings),
+            })
+    server.set_catalog(0)
+    return results
+
+
+def _download_child(url: str, name: str, stream: bool, queue) -> None:
+    with tempfile.TemporaryDirectory() as path:
+        with create_client(url, path) as client:
+            start = time.perf_counter()
+            client.get_model(name, download_file=True, stream=stream)
+            seconds = time.perf_counter() - start
+    queue.put({"seconds": seconds, "peak_rss": get_peak_rss()})
+
+
+def bench_download(server: StubServer, sizes: List[int], repeat: int):
+    # Every download runs in a new process so its peak memory is its own
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for size in sizes:
+        name = f"image_{size}"
+        server.add_image(name, size)
+        for stream in (False, True):
+            runs = []
+            for _ in range(repeat):
+                queue = context.Queue()
+                process = context.Process(
+                    target=_download_child,
+                    args=(server.url, name, stream, queue)
+                )
+                process.start()
+                runs.append(queue.get())
+                process.join()
+            timings = [run["seconds"] for run in runs]
+            peaks = [run["peak_rss"] for run in runs if run["peak_rss"]]
+            results.append({
+                "image_bytes": size,
+                "stream": stream,
+                "seconds": summarize(timings),
+                "mb_per_second": size / MB / statistics.median(timings),
+                "peak_rss": max(peaks) if peaks else None,
+            })
+    return results
+
+
+def bench_upload(server: StubServer, sizes: List[int], repeat: int):
+    results = []
+    with tempfile.TemporaryDirectory() as path:
+        with create_client(server.url) as client:
+            for size in sizes:
+                file = os.path.join(path, f"image_{size}.onnx")
+                with open(file, "wb") as f:
+                    for _ in range(size // MB):
+                        f.write(os.urandom(MB))
+                    f.write(os.urandom(size % MB))
+                timings = measure(
+                    lambda: client.add_model(
+                        f"upload_{size}",
+                        engines.ONNX,
+                        file
+                    ),
+                    repeat
+                )
+                os.remove(file)
+                results.append({
+                    "image_bytes": size,
+                    "seconds": summarize(timings),
+                    "mb_per_second": size / MB / statistics.median(timings),
+                })
+    return results
+
+
+def bench_concurrency(server: StubServer, workers: List[int], calls: int):
+    server.set_catalog(calls)
+    names = [f"model_{i}" for i in range(calls)]
+    results = []
+    for max_workers in workers:
+        with create_client(server.url, pool_maxsize=max_workers) as client:
+            start = time.perf_counter()
+            models = client.get_many(names, max_workers=max_workers)
+            seconds = time.perf_counter() - start
+        errors = sum(isinstance(m, Exception) for m in models.values())
+        results.append({
+            "workers": max_workers,
+            "calls": calls,
+            "errors": errors,
+            "seconds": seconds,
+            "calls_per_second": calls / seconds,
+        })
+    server.set_catalog(0)
+    return results
+
+
+def parse_sizes(value: str) -> List[int]:
+    sizes = []
+    for size in value.split(","):
+        size = size.strip().upper()
+        if size.endswith("G"):
+            sizes.append(int(float(size[:-1]) * 1024 * MB))
+        elif size.endswith("M"):
+            sizes.append(int(float(size[:-1]) * MB))
+        else:
+            sizes.append(int(size))
+    return sizes
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=__doc__
+    )
+    parser.add_argument(
+        "--suite",
+        action="append",
+        choices=SUITES,
+        help="Suite to run, may be repeated. All suites if not provided"
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Run small sizes only, e.g. in continuous integration"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Include images of 2 GB"
+    )
+    parser.add_argument(
+        "--catalog-sizes",
+        type=parse_sizes,
+        help="Comma separated numbers of models listed by get_models"
+    )
+    parser.add_argument(
+        "--image-sizes",
+        type=parse_sizes,
+        help="Comma separated sizes of images, e.g. 1M,16M,2G"
+    )
+    parser.add_argument(
+        "--workers",
+        type=parse_sizes,
+        default=DEFAULT_WORKERS,
+        help="Comma separated numbers of concurrent workers"
+    )
+    parser.add_argument(
+        "--calls",
+        type=int,
+        default=1000,
+        help="Number of calls of the concurrency suite"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of times every measure is repeated"
+    )
+    parser.add_argument(
+        "--output",
+        help="File to write the results to. Standard output if not provided"
+    )
+    args = parser.parse_args(argv)
+    if args.catalog_sizes is None:
+        args.catalog_sizes = (
+            QUICK_CATALOG_SIZES if args.quick else DEFAULT_CATALOG_SIZES
+        )
+    if args.image_sizes is None:
+        args.image_sizes = (
+            QUICK_IMAGE_SIZES if args.quick
+            else FULL_IMAGE_SIZES if args.full
+            else DEFAULT_IMAGE_SIZES
+        )
+    if args.quick:
+        args.repeat = min(args.repeat, 3)
+        args.calls = min(args.calls, 200)
+    return args
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    suites = args.suite or list(SUITES)
+    report: Dict[str, object] = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+        "results": {},
+    }
+    results: Dict[str, object] = {}
+    if "import" in suites:
+        results["import"] = bench_import(max(args.repeat, 5))
+    with StubServer() as server:
+        if "get_models" in suites:
+            results["get_models"] = bench_get_models(
+                server,
+                args.catalog_sizes,
+                args.repeat
+            )
+        if "download" in suites:
+            results["download"] = bench_download(
+                server,
+                args.image_sizes,
+                args.repeat
+            )
+        if "upload" in suites:
+            results["upload"] = bench_upload(
+                server,
+                args.image_sizes,
+                args.repeat
+            )
+        if "concurrency" in suites:
+            results["concurrency"] = bench_concurrency(
+                server,
+                args.workers,
+                args.calls
+            )
+    report["results"] = results
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
@@ -0,0 +1,161 @@
+"""An in-process stub of the endpoints of the ML Model Manager server.
+
+Responses are generated, not stored: model images of any size are encoded
+while they are sent and uploaded files are read and discarded, so the memory
+of the stub doesn't grow with the sizes benchmarked.
+"""
+
+import base64
+import http.server
+import json
+import threading
+
+from typing import Dict, Optional, Set
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+# A multiple of 3 bytes so the encoding of consecutive blocks is valid base64
+_BLOCK = bytes(range(256)) * 768
+_ENCODED_BLOCK = base64.b64encode(_BLOCK)
+
+
+def _encoded_length(size: int) -> int:
+    return 4 * ((size + 2) // 3)
+
+
+def _iter_encoded_image(size: int):
+    blocks, rest = divmod(size, len(_BLOCK))
+    for _ in range(blocks):
+        yield _ENCODED_BLOCK
+    if rest:
+        yield base64.b64encode(_BLOCK[:rest])
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StubServer"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/models":
+            return self.send_body(self.server.catalog_body)
+        name = unquote(parts.path[len("/models/"):])
+        size = self.server.images.get(name)
+        if size is None and name not in self.server.catalog_names:
+            return self.send_body(b"", code=204)
+        fast = parse_qs(parts.query).get("fast", ["True"])[0] == "True"
+        if fast or size is None:
+            model = self.server.get_model(name, size or 0)
+            return self.send_body(json.dumps(model).encode())
+        self.send_image(name, size)
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        if self.path == "/models/images/upload":
+            while length > 0:
+                length -= len(self.rfile.read(min(length, 1024 * 1024)))
+            self.server.uploads += 1
+            return self.send_body(json.dumps({
+                "valid": True,
+                "imageId": self.server.uploads,
+                "size": int(self.headers["Content-Length"]),
+            }).encode())
+        self.rfile.read(length)
+        self.send_body(b"null")
+
+    def send_body(self, body: bytes, code: int = 200):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_image(self, name: str, size: int):
+        model = self.server.get_model(name, size)
+        prefix, suffix = json.dumps(model).encode().split(b'"@image@"')
+        prefix += b'"'
+        suffix = b'"' + suffix
+        length = len(prefix) + _encoded_length(size) + len(suffix)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+        self.wfile.write(prefix)
+        for chunk in _iter_encoded_image(size):
+            self.wfile.write(chunk)
+        self.wfile.write(suffix)
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """A stub server running in a thread of the current process."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.url = f"http://127.0.0.1:{self.server_port}"
+        self.images: Dict[str, int] = {}
+        self.uploads = 0
+        self.catalog_names: Set[str] = set()
+        self.catalog_body = b"[]"
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "StubServer":
+        thread = threading.Thread(
+            target=self.serve_forever,
+            args=(0.01,),
+            daemon=True
+        )
+        thread.start()
+        self._thread = thread
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
+        self.server_close()
+
+    @staticmethod
+    def get_model(name: str, size: int) -> dict:
+        return {
+            "id": abs(hash(name)) % 1000000,
+            "name": name,
+            "engine": "ONNX",
+            "description": f"Benchmark model {name}",
+            "outputType": "float",
+            "category": "Regression",
+            "fields": [
+                {"name": f"field{i}", "type": "float4"} for i in range(8)
+            ],
+            "image": {
+                "id": abs(hash(name)) % 1000000,
+                "size": size,
+                "image": "@image@",
+            },
+        }
+
+    def set_catalog(self, count: int) -> None:
+        """Sets the models listed by the server.
+
+        :param count: The number of models
+        """
+        names = [f"model_{i}" for i in range(count)]
+        models = []
+        for name in names:
+            model = self.get_model(name, 1024)
+            del model["image"]["image"]
+            models.append(model)
+        self.catalog_names = set(names)
+        self.catalog_body = json.dumps(models).encode()
+
+    def add_image(self, name: str, size: int) -> None:
+        """Adds a model with an image of a size.
+
+        :param name: The name of the model
+        :param size: The size in bytes of the image
+        """
+        self.images[name] = size
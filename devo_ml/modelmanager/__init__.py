@@ -1,18 +1,76 @@
-"""Easy-to-use ML Model Manager interface."""
+"""Easy-to-use ML Model Manager interface.
 
-from ._client import Client, LegacyClient
-from ._client_factory import create_client_from_token
-from ._client_factory import create_client_from_profile
-from ._func_facade import get_models, get_model, find_model, add_model
+The names of the interface are imported from their modules on first use, so
+importing the package doesn't pay for the modules and dependencies that are
+not used.
+"""
 
+import importlib
+
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from ._client import Client, LegacyClient
+    from ._async_client import AsyncClient, AsyncLegacyClient
+    from ._client_factory import create_client_from_token
+    from ._client_factory import create_client_from_profile
+    from ._client_factory import create_async_client_from_token
+    from ._client_factory import create_async_client_from_profile
+    from ._func_facade import get_models, get_model, find_model, add_model
+    from ._async_func_facade import get_models_async, get_model_async
+    from ._async_func_facade import find_model_async, add_model_async
+    from .registry import close_clients
+
+
+_modules = {
+    "Client": "._client",
+    "LegacyClient": "._client",
+    "AsyncClient": "._async_client",
+    "AsyncLegacyClient": "._async_client",
+    "create_client_from_token": "._client_factory",
+    "create_client_from_profile": "._client_factory",
+    "create_async_client_from_token": "._client_factory",
+    "create_async_client_from_profile": "._client_factory",
+    "get_models": "._func_facade",
+    "get_model": "._func_facade",
+    "find_model": "._func_facade",
+    "add_model": "._func_facade",
+    "get_models_async": "._async_func_facade",
+    "get_model_async": "._async_func_facade",
+    "find_model_async": "._async_func_facade",
+    "add_model_async": "._async_func_facade",
+    "close_clients": ".registry",
+}
 
 __all__ = [
     "Client",
     "LegacyClient",
+    "AsyncClient",
+    "AsyncLegacyClient",
     "create_client_from_token",
     "create_client_from_profile",
+    "create_async_client_from_token",
+    "create_async_client_from_profile",
     "get_models",
     "get_model",
     "find_model",
     "add_model",
+    "get_models_async",
+    "get_model_async",
+    "find_model_async",
+    "add_model_async",
+    "close_clients",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _modules.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import inspect
+import os
+
+from typing import Optional, List, Union
+
+from .auth import AuthCallable
+from .async_api import AsyncApi, AsyncResponse
+from .downloader import AsyncDownloaderCallable, DownloaderCallable
+from .downloader import get_default_async_downloader
+from ._client import build_model_body
+from ._endpoint import EndpointRenderer
+from ._endpoint import LatestEndpointRenderer, LegacyEndpointRenderer
+from ._multipart import MultipartEncoder
+from .error import ModelManagerError, ModelNotFound, ModelAlreadyExists
+
+
+class AsyncBaseClient:
+    """Base class for asynchronous ML Model Manager clients.
+
+    It exposes the interface of :class:`BaseClient
+    <devo_ml.modelmanager._client.BaseClient>` with awaitable methods.
+    """
+
+    def __init__(
+        self,
+        auth: AuthCallable,
+        endpoints_renderer: EndpointRenderer,
+        *,
+        downloader: Union[AsyncDownloaderCallable, DownloaderCallable] = None,
+        **kwargs
+    ) -> None:
+        """Creates an :class:`AsyncBaseClient`.
+
+        :param auth: The authentication to use
+        :param endpoints_renderer: How to render endpoints
+        :param downloader: The downloader to use, asynchronous or not
+        :param kwargs: Options to the underlying calls and the connection
+            pool, see :class:`AsyncApi
+            <devo_ml.modelmanager.async_api.AsyncApi>`
+        """
+        self.endpoints = endpoints_renderer
+        self.api = AsyncApi(auth=auth, **kwargs)
+        self.downloader = downloader or get_default_async_downloader()
+
+    async def __aenter__(self) -> AsyncBaseClient:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Closes the pooled connections of the client.
+
+        :return: Nothing
+        """
+        await self.api.close()
+
+    @property
+    def url(self) -> str:
+        """The URL of the ML Model Manager server.
+
+        :return: URL of the ML Model Manager server
+        """
+        return self.endpoints.url
+
+    async def get_models(self) -> List[dict]:
+        """Gets the list of the models in the system.
+
+        :return: The list of the models
+        """
+        return await self.api.get(self.endpoints.models())
+
+    async def get_model(
+        self,
+        name: str,
+        download_file: bool = None,
+        stream: bool = None
+    ) -> dict:
+        """Gets a model by its name.
+
+        :param name: The name of the model
+        :param download_file: Whether to download the model file
+        :param stream: Whether to stream the model file to the downloader
+            while it is received instead of loading it in memory. The `stream`
+            attribute of the downloader is used if not provided
+        :raises ModelNotFound: If the model doesn't exist
+        :return: The model data
+        """
+        if not name:
+            raise ModelManagerError(msg=f"Invalid name: '{name}'")
+        endpoint = self.endpoints.model(name)
+        lookup = getattr(self.downloader, "lookup", None)
+        if download_file and lookup is not None:
+            model = await self.api.get(endpoint, params={"fast": True})
+            if not model:
+                raise ModelNotFound(name)
+            file = lookup(model)
+            if file is not None:
+                model["file"] = file
+                model.pop("image", None)
+                return model
+        if stream is None:
+            stream = getattr(self.downloader, "stream", False)
+        download_stream = getattr(self.downloader, "download_stream", None)
+        if download_file and stream and download_stream:
+            response: AsyncResponse = await self.api.get(
+                endpoint,
+                params={"fast": False},
+                stream=True
+            )
+            async with response:
+                result = download_stream(response.iter_content())
+                if inspect.isawaitable(result):
+                    result = await result
+                model, file = result
+            if not model:
+                raise ModelNotFound(name)
+            model["file"] = file
+            model.pop("image", None)
+            return model
+        model = await self.api.get(
+            endpoint,
+            params={"fast": not download_file}
+        )
+        if not model:
+            raise ModelNotFound(name)
+        if download_file:
+            file = self.downloader(model)
+            if inspect.isawaitable(file):
+                file = await file
+            model["file"] = file
+        model.pop("image", None)
+        return model
+
+    async def find_model(
+        self,
+        name: str,
+        download_file: bool = None
+    ) -> Optional[dict]:
+        """Finds a model by its name.
+
+        :param name: The name of the model
+        :param download_file: Whether to download the model file
+        :return: The model data or nothing if the model doesn't exist
+        """
+        try:
+            return await self.get_model(name, download_file=download_file)
+        except ModelNotFound:
+            return None
+
+    async def add_model(
+        self,
+        name: str,
+        engine: str,
+        model_file: str,
+        description: str = None,
+        force: bool = None
+    ) -> None:
+        """Adds a model.
+
+        :param name: The name of the models
+        :param engine: The engine of the model
+        :param model_file: The path of the file of the model
+        :param description: The description of the model
+        :param force: Whether to override the model if already exist
+        :raises ModelAlreadyExists: If the model already exists and not force
+        """
+        model = await self.api.get(
+            self.endpoints.model(name),
+            params={"fast": True}
+        )
+        if model and not force:
+            raise ModelAlreadyExists(name)
+        model_file = os.path.expanduser(model_file)
+        with open(model_file, "rb") as f:
+            multipart = MultipartEncoder(
+                fields=[("engine", engine)],
+                files=[("fileName", f)]
+            )
+            image_metadata = await self.api.post(
+                self.endpoints.image_upload(),
+                data=multipart,
+                headers={"Content-Type": multipart.content_type}
+            )
+        body = build_model_body(
+            name,
+            engine,
+            description,
+            image_metadata,
+            model
+        )
+        await self.api.post(self.endpoints.models(), json=body)
+
+
+class AsyncClient(AsyncBaseClient):
+    """An asynchronous client for ML Model Manager server ``2.4.0`` and
+    above.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        auth: AuthCallable,
+        *,
+        downloader: Union[AsyncDownloaderCallable, DownloaderCallable] = None,
+        **kwargs
+    ) -> None:
+        """Creates an :class:`AsyncClient`.
+
+        :param url: The URL of the server. Must be valid
+        :param auth: The authentication to use
+        :param downloader: The downloader to use
+        :param kwargs: Options to the underlying calls
+        """
+        super().__init__(
+            auth,
+            LatestEndpointRenderer(url),
+            downloader=downloader,
+            **kwargs
+        )
+
+
+class AsyncLegacyClient(AsyncBaseClient):
+    """An asynchronous client for ML Model Manager server prior to
+    ``2.4.0``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        domain: str,
+        auth: AuthCallable,
+        *,
+        downloader: Union[AsyncDownloaderCallable, DownloaderCallable] = None,
+        **kwargs
+    ) -> None:
+        """Creates an :class:`AsyncLegacyClient`.
+
+        :param url: The URL of the server
+        :param domain: The domain to connect to
+        :param kwargs: Options to the underlying calls
+        """
+        super().__init__(
+            auth,
+            LegacyEndpointRenderer(url, domain),
+            downloader=downloader,
+            **kwargs
+        )
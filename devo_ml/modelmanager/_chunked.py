@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Collection, List
+
+
+#: Size in bytes of the parts of a chunked upload, unless the server asks for
+#: another.
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+
+#: Number of parts of a chunked upload sent at once.
+DEFAULT_UPLOAD_WORKERS = 4
+
+
+class UploadUnsupported(Exception):
+    """The server doesn't offer chunked uploads."""
+
+
+#: Sends a part of a file, by its index, to an upload session.
+PartSender = Callable[[int, bytes], None]
+
+
+def count_parts(size: int, part_size: int) -> int:
+    """Gets the number of parts of a file.
+
+    :param size: The size of the file
+    :param part_size: The size of the parts
+    :return: The number of parts, at least one
+    """
+    return max(1, -(-size // part_size))
+
+
+def upload_parts(
+    file: str,
+    size: int,
+    part_size: int,
+    send_part: PartSender,
+    received: Collection[int] = (),
+    max_workers: int = 1
+) -> None:
+    """Sends the parts of a file not yet received by the server.
+
+    Every part is read when it is sent, so at most `max_workers` parts are
+    held in memory. The first error stops sending the parts not started.
+
+    :param file: The path of the file
+    :param size: The size of the file
+    :param part_size: The size of the parts
+    :param send_part: Sends a part of the file
+    :param received: The indexes of the parts already received
+    :param max_workers: The number of parts sent at once
+    :return: Nothing
+    """
+    parts = [
+        index
+        for index in range(count_parts(size, part_size))
+        if index not in received
+    ]
+
+    def upload(index: int) -> None:
+        with open(file, "rb") as f:
+            f.seek(index * part_size)
+            send_part(index, f.read(part_size))
+
+    if max_workers <= 1 or len(parts) <= 1:
+        for index in parts:
+            upload(index)
+        return None
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(parts))) as pool:
+        futures = [pool.submit(upload, index) for index in parts]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def parse_received_parts(session: dict) -> List[int]:
+    """Gets the parts received by the server from the state of a session.
+
+    :param session: The state of the session
+    :return: The indexes of the parts received
+    """
+    parts = session.get("parts") or []
+    return [int(part) for part in parts if str(part).isdigit()]
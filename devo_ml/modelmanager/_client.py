@@ -1,15 +1,104 @@
 from __future__ import annotations
 
+import contextlib
+import copy
+import functools
 import os
+import threading
+import time
 
-from typing import Optional, List
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, List
+from pathlib import Path
+from typing import Sequence, Union
 
 from .auth import AuthCallable
-from .api import Api
-from .downloader import DownloaderCallable, get_default_downloader
+from .api import Api, decode_response, iter_response_content
+from .api import validate_or_raise_error
+from .cache import MetadataCache, UploadIndex, UploadSessionStore
+from .metrics import ClientMetrics, RequestHook
+from .cache import get_image_key
+from .downloader import DownloaderCallable, FileSystemDownloader
+from .downloader import LazyModelFile
+from .downloader import get_default_downloader
+from .engines import validate_model_file
 from ._endpoint import EndpointRenderer
 from ._endpoint import LatestEndpointRenderer, LegacyEndpointRenderer
+from ._chunked import DEFAULT_PART_SIZE, DEFAULT_UPLOAD_WORKERS
+from ._chunked import UploadUnsupported, count_parts, parse_received_parts
+from ._chunked import upload_parts
+from ._manifest import ManifestSource, read_manifest
+from ._multipart import MultipartEncoder
+from ._ranged import ImageEndpointUnavailable, ImageRequestRefused
+from ._ranged import RangePart, parse_content_range
+from ._stream import GzipEncoder, JsonArrayDecoder
+from ._sync import SYNC_FIELDS, is_synced, read_sync_manifest
+from ._sync import remove_synced_file, write_sync_manifest
 from .error import ModelManagerError, ModelNotFound, ModelAlreadyExists
+from .summary import SUMMARY_FIELDS, ModelSummary, compile_fields, project
+
+
+def build_model_body(
+    name: str,
+    engine: str,
+    description: Optional[str],
+    image_metadata: dict,
+    model: Optional[dict]
+) -> dict:
+    """Builds the body to register a model from the metadata of its uploaded
+    image.
+
+    :param name: The name of the model
+    :param engine: The engine of the model
+    :param description: The description of the model
+    :param image_metadata: The response of the image upload
+    :param model: The existing model to override, if any
+    :raises ModelManagerError: If the image is not valid
+    :return: The body of the model
+    """
+    if not image_metadata.get("valid"):
+        msg = str(image_metadata.get("errorDetail", ""))
+        raise ModelManagerError(msg=msg)
+    body = {
+        "name": name,
+        "engine": engine,
+        "description": description,
+        "image": {
+            "id": image_metadata.get("imageId"),
+            "size": image_metadata.get("size")
+        },
+        "outputType": image_metadata.get("outputType"),
+        "fields": image_metadata.get("fields"),
+        "clusters": image_metadata.get("clusters"),
+        "category": image_metadata.get("category"),
+        "runtimeSize": image_metadata.get("runtimeSize"),
+        "hidden": False
+    }
+    if model:
+        body["id"] = model.get("id")
+        if description is None:
+            body["description"] = model.get("description")
+    return body
+
+
+def _is_image_unknown(error: ModelManagerError) -> bool:
+    # Only plain errors about the image tell the reference is unknown or
+    # invalid, the token, a duplicated name or a failure of the server don't
+    return type(error) is ModelManagerError and "image" in error.msg.lower()
+
+
+def _metadata_key(endpoint: str, params: dict = None) -> tuple:
+    return endpoint, tuple(sorted((params or {}).items()))
+
+
+def _fields_params(
+    params: Optional[dict],
+    fields: Optional[Sequence[str]]
+) -> Optional[dict]:
+    # Servers supporting projections send only the fields asked for
+    if not fields:
+        return params
+    return {**(params or {}), "fields": ",".join(fields)}
 
 
 class BaseClient:
@@ -21,6 +110,17 @@ class BaseClient:
         endpoints_renderer: EndpointRenderer,
         *,
         downloader: DownloaderCallable = None,
+        metadata_cache: MetadataCache = None,
+        upload_index: UploadIndex = None,
+        compress_uploads: Union[bool, int] = False,
+        raw_images: bool = False,
+        image_segments: int = 1,
+        chunked_uploads: bool = False,
+        upload_part_size: int = DEFAULT_PART_SIZE,
+        upload_workers: int = None,
+        upload_sessions: UploadSessionStore = None,
+        validate_files: bool = False,
+        prefetch_ttl: float = 300,
         **kwargs
     ) -> None:
         """Creates a :class:`BaseClient`.
@@ -28,11 +128,91 @@ class BaseClient:
         :param auth: The authentication to use
         :param endpoints_renderer: How to render endpoints
         :param downloader: The downloader to use
-        :param kwargs: Options to the underlying requests
+        :param metadata_cache: The cache of the metadata of the models. The
+            metadata is not cached if not provided
+        :param upload_index: The index of the model files uploaded. Files
+            already uploaded for the same engine are not uploaded again by
+            :meth:`add_model`. Files are always uploaded if not provided
+        :param compress_uploads: Whether to compress the model files uploaded
+            with gzip, or the compression level from 1 to 9. The server must
+            accept bodies with ``Content-Encoding: gzip``
+        :param raw_images: Whether to download the model files from the raw
+            image endpoint, in ranges resumed after transfer errors, when the
+            downloader supports it. Servers without the endpoint are detected
+            and the model files are got from the model metadata instead
+        :param image_segments: The maximum number of segments of a raw image
+            downloaded in parallel, if the server supports ranges
+        :param chunked_uploads: Whether to upload the model files larger than
+            a part in parts sent in parallel, resumed after an interruption.
+            Servers without chunked uploads are detected and the model files
+            are sent in a single call instead
+        :param upload_part_size: The size in bytes of the parts of a chunked
+            upload, unless the server asks for another
+        :param upload_workers: The number of parts of a chunked upload sent at
+            once, :const:`DEFAULT_UPLOAD_WORKERS
+            <devo_ml.modelmanager._chunked.DEFAULT_UPLOAD_WORKERS>` if not
+            provided
+        :param upload_sessions: The store of the chunked uploads in progress.
+            They are only kept in memory if not provided
+        :param validate_files: Whether to check locally that the model files
+            look valid for their engine before uploading them, see
+            :func:`validate_model_file
+            <devo_ml.modelmanager.engines.validate_model_file>`
+        :param prefetch_ttl: Seconds the models prefetched with
+            :meth:`prefetch` are kept for :meth:`get_model` once got
+        :param kwargs: Options to the underlying requests and the connection
+            pool, see :class:`Api <devo_ml.modelmanager.api.Api>`
         """
         self.endpoints = endpoints_renderer
         self.api = Api(auth=auth, **kwargs)
         self.downloader = downloader or get_default_downloader()
+        self.metadata_cache = metadata_cache
+        self.upload_index = upload_index
+        self.compress_uploads = compress_uploads
+        self.raw_images = raw_images
+        self.image_segments = max(1, image_segments)
+        self._raw_images_unavailable = False
+        self.chunked_uploads = chunked_uploads
+        self.upload_part_size = max(1, upload_part_size)
+        self.upload_workers = min(
+            upload_workers or DEFAULT_UPLOAD_WORKERS,
+            self.api.pool_maxsize
+        )
+        self.upload_sessions = (
+            upload_sessions if upload_sessions is not None
+            else UploadSessionStore()
+        )
+        self._chunked_uploads_unavailable = False
+        self.validate_files = validate_files
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+        self.prefetch_ttl = prefetch_ttl
+        self._prefetches: Dict[str, Future] = {}
+        self._prefetched_at: Dict[str, float] = {}
+
+    def __enter__(self) -> BaseClient:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the pooled connections of the client and cancels the
+        prefetches not started.
+
+        :return: Nothing
+        """
+        with self._prefetch_lock:
+            executor = self._prefetch_executor
+            self._prefetch_executor = None
+            prefetches = list(self._prefetches.values())
+            self._prefetches.clear()
+            self._prefetched_at.clear()
+        for future in prefetches:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+        self.api.close()
 
     @property
     def url(self) -> str:
@@ -42,48 +222,701 @@ class BaseClient:
         """
         return self.endpoints.url
 
-    def get_models(self) -> List[dict]:
+    @property
+    def metrics(self) -> Optional[ClientMetrics]:
+        """The metrics of the calls of the client, if any.
+
+        :return: The metrics provided with the keyword `metrics`
+        """
+        return self.api.metrics
+
+    def add_hook(self, hook: RequestHook) -> None:
+        """Adds a hook called with the :class:`RequestEvent
+        <devo_ml.modelmanager.metrics.RequestEvent>` of every call of the
+        client.
+
+        :param hook: The hook
+        :return: Nothing
+        """
+        self.api.add_hook(hook)
+
+    def remove_hook(self, hook: RequestHook) -> None:
+        """Removes a hook, if added.
+
+        :param hook: The hook
+        :return: Nothing
+        """
+        self.api.remove_hook(hook)
+
+    def get_metadata(
+        self,
+        endpoint: str,
+        params: dict = None,
+        operation: str = None
+    ) -> Any:
+        """Gets the metadata in an endpoint through the metadata cache.
+
+        Fresh cached responses are returned without calling the server. Stale
+        ones are revalidated with a conditional request when the server
+        provided an ``ETag`` or a ``Last-Modified`` header. Without metadata
+        cache the endpoint is always called.
+
+        :param endpoint: The endpoint to get
+        :param params: The query parameters of the call
+        :param operation: The kind of endpoint called, reported to the hooks
+        :return: A copy of the decoded response
+        """
+        cache = self.metadata_cache
+        if cache is None:
+            return self.api.get(endpoint, params=params, operation=operation)
+        key = _metadata_key(endpoint, params)
+        entry = cache.get(key)
+        if entry is not None and entry.fresh:
+            return copy.deepcopy(entry.value)
+        headers = entry.validators() if entry is not None else {}
+        response = self.api.request(
+            endpoint,
+            params=params,
+            headers=headers,
+            operation=operation
+        )
+        with response:
+            if response.status_code == 304 and entry is not None:
+                cache.refresh(key)
+                return copy.deepcopy(entry.value)
+            decoded_response = decode_response(response)
+        validate_or_raise_error(response.status_code, decoded_response)
+        cache.put(
+            key,
+            decoded_response,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified")
+        )
+        return copy.deepcopy(decoded_response)
+
+    def invalidate_metadata(self, name: str = None) -> None:
+        """Removes cached metadata so it is got from the server on next use.
+
+        :param name: The name of the model whose metadata, along with the list
+            of models, is removed whatever the fields, pages or filters it was
+            got with. All metadata is removed if not provided
+        :return: Nothing
+        """
+        cache = self.metadata_cache
+        if cache is None:
+            return None
+        if name is None:
+            cache.invalidate()
+            return None
+        # Whatever the fields, pages or filters the metadata was got with
+        endpoints = {self.endpoints.models(), self.endpoints.model(name)}
+        cache.invalidate_matching(
+            lambda key: isinstance(key, tuple) and key[0] in endpoints
+        )
+
+    def get_models(self, fields: Sequence[str] = None) -> List[dict]:
         """Gets the list of the models in the system.
 
+        :param fields: The fields of the models to get, dotted paths for
+            nested fields, e.g. ``image.size``. All the fields if not provided.
+            The fields are asked to the server with the ``fields`` query
+            parameter and dropped by the client if the server ignores it
         :return: The list of the models
         """
-        return self.api.get(self.endpoints.models())
+        models = self.get_metadata(
+            self.endpoints.models(),
+            params=_fields_params(None, fields),
+            operation="models"
+        )
+        if fields and models:
+            return project(models, compile_fields(fields))
+        return models
+
+    def iter_models(
+        self,
+        page_size: int = None,
+        fields: Sequence[str] = None
+    ) -> Iterator[dict]:
+        """Iterates over the models in the system.
+
+        The models are decoded one by one while the response is received, so
+        the memory used doesn't grow with the number of models. With
+        `page_size` the models are requested in pages with the ``offset`` and
+        ``limit`` query parameters. Servers ignoring them are detected and
+        the models are listed once. The metadata cache, if any, is not used.
+
+        The connection is held while iterating, close the iterator to release
+        it if not exhausted.
+
+        :param page_size: The number of models to request at once. All the
+            models in a single call if not provided
+        :param fields: The fields of the models to get, see
+            :meth:`get_models`. Every model is projected once decoded, before
+            decoding the next one. The names are also requested when paging,
+            to detect servers ignoring it
+        :raises ModelManagerError: If the response is not a list of models
+        :return: An iterator over the models
+        """
+        projection = compile_fields(fields) if fields else None
+        if not page_size:
+            for model in self._iter_models_page(_fields_params(None, fields)):
+                yield project(model, projection) if projection else model
+            return None
+        # The names tell the pages apart, so they are always requested
+        paged_fields = (
+            [*fields, "name"] if fields and "name" not in fields else fields
+        )
+        offset = 0
+        first = None
+        while True:
+            count = 0
+            params = _fields_params(
+                {"offset": offset, "limit": page_size},
+                paged_fields
+            )
+            for model in self._iter_models_page(params):
+                if count == 0:
+                    name = model.get("name")
+                    # A page starting like the first one, or unnamed models
+                    # that can't be told apart, mean no paging
+                    if offset and (name is None or name == first):
+                        return None
+                    if not offset:
+                        first = name
+                count += 1
+                yield project(model, projection) if projection else model
+            # Short pages are the last, long ones mean no paging
+            if count != page_size:
+                return None
+            offset += count
 
-    def get_model(self, name: str, download_file: bool = None) -> dict:
+    def _iter_models_page(self, params: Optional[dict]) -> Iterator[dict]:
+        decoder = JsonArrayDecoder()
+        with self.api.get(
+            self.endpoints.models(),
+            params=params,
+            stream=True,
+            operation="models"
+        ) as response:
+            try:
+                for chunk in iter_response_content(response):
+                    yield from decoder.feed(chunk)
+                yield from decoder.close()
+            except ValueError as e:
+                raise ModelManagerError(msg=f"Invalid models: {e}") from e
+
+    def get_summaries(self, page_size: int = None) -> List[ModelSummary]:
+        """Gets a compact summary of every model in the system.
+
+        Only the fields of :const:`SUMMARY_FIELDS
+        <devo_ml.modelmanager.summary.SUMMARY_FIELDS>` are kept, so the
+        summaries of thousands of models take a few megabytes.
+
+        :param page_size: The number of models to request at once, see
+            :meth:`iter_models`
+        :return: The summaries of the models
+        """
+        return [
+            ModelSummary.from_model(model)
+            for model in self.iter_models(
+                page_size=page_size,
+                fields=SUMMARY_FIELDS
+            )
+        ]
+
+    def get_model(
+        self,
+        name: str,
+        download_file: bool = None,
+        stream: bool = None,
+        lazy: bool = None,
+        fields: Sequence[str] = None
+    ) -> dict:
         """Gets a model by its name.
 
         :param name: The name of the model
-        :param download_file: Whether to download the model file
+        :param download_file: Whether to download the model file. If the
+            downloader has a ``lookup`` method, e.g. a
+            :class:`CachingDownloader
+            <devo_ml.modelmanager.downloader.CachingDownloader>`, it is looked
+            up with the metadata of the model before downloading the file. If
+            it has a ``lock`` method, e.g. a :class:`SharedFileSystemDownloader
+            <devo_ml.modelmanager.downloader.SharedFileSystemDownloader>`, the
+            model is locked while its file is got
+        :param stream: Whether to stream the model file to the downloader
+            while it is received instead of loading it in memory. The `stream`
+            attribute of the downloader is used if not provided
+        :param lazy: Whether to get the model file only when it is used. If
+            set with `download_file`, only the metadata of the model is got
+            and the file is a :class:`LazyModelFile
+            <devo_ml.modelmanager.downloader.LazyModelFile>` handle
+        :param fields: The fields of the model to get, see
+            :meth:`get_models`. Without `download_file` the image of the
+            model is kept if asked for, e.g. with ``image.size``. The `file`
+            of a downloaded model is always kept
         :raises ModelNotFound: If the model doesn't exist
         :return: The model data
         """
         if not name:
             raise ModelManagerError(msg=f"Invalid name: '{name}'")
+        if download_file and lazy:
+            model = self.get_model(name, fields=fields)
+            model["file"] = LazyModelFile(
+                name,
+                functools.partial(self._get_file, name, stream)
+            )
+            return model
+        if fields and not download_file:
+            return self._get_model_fields(name, fields)
+        prefetched = self._take_prefetched(name) if download_file else None
+        if prefetched is not None:
+            model = prefetched
+        else:
+            model = self._get_locked_model(name, download_file, stream)
+        if fields:
+            return project(model, compile_fields([*fields, "file"]))
+        return model
+
+    def _get_locked_model(
+        self,
+        name: str,
+        download_file: Optional[bool],
+        stream: Optional[bool]
+    ) -> dict:
+        lock = getattr(self.downloader, "lock", None)
+        if download_file and lock is not None:
+            # Only one process or thread gets the file, the others reuse it
+            with lock(name):
+                return self._get_model(name, download_file, stream)
+        return self._get_model(name, download_file, stream)
+
+    def prefetch(self, names: Iterable[str]) -> Dict[str, Future]:
+        """Downloads the files of models in the background ahead of use.
+
+        The models are got in a pool of threads of the client, sharing its
+        connections, and the call returns at once. A later :meth:`get_model`
+        of a model prefetched with `download_file` waits for the prefetch in
+        progress, or takes its result, instead of downloading the file again.
+        Results not taken within `prefetch_ttl` seconds are dropped, and a
+        failed prefetch is not reused, the model is got again.
+
+        :param names: The names of the models
+        :return: The futures of the models, by model name. Models being
+            prefetched keep their future, those already got are got again
+        """
+        futures = {}
+        submitted = []
+        with self._prefetch_lock:
+            self._drop_expired_prefetches()
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=self.api.pool_maxsize,
+                    thread_name_prefix="modelmanager-prefetch"
+                )
+            for name in dict.fromkeys(names):
+                future = self._prefetches.get(name)
+                if future is None or future.done():
+                    future = self._prefetch_executor.submit(
+                        self._get_locked_model,
+                        name,
+                        True,
+                        None
+                    )
+                    self._prefetches[name] = future
+                    self._prefetched_at.pop(name, None)
+                    submitted.append((name, future))
+                futures[name] = future
+        # Out of the lock, the callback of a future done runs at once
+        for name, future in submitted:
+            future.add_done_callback(
+                functools.partial(self._prefetch_done, name)
+            )
+        return futures
+
+    def _prefetch_done(self, name: str, future: Future) -> None:
+        with self._prefetch_lock:
+            if self._prefetches.get(name) is future:
+                self._prefetched_at[name] = time.monotonic()
+            self._drop_expired_prefetches()
+
+    def _drop_expired_prefetches(self) -> None:
+        now = time.monotonic()
+        for name, done_at in list(self._prefetched_at.items()):
+            if now - done_at > self.prefetch_ttl:
+                del self._prefetched_at[name]
+                self._prefetches.pop(name, None)
+
+    def _take_prefetched(self, name: str) -> Optional[dict]:
+        with self._prefetch_lock:
+            self._drop_expired_prefetches()
+            future = self._prefetches.get(name)
+        if future is None:
+            return None
+        try:
+            model = future.result()
+        except Exception:
+            model = None
+        with self._prefetch_lock:
+            # A prefetched file is used once, later calls get it again
+            if self._prefetches.get(name) is future:
+                del self._prefetches[name]
+                self._prefetched_at.pop(name, None)
+        return copy.deepcopy(model)
+
+    def _get_model_fields(self, name: str, fields: Sequence[str]) -> dict:
+        model = self.get_metadata(
+            self.endpoints.model(name),
+            params=_fields_params({"fast": True}, fields),
+            operation="model"
+        )
+        if not model:
+            raise ModelNotFound(name)
+        return project(model, compile_fields(fields))
+
+    def _get_model(
+        self,
+        name: str,
+        download_file: Optional[bool],
+        stream: Optional[bool],
+        downloader: DownloaderCallable = None
+    ) -> dict:
+        downloader = downloader or self.downloader
+        model = None
+        lookup = getattr(downloader, "lookup", None)
+        if download_file and lookup is not None:
+            # The metadata of the model is enough to find its file in a cache
+            model = self._get_fast_model(name)
+            file = lookup(model)
+            if file is not None:
+                model["file"] = file
+                model.pop("image", None)
+                return model
+        download_raw = getattr(downloader, "download_raw", None)
+        if (
+            download_file
+            and download_raw is not None
+            and self.raw_images
+            and not self._raw_images_unavailable
+        ):
+            if model is None:
+                model = self._get_fast_model(name)
+            try:
+                model["file"] = download_raw(
+                    model,
+                    functools.partial(self._fetch_range, name),
+                    segments=self.image_segments
+                )
+            except ImageEndpointUnavailable:
+                # Older servers, the file is got from the model metadata
+                self._raw_images_unavailable = True
+            except ImageRequestRefused as e:
+                raise e.error from None
+            else:
+                model.pop("image", None)
+                return model
+        if stream is None:
+            stream = getattr(downloader, "stream", False)
+        download_stream = getattr(downloader, "download_stream", None)
+        if download_file and stream and download_stream:
+            return self._stream_model(name, download_stream)
         endpoint = self.endpoints.model(name)
-        model = self.api.get(endpoint, params={"fast": not download_file})
+        if download_file:
+            model = self.api.get(
+                endpoint,
+                params={"fast": False},
+                operation="model"
+            )
+        else:
+            model = self.get_metadata(
+                endpoint,
+                params={"fast": True},
+                operation="model"
+            )
         if not model:
             raise ModelNotFound(name)
         if download_file:
-            model["file"] = self.downloader(model)
+            model["file"] = downloader(model)
+        model.pop("image", None)
+        return model
+
+    def _get_file(self, name: str, stream: Optional[bool]) -> str:
+        return self.get_model(name, download_file=True, stream=stream)["file"]
+
+    def _get_fast_model(self, name: str) -> dict:
+        model = self.get_metadata(
+            self.endpoints.model(name),
+            params={"fast": True},
+            operation="model"
+        )
+        if not model:
+            raise ModelNotFound(name)
+        return model
+
+    @contextlib.contextmanager
+    def _fetch_range(
+        self,
+        name: str,
+        start: int,
+        end: Optional[int]
+    ) -> Iterator[RangePart]:
+        endpoint = self.endpoints.image(name)
+        # Ranges are offsets in the image, so it must not be compressed
+        headers = {"Accept-Encoding": "identity"}
+        if start or end is not None:
+            last = "" if end is None else end - 1
+            headers["Range"] = f"bytes={start}-{last}"
+        with self.api.request(
+            endpoint,
+            headers=headers,
+            stream=True,
+            operation="image"
+        ) as response:
+            status_code = response.status_code
+            if status_code in (405, 501):
+                raise ImageEndpointUnavailable(endpoint)
+            if not 200 <= status_code < 300:
+                error = decode_response(response)
+                # Errors of the server have a message, unknown routes don't
+                server_error = isinstance(error, dict) and "msg" in error
+                if status_code == 404 and not server_error:
+                    raise ImageEndpointUnavailable(endpoint)
+                if status_code == 404:
+                    raise ImageRequestRefused(ModelNotFound(name))
+                try:
+                    validate_or_raise_error(status_code, error)
+                except ModelManagerError as e:
+                    raise ImageRequestRefused(e) from e
+            chunks = iter_response_content(response)
+            if status_code == 206:
+                first, total = parse_content_range(
+                    response.headers.get("Content-Range")
+                )
+                yield RangePart(first, total, True, chunks)
+                return None
+            length = response.headers.get("Content-Length", "")
+            total = int(length) if length.isdigit() else None
+            yield RangePart(0, total, False, chunks)
+
+    def _stream_model(self, name: str, download_stream: Callable) -> dict:
+        endpoint = self.endpoints.model(name)
+        with self.api.get(
+            endpoint,
+            params={"fast": False},
+            stream=True,
+            operation="model"
+        ) as response:
+            model, file = download_stream(iter_response_content(response))
+        if not model:
+            raise ModelNotFound(name)
+        model["file"] = file
         model.pop("image", None)
         return model
 
     def find_model(
         self,
         name: str,
-        download_file: bool = None
+        download_file: bool = None,
+        lazy: bool = None,
+        fields: Sequence[str] = None
     ) -> Optional[dict]:
         """Finds a model by its name.
 
         :param name: The name of the model
         :param download_file: Whether to download the model file
+        :param lazy: Whether to get the model file only when it is used, see
+            :meth:`get_model`
+        :param fields: The fields of the model to get, see :meth:`get_model`
         :return: The model data or nothing if the model doesn't exist
         """
         try:
-            return self.get_model(name, download_file=download_file)
+            return self.get_model(
+                name,
+                download_file=download_file,
+                lazy=lazy,
+                fields=fields
+            )
         except ModelNotFound:
             return None
 
+    def get_many(
+        self,
+        names: Iterable[str],
+        download_file: bool = None,
+        stream: bool = None,
+        max_workers: int = None,
+        executor: Executor = None,
+        lazy: bool = None
+    ) -> Dict[str, Union[dict, Exception]]:
+        """Gets many models by their names concurrently.
+
+        Models are got with :meth:`get_model` in a pool of threads sharing the
+        connections of the client. An error getting a model doesn't stop the
+        others, the error is returned in place of the model.
+
+        :param names: The names of the models
+        :param download_file: Whether to download the model files
+        :param stream: Whether to stream the model files, see
+            :meth:`get_model`
+        :param max_workers: Maximum number of concurrent calls when no
+            `executor` is provided. Defaults to the maximum number of
+            connections per host of the client
+        :param executor: The executor to run the calls in. A bounded thread
+            pool is used if not provided
+        :param lazy: Whether to get the model files only when they are used,
+            see :meth:`get_model`
+        :return: The model data, or the error raised, by model name
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        get_model = functools.partial(
+            self.get_model,
+            download_file=download_file,
+            stream=stream,
+            lazy=lazy
+        )
+        if executor is not None:
+            return self._get_many(names, get_model, executor)
+        max_workers = min(len(names), max_workers or self.api.pool_maxsize)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return self._get_many(names, get_model, pool)
+
+    def _get_many(
+        self,
+        names: List[str],
+        get_model: Callable[[str], dict],
+        executor: Executor
+    ) -> Dict[str, Union[dict, Exception]]:
+        futures = {
+            name: executor.submit(get_model, name)
+            for name in names
+        }
+        results: Dict[str, Union[dict, Exception]] = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = e
+        return results
+
+    def download_many(
+        self,
+        names: Iterable[str],
+        **kwargs
+    ) -> Dict[str, Union[dict, Exception]]:
+        """Gets many models by their names concurrently downloading their
+        files.
+
+        :param names: The names of the models
+        :param kwargs: Options of :meth:`get_many`
+        :return: The model data, or the error raised, by model name
+        """
+        return self.get_many(names, download_file=True, **kwargs)
+
+    def sync_to(
+        self,
+        path: str | Path,
+        names: Iterable[str] = None,
+        max_workers: int = None,
+        prune: bool = False
+    ) -> Dict[str, Union[dict, Exception]]:
+        """Mirrors the files of the models in the system to a directory,
+        downloading only the files new or changed since the last sync.
+
+        The models are listed once and their images compared with the
+        manifest of the directory, kept in ``.modelmanager/sync.json``. The
+        files of the models whose image changed, or missing, are streamed to
+        the directory concurrently through a :class:`FileSystemDownloader
+        <devo_ml.modelmanager.downloader.FileSystemDownloader>`, named after
+        the model and the extension of its engine. An error downloading a
+        model doesn't stop the others, its previous file is kept.
+
+        :param path: The directory, created if missing
+        :param names: The names of the models to sync. All the models in the
+            system if not provided
+        :param max_workers: Maximum number of files downloaded at once.
+            Defaults to the maximum number of connections per host of the
+            client
+        :param prune: Whether to remove the files synced before of the models
+            no longer in the system, or not in `names` if provided
+        :return: The ``name``, ``file`` and ``status``, ``downloaded``,
+            ``unchanged`` or ``removed``, of every model synced or the error
+            raised, e.g. :class:`ModelNotFound
+            <devo_ml.modelmanager.error.ModelNotFound>` for the names not in
+            the system, by model name
+        """
+        downloader = FileSystemDownloader(path, stream=True)
+        os.makedirs(downloader.path, exist_ok=True)
+        manifest = read_sync_manifest(downloader.path)
+        selected = None if names is None else set(names)
+        models = {
+            model["name"]: model
+            for model in self.iter_models(fields=SYNC_FIELDS)
+            if selected is None or model.get("name") in selected
+        }
+        results: Dict[str, Union[dict, Exception]] = {}
+        pending = {}
+        for name, model in models.items():
+            try:
+                file = downloader.get_file_path(model)
+            except ValueError:
+                results[name] = ModelManagerError(
+                    msg=f"Invalid model: '{name}'"
+                )
+                continue
+            key = get_image_key(model.get("image") or {})
+            if is_synced(manifest.get(name), file, key):
+                results[name] = {
+                    "name": name,
+                    "file": file,
+                    "status": "unchanged",
+                }
+            else:
+                pending[name] = (file, key)
+        if pending:
+            download = functools.partial(
+                self._get_model,
+                download_file=True,
+                stream=None,
+                downloader=downloader
+            )
+            max_workers = min(
+                len(pending),
+                max_workers or self.api.pool_maxsize
+            )
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                downloads = self._get_many(list(pending), download, pool)
+            for name, result in downloads.items():
+                if isinstance(result, Exception):
+                    results[name] = result
+                    continue
+                file, key = pending[name]
+                entry = {"file": os.path.basename(file), "key": key}
+                previous = manifest.get(name)
+                if previous is not None and previous["file"] != entry["file"]:
+                    # The engine changed, so did the extension
+                    remove_synced_file(downloader.path, previous)
+                manifest[name] = entry
+                results[name] = {
+                    "name": name,
+                    "file": file,
+                    "status": "downloaded",
+                }
+        if prune:
+            for name in [name for name in manifest if name not in models]:
+                removed = manifest.pop(name)
+                remove_synced_file(downloader.path, removed)
+                results[name] = {
+                    "name": name,
+                    "file": os.path.join(downloader.path, removed["file"]),
+                    "status": "removed",
+                }
+        for name in selected or ():
+            if name not in results:
+                results[name] = ModelNotFound(name)
+        write_sync_manifest(downloader.path, manifest)
+        return results
+
     def add_model(
         self,
         name: str,
@@ -100,39 +933,308 @@ class BaseClient:
         :param description: The description of the model
         :param force: Whether to override the model if already exist
         :raises ModelAlreadyExists: If the model already exists and not force
+        :raises InvalidModelFile: If `validate_files` is set and the file is
+            not valid for the engine
         """
-        model = self.api.get(self.endpoints.model(name), params={"fast": True})
+        model = self.api.get(
+            self.endpoints.model(name),
+            params={"fast": True},
+            operation="model",
+            phase="add_model.check"
+        )
         if model and not force:
             raise ModelAlreadyExists(name)
+        self._add_model(name, engine, model_file, description, model)
+
+    def add_models(
+        self,
+        source: ManifestSource,
+        force: bool = None,
+        max_workers: int = None
+    ) -> Dict[str, Union[dict, Exception]]:
+        """Adds many models concurrently from a directory or a manifest.
+
+        Every file of a directory, except hidden ones, is added as a model
+        named after the file, e.g. ``fraud.onnx`` as ``fraud``. A manifest
+        is a JSON file with a list of models, or the list itself, e.g.
+        ``[{"name": "fraud", "file": "fraud.zip", "engine": "H2O"}]``. Only
+        ``file`` is required, ``description`` and ``force`` are optional and
+        files are relative to the manifest. The engines not given are
+        inferred from the extensions of the files, disambiguated if needed by
+        an engine code before the extension, e.g. ``fraud.h2o.zip``, see
+        :func:`infer_engine <devo_ml.modelmanager.engines.infer_engine>`.
+
+        The existing models are listed once instead of being checked one by
+        one. An error adding a model doesn't stop the others, the error is
+        returned in place of the model.
+
+        :param source: The directory, the manifest file or the list of models
+        :param force: Whether to override the models if already exist, unless
+            a model of the manifest tells otherwise
+        :param max_workers: Maximum number of models added at once. Defaults
+            to the maximum number of connections per host of the client
+        :raises ModelManagerError: If the manifest is not valid
+        :return: The models added, with their ``name``, ``file``, ``engine``,
+            ``description`` and whether they ``replaced`` an existing model,
+            or the error raised, by model name
+        """
+        entries = {entry["name"]: entry for entry in read_manifest(source)}
+        if not entries:
+            return {}
+        fields = ["id", "name", "description"]
+        models = self.api.get(
+            self.endpoints.models(),
+            params=_fields_params(None, fields),
+            operation="models",
+            phase="add_models.check"
+        ) or []
+        existing = {
+            model["name"]: project(model, compile_fields(fields))
+            for model in models
+        }
+
+        def add(name: str) -> dict:
+            entry = entries[name]
+            if not entry["engine"]:
+                raise ModelManagerError(
+                    msg=f"Unknown engine of '{entry['file']}'"
+                )
+            model = existing.get(name)
+            replace = entry["force"] if entry["force"] is not None else force
+            if model and not replace:
+                raise ModelAlreadyExists(name)
+            self._add_model(
+                name,
+                entry["engine"],
+                entry["file"],
+                entry["description"],
+                model
+            )
+            return {
+                "name": name,
+                "file": entry["file"],
+                "engine": entry["engine"],
+                "description": entry["description"],
+                "replaced": bool(model),
+            }
+
+        max_workers = min(len(entries), max_workers or self.api.pool_maxsize)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return self._get_many(list(entries), add, pool)
+
+    def _add_model(
+        self,
+        name: str,
+        engine: str,
+        model_file: str,
+        description: Optional[str],
+        model: Optional[dict]
+    ) -> None:
         model_file = os.path.expanduser(model_file)
+        if self.validate_files:
+            validate_model_file(engine, model_file)
+        index = self.upload_index
+        digest = index.file_digest(model_file) if index is not None else ""
+        image_metadata = (
+            index.get(self.endpoints.image_upload(), digest, engine)
+            if index is not None else None
+        )
+        reused = image_metadata is not None
+        if image_metadata is None:
+            image_metadata = self._upload_image(engine, model_file, digest)
+        try:
+            try:
+                self._post_model(
+                    name,
+                    engine,
+                    description,
+                    image_metadata,
+                    model
+                )
+            except ModelManagerError as e:
+                if not reused or index is None or not _is_image_unknown(e):
+                    raise
+                # The image may be gone from the server, upload it again
+                index.remove(self.endpoints.image_upload(), digest, engine)
+                image_metadata = self._upload_image(engine, model_file, digest)
+                self._post_model(
+                    name,
+                    engine,
+                    description,
+                    image_metadata,
+                    model
+                )
+        finally:
+            self.invalidate_metadata(name)
+
+    def _post_model(
+        self,
+        name: str,
+        engine: str,
+        description: Optional[str],
+        image_metadata: dict,
+        model: Optional[dict]
+    ) -> None:
+        body = build_model_body(
+            name,
+            engine,
+            description,
+            image_metadata,
+            model
+        )
+        self.api.post(
+            self.endpoints.models(),
+            json=body,
+            operation="models",
+            phase="add_model.register"
+        )
+
+    def _upload_image(self, engine: str, model_file: str, digest: str) -> dict:
+        image_metadata = None
+        if (
+            self.chunked_uploads
+            and not self._chunked_uploads_unavailable
+            and os.path.getsize(model_file) > self.upload_part_size
+        ):
+            try:
+                image_metadata = self._upload_image_in_parts(
+                    engine,
+                    model_file
+                )
+            except UploadUnsupported:
+                # Older servers, the file is sent in a single call
+                self._chunked_uploads_unavailable = True
+        if image_metadata is None:
+            image_metadata = self._post_image(engine, model_file)
+        if self.upload_index is not None and image_metadata.get("valid"):
+            self.upload_index.put(
+                self.endpoints.image_upload(),
+                digest,
+                engine,
+                image_metadata
+            )
+        return image_metadata
+
+    def _post_image(self, engine: str, model_file: str) -> dict:
+        with open(model_file, "rb") as f:
+            multipart = MultipartEncoder(
+                fields=[("engine", engine)],
+                files=[("fileName", f)]
+            )
+            data: Union[MultipartEncoder, GzipEncoder] = multipart
+            headers = {"Content-Type": multipart.content_type}
+            if self.compress_uploads:
+                level = self.compress_uploads
+                data = GzipEncoder(
+                    multipart,
+                    level=6 if level is True else int(level)
+                )
+                headers["Content-Encoding"] = "gzip"
+            return self.api.post(
+                self.endpoints.image_upload(),
+                data=data,
+                headers=headers,
+                operation="image_upload",
+                phase="add_model.upload"
+            )
+
+    def _upload_image_in_parts(self, engine: str, model_file: str) -> dict:
+        sessions = self.upload_sessions
+        # Sessions are opened in the domain of legacy clients
+        key = sessions.file_key(
+            self.endpoints.upload_sessions(),
+            engine,
+            model_file
+        )
+        size = os.path.getsize(model_file)
+        received: List[int] = []
+        session = sessions.get(key)
+        if session is not None:
+            state = self._get_upload_session(session["sessionId"])
+            if state is None:
+                # Expired in the server, start over
+                sessions.remove(key)
+                session = None
+            else:
+                received = parse_received_parts(state)
+        if session is None:
+            session = self._start_upload_session(engine, model_file, size)
+            sessions.put(key, session)
+        session_id = session["sessionId"]
+        part_size = session["partSize"]
+        upload_parts(
+            model_file,
+            size,
+            part_size,
+            functools.partial(self._put_part, session_id),
+            received=received,
+            max_workers=self.upload_workers
+        )
         image_metadata = self.api.post(
-            self.endpoints.image_upload(),
-            data={"engine": engine},
-            files=[('fileName', open(model_file, 'rb'))]
-        )
-        if not image_metadata.get("valid"):
-            msg = str(image_metadata.get("errorDetail", ""))
-            raise ModelManagerError(msg=msg)
-        body = {
-            "name": name,
-            "engine": engine,
-            "description": description,
-            "image": {
-                "id": image_metadata.get("imageId"),
-                "size": image_metadata.get("size")
+            self.endpoints.upload_commit(session_id),
+            json={"parts": count_parts(size, part_size), "size": size},
+            operation="image_upload",
+            phase="add_model.commit"
+        )
+        sessions.remove(key)
+        return image_metadata
+
+    def _start_upload_session(
+        self,
+        engine: str,
+        model_file: str,
+        size: int
+    ) -> dict:
+        response = self.api.request(
+            self.endpoints.upload_sessions(),
+            method="post",
+            json={
+                "engine": engine,
+                "fileName": os.path.basename(model_file),
+                "size": size,
+                "partSize": self.upload_part_size
             },
-            "outputType": image_metadata.get("outputType"),
-            "fields": image_metadata.get("fields"),
-            "clusters": image_metadata.get("clusters"),
-            "category": image_metadata.get("category"),
-            "runtimeSize": image_metadata.get("runtimeSize"),
-            "hidden": False
+            operation="image_upload",
+            phase="add_model.upload"
+        )
+        with response:
+            if response.status_code in (404, 405, 501):
+                raise UploadUnsupported(self.endpoints.upload_sessions())
+            decoded_response = decode_response(response)
+        validate_or_raise_error(response.status_code, decoded_response)
+        if (
+            not isinstance(decoded_response, dict)
+            or not decoded_response.get("sessionId")
+        ):
+            raise UploadUnsupported(self.endpoints.upload_sessions())
+        return {
+            "sessionId": str(decoded_response["sessionId"]),
+            "partSize": int(
+                decoded_response.get("partSize") or self.upload_part_size
+            ),
         }
-        if model:
-            body["id"] = model.get("id")
-            if description is None:
-                body["description"] = model.get("description")
-        self.api.post(self.endpoints.models(), json=body)
+
+    def _get_upload_session(self, session_id: str) -> Optional[dict]:
+        response = self.api.request(
+            self.endpoints.upload_session(session_id),
+            operation="image_upload",
+            phase="add_model.upload"
+        )
+        with response:
+            if response.status_code in (404, 410):
+                return None
+            decoded_response = decode_response(response)
+        validate_or_raise_error(response.status_code, decoded_response)
+        return decoded_response if isinstance(decoded_response, dict) else {}
+
+    def _put_part(self, session_id: str, index: int, data: bytes) -> None:
+        self.api.put(
+            self.endpoints.upload_part(session_id, index),
+            data=data,
+            headers={"Content-Type": "application/octet-stream"},
+            operation="image_upload",
+            phase="add_model.upload"
+        )
 
 
 class Client(BaseClient):
@@ -1,7 +1,15 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from .auth import create_auth_from_token, get_default_auth_type
 from ._client import Client
-from .downloader import FileSystemDownloader
-from .profile import read_profile_from_file
+from .downloader import AsyncFileSystemDownloader, FileSystemDownloader
+from .profile import default_store
+from .registry import default_registry, freeze
+
+if TYPE_CHECKING:
+    from ._async_client import AsyncClient
 
 
 def create_client_from_token(
@@ -9,12 +17,20 @@ def create_client_from_token(
     token: str,
     auth_type: str = None,
     download_path: str = None,
+    shared: bool = False,
     **kwargs
 ) -> Client:
     """Creates an ML Model Manager
     :class:`Client <devo_ml.modelmanager.client.Client>` with token
     authentication.
 
+    With `shared` the client is taken from the
+    :data:`default_registry <devo_ml.modelmanager.registry.default_registry>`,
+    so calls with the same arguments reuse the same client and its pooled
+    connections. Shared clients are closed by
+    :func:`close_clients <devo_ml.modelmanager.registry.close_clients>` or
+    when evicted from the registry, not by their users.
+
     :param url: The URL of the server
     :param token: The token to authenticate
     :param auth_type: The type of authentication to use;
@@ -25,11 +41,24 @@ def create_client_from_token(
         is used if is not provided
     :param download_path: The path where model files will be downloaded. The
         current directory ``.`` is used if not provided.
+    :param shared: Whether to reuse a client of the process registry
     :param kwargs: Additional options for underlying request, e.g. `timeout`.
         These options are the same of the ``requests`` library can manage
     :return: A ready to use Client object
     """
     auth_type = auth_type or get_default_auth_type()
+    if shared:
+        key = (url, token, auth_type, download_path, freeze(kwargs))
+        return default_registry.get(
+            key,
+            lambda: create_client_from_token(
+                url,
+                token,
+                auth_type=auth_type,
+                download_path=download_path,
+                **kwargs
+            )
+        )
     auth = create_auth_from_token(token, auth_type=auth_type)
     downloader = FileSystemDownloader(download_path) if download_path else None
     return Client(url, auth, downloader=downloader, **kwargs)
@@ -38,6 +67,7 @@ def create_client_from_token(
 def create_client_from_profile(
     profile: str,
     path: str = None,
+    shared: bool = False,
     **kwargs
 ) -> Client:
     """Creates an ML Model Manager
@@ -54,15 +84,79 @@ def create_client_from_profile(
         auth_type = standalone
         download_path = ~/models
 
+    Profiles are read through the
+    :data:`default_store <devo_ml.modelmanager.profile.default_store>`, so a
+    file is parsed again only when it changes.
+
     :param profile: The name of the profile to use
     :param path: The path, file path or filename to search for a profile
+    :param shared: Whether to reuse a client of the process registry, see
+        :func:`create_client_from_token`. Profiles with the same values share
+        the client, and a profile changed in the file gets a new one
     :param kwargs: Additional options for underlying request, e.g. `timeout`.
         These options are the same of the
         :doc:`Requests <requests:user/quickstart>` library can manage
     :return: A ready to use Client object
     """
-    cfg = read_profile_from_file(profile, path=path)
+    cfg = default_store.read_profile(profile, path=path)
     return create_client_from_token(
+        cfg["url"],
+        cfg["token"],
+        auth_type=cfg["auth_type"],
+        download_path=cfg["download_path"],
+        shared=shared,
+        **kwargs
+    )
+
+
+def create_async_client_from_token(
+    url: str,
+    token: str,
+    auth_type: str = None,
+    download_path: str = None,
+    **kwargs
+) -> AsyncClient:
+    """Creates an ML Model Manager
+    :class:`AsyncClient <devo_ml.modelmanager.AsyncClient>` with token
+    authentication.
+
+    :param url: The URL of the server
+    :param token: The token to authenticate
+    :param auth_type: The type of authentication to use, see
+        :func:`create_client_from_token`
+    :param download_path: The path where model files will be downloaded. The
+        current directory ``.`` is used if not provided.
+    :param kwargs: Additional options for underlying calls, e.g. `timeout`.
+        See :class:`AsyncApi <devo_ml.modelmanager.async_api.AsyncApi>`
+    :return: A ready to use AsyncClient object
+    """
+    auth_type = auth_type or get_default_auth_type()
+    auth = create_auth_from_token(token, auth_type=auth_type)
+    downloader = (
+        AsyncFileSystemDownloader(download_path) if download_path else None
+    )
+    # Imported on use, synchronous applications don't pay for asyncio
+    from ._async_client import AsyncClient
+
+    return AsyncClient(url, auth, downloader=downloader, **kwargs)
+
+
+def create_async_client_from_profile(
+    profile: str,
+    path: str = None,
+    **kwargs
+) -> AsyncClient:
+    """Creates an ML Model Manager
+    :class:`AsyncClient <devo_ml.modelmanager.AsyncClient>` from a profile
+    located in a file, see :func:`create_client_from_profile`.
+
+    :param profile: The name of the profile to use
+    :param path: The path, file path or filename to search for a profile
+    :param kwargs: Additional options for underlying calls, e.g. `timeout`.
+    :return: A ready to use AsyncClient object
+    """
+    cfg = default_store.read_profile(profile, path=path)
+    return create_async_client_from_token(
         cfg["url"],
         cfg["token"],
         auth_type=cfg["auth_type"],
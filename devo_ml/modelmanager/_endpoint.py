@@ -33,12 +33,52 @@ class EndpointRenderer(abc.ABC):
         :return: URL of the get model endpoint
         """
 
+    @abc.abstractmethod
+    def image(self, name: str) -> str:
+        """
+        :param name: The model name
+        :return: URL of the raw image endpoint
+        """
+
     @abc.abstractmethod
     def image_upload(self) -> str:
         """
         :return: URL of the image upload endpoint
         """
 
+    def upload_sessions(self) -> str:
+        """Render endpoint ``<image_upload>/sessions``.
+
+        :return: URL of the chunked upload sessions endpoint
+        """
+        return f"{self.image_upload()}/sessions"
+
+    def upload_session(self, session_id: str) -> str:
+        """Render endpoint ``<image_upload>/sessions/{session_id}``.
+
+        :param session_id: The id of the upload session
+        :return: URL of the chunked upload session endpoint
+        """
+        return f"{self.upload_sessions()}/{quote(str(session_id))}"
+
+    def upload_part(self, session_id: str, index: int) -> str:
+        """Render endpoint
+        ``<image_upload>/sessions/{session_id}/parts/{index}``.
+
+        :param session_id: The id of the upload session
+        :param index: The index of the part, starting at 0
+        :return: URL of the endpoint of a part of a chunked upload
+        """
+        return f"{self.upload_session(session_id)}/parts/{index}"
+
+    def upload_commit(self, session_id: str) -> str:
+        """Render endpoint ``<image_upload>/sessions/{session_id}/commit``.
+
+        :param session_id: The id of the upload session
+        :return: URL of the endpoint completing a chunked upload
+        """
+        return f"{self.upload_session(session_id)}/commit"
+
 
 class LatestEndpointRenderer(EndpointRenderer):
     """An :class:`EndpointRenderer` for ML Model Manager server ``2.4.0``
@@ -60,6 +100,14 @@ class LatestEndpointRenderer(EndpointRenderer):
         """
         return f"{self.url}/models/{quote(name)}"
 
+    def image(self, name: str) -> str:
+        """Render endpoint ``<url>/models/{name}/image``.
+
+        :param name: The model name
+        :return: URL of the raw image endpoint
+        """
+        return f"{self.url}/models/{quote(name)}/image"
+
     def image_upload(self) -> str:
         """Render endpoint ``<url>/models/images/upload``.
 
@@ -96,6 +144,16 @@ class LegacyEndpointRenderer(EndpointRenderer):
         """
         return f"{self.url}/domains/{self.domain}/models/{quote(name)}"
 
+    def image(self, name: str) -> str:
+        """Render endpoint ``<url>/domains/{domain}/models/{name}/image``.
+
+        :param name: The model name
+        :return: URL of the raw image endpoint
+        """
+        return (
+            f"{self.url}/domains/{self.domain}/models/{quote(name)}/image"
+        )
+
     def image_upload(self) -> str:
         """Render endpoint ``<url>/domains/{domain}/models/images/upload``.
 
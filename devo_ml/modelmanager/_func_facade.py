@@ -22,12 +22,14 @@ def get_models(
     :param kwargs: Options to the underlying requests
     :return: The list of the models
     """
-    return create_client_from_token(
+    client = create_client_from_token(
         url,
         token,
         auth_type=auth_type,
+        shared=True,
         **kwargs
-    ).get_models()
+    )
+    return client.get_models()
 
 
 def get_model(
@@ -52,13 +54,15 @@ def get_model(
     :raises ModelNotFound: If the model doesn't exist
     :return: The model data
     """
-    return create_client_from_token(
+    client = create_client_from_token(
         url,
         token,
         auth_type=auth_type,
         download_path=download_path,
+        shared=True,
         **kwargs
-    ).get_model(name, download_file=bool(download_path))
+    )
+    return client.get_model(name, download_file=bool(download_path))
 
 
 def find_model(
@@ -82,13 +86,15 @@ def find_model(
     :param kwargs: Options to the underlying requests
     :return: The model data or nothing if the model doesn't exist
     """
-    return create_client_from_token(
+    client = create_client_from_token(
         url,
         token,
         auth_type=auth_type,
         download_path=download_path,
+        shared=True,
         **kwargs
-    ).find_model(name, download_file=bool(download_path))
+    )
+    return client.find_model(name, download_file=bool(download_path))
 
 
 def add_model(
@@ -118,9 +124,17 @@ def add_model(
     :param kwargs: Options to the underlying requests
     :raises ModelAlreadyExists: If the model already exists and not force
     """
-    return create_client_from_token(
+    client = create_client_from_token(
         url,
         token,
         auth_type=auth_type,
+        shared=True,
         **kwargs
-    ).add_model(name, engine, model_file, description=description, force=force)
+    )
+    return client.add_model(
+        name,
+        engine,
+        model_file,
+        description=description,
+        force=force
+    )
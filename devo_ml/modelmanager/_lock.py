@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import functools
+import os
+import re
+import socket
+import tempfile
+import time
+
+from typing import List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None  # type: ignore[assignment]
+
+
+#: Seconds without changes after which a temporary file of another host, or
+#: of an unknown one, is considered abandoned.
+PARTIAL_FILE_MAX_AGE = 60 * 60
+
+
+_partial_file = re.compile(r"^\.(?:(.+)-)?(\d+)-[^-]+\.part$")
+_unsafe_host_chars = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class FileLock:
+    """An advisory lock on a file, exclusive between processes and between
+    threads of a process.
+
+    The lock file is created if missing and never removed, so every process
+    locks the same file.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.05) -> None:
+        """Creates a :class:`FileLock`.
+
+        :param path: The lock file
+        :param poll_interval: Seconds between attempts to acquire the lock
+            where it can't be waited for
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> FileLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Acquires the lock.
+
+        :param blocking: Whether to wait for the lock if held elsewhere
+        :return: ``True`` if acquired
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            acquired = self._lock(fd, blocking)
+        except BaseException:
+            os.close(fd)
+            raise
+        if not acquired:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Releases the lock, if held.
+
+        :return: Nothing
+        """
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return None
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def _lock(self, fd: int, blocking: bool) -> bool:
+        if fcntl is not None:
+            flags = fcntl.LOCK_EX
+            if not blocking:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(fd, flags)
+            except BlockingIOError:
+                return False
+            return True
+        if msvcrt is None:
+            return True
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(self.poll_interval)
+
+
+def create_partial_file(directory: str) -> Tuple[int, str]:
+    """Creates a temporary file to write a file of `directory` before
+    renaming it. The name of the file records the host and the process
+    writing it.
+
+    :param directory: The directory of the file
+    :return: The descriptor and path of the temporary file
+    """
+    return tempfile.mkstemp(
+        dir=directory,
+        prefix=f".{_get_host()}-{os.getpid()}-",
+        suffix=".part"
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _get_host() -> str:
+    return _unsafe_host_chars.sub("_", socket.gethostname()) or "_"
+
+
+def fsync_directory(directory: str) -> None:
+    """Flushes the entries of a directory, e.g. a renamed file, to disk where
+    it is supported.
+
+    :param directory: The directory
+    :return: Nothing
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _is_running(pid: int) -> bool:
+    # Signals can't probe processes on Windows, assume they are running
+    if pid == os.getpid() or os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def remove_partial_files(
+    directory: str,
+    max_age: float = PARTIAL_FILE_MAX_AGE
+) -> List[str]:
+    """Removes the temporary files of `directory` left by processes that are
+    no longer running, e.g. killed while downloading.
+
+    Directories may be shared by hosts, e.g. network volumes mounted by
+    several machines or containers, whose processes can't be probed. The
+    files of other hosts are only removed once unchanged for `max_age`
+    seconds.
+
+    :param directory: The directory
+    :param max_age: Seconds without changes after which a file of another
+        host is removed
+    :return: The paths of the files removed
+    """
+    removed = []
+    now = time.time()
+    for entry in os.scandir(directory):
+        match = _partial_file.match(entry.name)
+        if match is None:
+            continue
+        host, pid = match.group(1), int(match.group(2))
+        try:
+            if host == _get_host():
+                if _is_running(pid):
+                    continue
+            elif now - entry.stat().st_mtime < max_age:
+                continue
+            os.remove(entry.path)
+        except FileNotFoundError:
+            continue
+        removed.append(entry.path)
+    return removed
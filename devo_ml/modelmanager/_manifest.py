@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import os
+
+from pathlib import Path
+from typing import Any, Iterable, List, Union
+
+from .engines import _aware_engines, infer_engine
+from .error import ModelManagerError
+
+
+#: A directory of model files, a JSON manifest file or the entries of a
+#: manifest.
+ManifestSource = Union[str, Path, Iterable[dict]]
+
+
+def read_manifest(source: ManifestSource) -> List[dict]:
+    """Reads the models to register from a directory or a manifest.
+
+    Every file of a directory, except hidden ones, is a model named after the
+    file. A manifest is a JSON list of entries, or an object with the list in
+    ``models``, with the keys ``file``, and optionally ``name``, ``engine``,
+    ``description`` and ``force``. Relative files are relative to the
+    manifest. Engines not given are inferred from the files, see
+    :func:`infer_engine <devo_ml.modelmanager.engines.infer_engine>`.
+
+    :param source: The directory, the manifest file or the entries
+    :raises ModelManagerError: If the manifest is not valid
+    :return: The entries with the keys ``name``, ``file``, ``engine``,
+        ``None`` if unknown, ``description`` and ``force``
+    """
+    base = os.getcwd()
+    entries: Any
+    if isinstance(source, (str, os.PathLike)):
+        path = os.path.abspath(os.path.expanduser(source))
+        if os.path.isdir(path):
+            entries = [
+                {"file": entry.path}
+                for entry in sorted(os.scandir(path), key=lambda e: e.name)
+                if entry.is_file() and not entry.name.startswith(".")
+            ]
+        else:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except ValueError as e:
+                raise ModelManagerError(msg=f"Invalid manifest: {e}") from e
+            if isinstance(entries, dict):
+                entries = entries.get("models")
+            base = os.path.dirname(path)
+    else:
+        entries = list(source)
+    if not isinstance(entries, list):
+        raise ModelManagerError(msg="Invalid manifest: no list of models")
+    models = [_read_entry(entry, base) for entry in entries]
+    names = set()
+    for model in models:
+        if model["name"] in names:
+            raise ModelManagerError(
+                msg=f"Invalid manifest: duplicated model '{model['name']}'"
+            )
+        names.add(model["name"])
+    return models
+
+
+def _read_entry(entry: Any, base: str) -> dict:
+    if not isinstance(entry, dict) or not entry.get("file"):
+        raise ModelManagerError(msg=f"Invalid manifest entry: {entry!r}")
+    file = os.path.join(base, os.path.expanduser(str(entry["file"])))
+    return {
+        "name": entry.get("name") or _get_model_name(file),
+        "file": file,
+        "engine": entry.get("engine") or infer_engine(file),
+        "description": entry.get("description"),
+        "force": entry.get("force"),
+    }
+
+
+def _get_model_name(file: str) -> str:
+    # The engine code hinted before the extension is not part of the name
+    stem = os.path.splitext(os.path.basename(file))[0]
+    name, hint = os.path.splitext(stem)
+    return name if hint[1:].upper() in _aware_engines else stem
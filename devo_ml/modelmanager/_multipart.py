@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+
+from typing import BinaryIO, List, Sequence, Tuple, Union
+
+
+class MultipartEncoder:
+    """A ``multipart/form-data`` body read in pieces.
+
+    The body is a file-like object with a known length, so
+    :doc:`Requests <requests:index>` sends it with a ``Content-Length`` reading
+    it piece by piece instead of building the whole body in memory. Files are
+    read from their current position up to their end.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[Tuple[str, str]] = (),
+        files: Sequence[Tuple[str, BinaryIO]] = (),
+        boundary: str = None
+    ) -> None:
+        """Creates a :class:`MultipartEncoder`.
+
+        :param fields: Pairs of name and value of the text fields
+        :param files: Pairs of name and binary file object of the file fields.
+            The file name sent is the base name of the file object name
+        :param boundary: The boundary between parts, random if not provided
+        """
+        self.boundary = boundary or os.urandom(16).hex()
+        self.len = 0
+        self._parts: List[Union[bytes, BinaryIO]] = []
+        self._current = 0
+        self._offset = 0
+        for name, value in fields:
+            self._add_bytes(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'.encode()
+            )
+        for name, file in files:
+            filename = os.path.basename(getattr(file, "name", name))
+            self._add_bytes(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"; '
+                f'filename="{filename}"\r\n\r\n'.encode()
+            )
+            self._parts.append(file)
+            self.len += os.fstat(file.fileno()).st_size - file.tell()
+            self._add_bytes(b"\r\n")
+        self._add_bytes(f"--{self.boundary}--\r\n".encode())
+
+    def _add_bytes(self, data: bytes) -> None:
+        if self._parts and isinstance(self._parts[-1], bytes):
+            self._parts[-1] += data
+        else:
+            self._parts.append(data)
+        self.len += len(data)
+
+    @property
+    def content_type(self) -> str:
+        """The value of the ``Content-Type`` header of the body.
+
+        :return: The content type with the boundary
+        """
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self.len
+
+    def read(self, size: int = -1) -> bytes:
+        """Reads the next piece of the body.
+
+        :param size: Maximum number of bytes to read, everything left if
+            negative
+        :return: The bytes read, empty when the body is exhausted
+        """
+        pieces = []
+        left = size if size is not None and size >= 0 else self.len
+        while left > 0 and self._current < len(self._parts):
+            part = self._parts[self._current]
+            if isinstance(part, bytes):
+                piece = part[self._offset:self._offset + left]
+                self._offset += len(piece)
+                if self._offset >= len(part):
+                    self._current += 1
+                    self._offset = 0
+            else:
+                piece = part.read(left)
+                if len(piece) < left:
+                    self._current += 1
+            pieces.append(piece)
+            left -= len(piece)
+        return b"".join(pieces)
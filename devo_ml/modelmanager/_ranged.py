@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, ContextManager, Iterable, List, Optional
+from typing import Tuple
+
+from .error import ModelManagerError
+from ._lock import create_partial_file, fsync_directory
+
+
+#: Minimum size in bytes of the segments of an image downloaded in parallel.
+MIN_SEGMENT_SIZE = 8 * 1024 * 1024
+
+#: Bytes written to a segment between saves of the progress of a download.
+PROGRESS_INTERVAL = 8 * 1024 * 1024
+
+#: Number of times a segment is resumed after a transfer error.
+DEFAULT_MAX_RESUMES = 5
+
+
+_unsafe_chars = re.compile(r"[^A-Za-z0-9_.-]")
+_content_range = re.compile(r"^bytes (\d+)-\d+/(\d+|\*)$")
+
+
+class ImageEndpointUnavailable(Exception):
+    """The server doesn't offer the raw image endpoint."""
+
+
+class ImageRequestRefused(Exception):
+    """The server answered a request of an image with an error, so resuming
+    the download would fail the same way.
+
+    :ivar error: The error of the server
+    """
+
+    def __init__(self, error: ModelManagerError) -> None:
+        super().__init__(str(error))
+        self.error = error
+
+
+class RangePart:
+    """A piece of an image received from the server.
+
+    :ivar start: The offset of the first byte of the body in the image
+    :ivar total: The size of the whole image, if known
+    :ivar ranged: Whether the server answered the range asked for, or the
+        whole image otherwise
+    :ivar chunks: The pieces of the body
+    """
+
+    def __init__(
+        self,
+        start: int,
+        total: Optional[int],
+        ranged: bool,
+        chunks: Iterable[bytes]
+    ) -> None:
+        self.start = start
+        self.total = total
+        self.ranged = ranged
+        self.chunks = chunks
+
+
+#: Gets the bytes of an image from an offset up to an end, excluded, or to
+#: the end of the image if ``None``.
+RangeFetcher = Callable[[int, Optional[int]], ContextManager[RangePart]]
+
+
+def parse_content_range(value: Optional[str]) -> Tuple[int, Optional[int]]:
+    """Parses the ``Content-Range`` header of a partial response.
+
+    :param value: The value of the header
+    :raises ModelManagerError: If the value is not a range of bytes
+    :return: The offset of the first byte and the size of the whole image,
+        if known
+    """
+    match = _content_range.match((value or "").strip())
+    if match is None:
+        raise ModelManagerError(msg=f"Invalid Content-Range: '{value}'")
+    start, total = match.groups()
+    return int(start), None if total == "*" else int(total)
+
+
+class _Segment:
+    __slots__ = ("start", "end", "written", "resumes")
+
+    def __init__(self, start: int, end: Optional[int], written: int = 0):
+        self.start = start
+        self.end = end
+        self.written = written
+        self.resumes = 0
+
+    @property
+    def offset(self) -> int:
+        return self.start + self.written
+
+    @property
+    def done(self) -> bool:
+        return self.end is not None and self.offset >= self.end
+
+
+class _Progress:
+    """The segments of a download and their progress, saved next to the
+    partial file so the download is resumed after an interruption."""
+
+    def __init__(self, file: Optional[str]) -> None:
+        self.file = file
+        self.size: Optional[int] = None
+        self.segments: List[_Segment] = []
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        if self.file is None:
+            return False
+        try:
+            with open(self.file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.size = state["size"]
+            self.segments = [_Segment(*s) for s in state["segments"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        return bool(self.segments)
+
+    def save(self) -> None:
+        if self.file is None:
+            return None
+        with self._lock:
+            state = {
+                "size": self.size,
+                "segments": [
+                    [s.start, s.end, s.written] for s in self.segments
+                ],
+            }
+            tmp_file = f"{self.file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_file, self.file)
+
+    def remove(self) -> None:
+        if self.file is not None and os.path.exists(self.file):
+            os.remove(self.file)
+
+
+def plan_segments(size: int, segments: int) -> List[_Segment]:
+    """Splits an image in segments of at least :const:`MIN_SEGMENT_SIZE`
+    bytes.
+
+    :param size: The size of the image
+    :param segments: The maximum number of segments
+    :return: The segments
+    """
+    if size <= 0:
+        return [_Segment(0, 0)]
+    count = max(1, min(segments, size // MIN_SEGMENT_SIZE))
+    length = -(-size // count)
+    return [
+        _Segment(start, min(start + length, size))
+        for start in range(0, size, length)
+    ]
+
+
+def download_ranges(
+    file: str,
+    fetch: RangeFetcher,
+    key: str = None,
+    size: int = None,
+    segments: int = 1,
+    max_resumes: int = DEFAULT_MAX_RESUMES
+) -> None:
+    """Downloads an image to a file in ranges, resuming after transfer
+    errors, and in parallel segments if the server supports ranges.
+
+    With `key` the partial file and the progress are kept next to the file
+    after a failure, so a later download of the same image resumes where it
+    stopped.
+
+    :param file: The file to write
+    :param fetch: Gets the bytes of a range of the image
+    :param key: The key of the image content, see :func:`get_image_key
+        <devo_ml.modelmanager.cache.get_image_key>`
+    :param size: The expected size of the image, if known
+    :param segments: The maximum number of segments downloaded in parallel
+    :param max_resumes: The number of times a segment is resumed
+    :raises ImageEndpointUnavailable: If the server doesn't offer the image
+    :raises ImageRequestRefused: If the server answers with an error
+    :raises ModelManagerError: If the image can't be downloaded
+    """
+    directory, name = os.path.split(file)
+    if key is None:
+        fd, partial_file = create_partial_file(directory)
+        os.close(fd)
+        progress = _Progress(None)
+    else:
+        partial_file = os.path.join(
+            directory,
+            f".{name}.{_unsafe_chars.sub('_', key)}.download"
+        )
+        progress = _Progress(f"{partial_file}.json")
+    resumed = os.path.exists(partial_file) and progress.load()
+    try:
+        if not resumed:
+            _start(partial_file, fetch, progress, size, segments)
+        _download_segments(partial_file, fetch, progress, max_resumes)
+        if (
+            progress.size is not None
+            and os.path.getsize(partial_file) != progress.size
+        ):
+            raise ModelManagerError(msg="Incomplete image")
+    except BaseException as e:
+        if key is None or isinstance(e, ImageEndpointUnavailable):
+            progress.remove()
+            os.remove(partial_file)
+        else:
+            progress.save()
+        raise
+    with open(partial_file, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(partial_file, file)
+    progress.remove()
+    fsync_directory(directory)
+
+
+def _start(
+    partial_file: str,
+    fetch: RangeFetcher,
+    progress: _Progress,
+    size: Optional[int],
+    segments: int
+) -> None:
+    # The first segment tells whether the server supports ranges and the
+    # size of the image before the others are started
+    planned = plan_segments(size, segments) if size and segments > 1 else []
+    first_end = planned[0].end if len(planned) > 1 else None
+    with open(partial_file, "wb"):
+        pass
+    with fetch(0, first_end) as part:
+        progress.size = part.total
+        if part.ranged and part.total is not None and first_end is not None:
+            progress.segments = plan_segments(part.total, segments)
+        else:
+            progress.segments = [_Segment(0, part.total)]
+        with open(partial_file, "r+b") as f:
+            if progress.size:
+                f.truncate(progress.size)
+            try:
+                _write_part(f, progress.segments[0], part, progress)
+            except ModelManagerError:
+                # Resumed with the rest of the segments
+                progress.segments[0].resumes += 1
+            else:
+                _complete(progress.segments[0], progress)
+    progress.save()
+
+
+def _download_segments(
+    partial_file: str,
+    fetch: RangeFetcher,
+    progress: _Progress,
+    max_resumes: int
+) -> None:
+    pending = [s for s in progress.segments if not s.done]
+    if not pending:
+        return None
+
+    def download(segment: _Segment) -> None:
+        _download_segment(partial_file, fetch, segment, progress, max_resumes)
+
+    if len(pending) == 1:
+        return download(pending[0])
+    with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+        for future in [executor.submit(download, s) for s in pending]:
+            future.result()
+
+
+def _download_segment(
+    partial_file: str,
+    fetch: RangeFetcher,
+    segment: _Segment,
+    progress: _Progress,
+    max_resumes: int
+) -> None:
+    # Only transfer errors are resumed, those of the server are raised by
+    # the fetch as ImageRequestRefused
+    with open(partial_file, "r+b") as f:
+        while not segment.done:
+            written = segment.written
+            try:
+                with fetch(segment.offset, segment.end) as part:
+                    if part.start != segment.offset:
+                        # The server sent the whole image, start over
+                        if len(progress.segments) > 1:
+                            raise ModelManagerError(
+                                msg="Ranges not supported"
+                            )
+                        segment.written = written = 0
+                    _write_part(f, segment, part, progress)
+                _complete(segment, progress)
+                if segment.written > written:
+                    continue
+                error = ModelManagerError(msg="Incomplete image")
+            except ImageEndpointUnavailable:
+                raise
+            except ModelManagerError as e:
+                error = e
+            segment.resumes += 1
+            if segment.resumes > max_resumes:
+                raise error
+
+
+def _complete(segment: _Segment, progress: _Progress) -> None:
+    # A segment up to the end of an image of unknown size ends with the body
+    if segment.end is None:
+        segment.end = segment.offset
+        if len(progress.segments) == 1:
+            progress.size = segment.end
+
+
+def _write_part(
+    f: Any,
+    segment: _Segment,
+    part: RangePart,
+    progress: _Progress
+) -> None:
+    f.seek(segment.offset)
+    unsaved = 0
+    for chunk in part.chunks:
+        if segment.end is not None:
+            chunk = chunk[:segment.end - segment.offset]
+        f.write(chunk)
+        segment.written += len(chunk)
+        unsaved += len(chunk)
+        if unsaved >= PROGRESS_INTERVAL:
+            f.flush()
+            progress.save()
+            unsaved = 0
+        if segment.done:
+            break
+    f.flush()
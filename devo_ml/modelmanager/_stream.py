@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import codecs
+import json
+import re
+import time
+import zlib
+
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Iterator, List
+from typing import Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    from ._multipart import MultipartEncoder
+
+
+_whitespace = re.compile(r"\s+")
+
+
+class Base64StreamDecoder:
+    """Decodes a base 64 text given in arbitrary pieces.
+
+    Only complete quantums of four characters are decoded on every feed, the
+    rest is kept until the next one, so the memory used is bounded by the size
+    of the pieces fed.
+    """
+
+    def __init__(self, sink: Callable[[bytes], Any]) -> None:
+        """Creates a :class:`Base64StreamDecoder`.
+
+        :param sink: Callable receiving the decoded bytes
+        """
+        self.sink = sink
+        self._pending = ""
+
+    def feed(self, text: str) -> None:
+        """Decodes a piece of base 64 text.
+
+        :param text: The base 64 text. White spaces are ignored
+        :raises ValueError: If the text is not valid base 64
+        """
+        if _has_whitespace(text):
+            text = _whitespace.sub("", text)
+        text = self._pending + text
+        size = len(text) - len(text) % 4
+        self._pending = text[size:]
+        if size:
+            self._decode(text[:size])
+
+    def close(self) -> None:
+        """Decodes any pending text.
+
+        :raises ValueError: If the pending text is not valid base 64
+        """
+        text, self._pending = self._pending, ""
+        if text:
+            self._decode(text)
+
+    def _decode(self, text: str) -> None:
+        try:
+            self.sink(base64.b64decode(text))
+        except binascii.Error as e:
+            raise ValueError("Invalid image") from e
+
+
+def _has_whitespace(text: str) -> bool:
+    # Much faster than a regex on long texts without any white space
+    return " " in text or "\n" in text or "\r" in text or "\t" in text
+
+
+def _find_string_stop(text: str, start: int) -> int:
+    quote = text.find('"', start)
+    escape = text.find("\\", start, quote if quote >= 0 else len(text))
+    return escape if escape >= 0 else quote
+
+
+class _Frame:
+    """A JSON container being scanned."""
+
+    __slots__ = ("is_object", "key", "expect_key")
+
+    def __init__(self, is_object: bool) -> None:
+        self.is_object = is_object
+        self.key: Optional[str] = None
+        self.expect_key = is_object
+
+
+class JsonStringExtractor:
+    """Scans a JSON document given in pieces diverting the content of one
+    string value to a sink.
+
+    The target string is located by the path of object keys leading to it,
+    e.g. ``("image", "image")`` for ``{"image": {"image": "<target>"}}``. Its
+    content is never kept in memory, the rest of the document is kept with the
+    target replaced by an empty string and decoded on :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        path: Sequence[str],
+        sink: Callable[[str], Any],
+        encoding: str = "utf-8"
+    ) -> None:
+        """Creates a :class:`JsonStringExtractor`.
+
+        :param path: The path of object keys to the target string
+        :param sink: Callable receiving the pieces of the target string,
+            already unescaped
+        :param encoding: The encoding of the document bytes
+        """
+        self.path = tuple(path)
+        self.sink = sink
+        self.found = False
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._skeleton: List[str] = []
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._is_key = False
+        self._is_target = False
+        self._key: List[str] = []
+        self._escape: Optional[str] = None
+
+    def feed(self, data: bytes) -> None:
+        """Scans a piece of the document.
+
+        :param data: The bytes of the piece
+        """
+        self._scan(self._decoder.decode(data))
+
+    def close(self) -> Any:
+        """Finishes the scanning.
+
+        :raises ValueError: If the document is not valid JSON
+        :return: The decoded document without the target string content or
+            ``None`` if the document is empty
+        """
+        self._scan(self._decoder.decode(b"", final=True))
+        document = "".join(self._skeleton)
+        if not document.strip():
+            return None
+        return json.loads(document)
+
+    def _scan(self, text: str) -> None:
+        i = 0
+        size = len(text)
+        while i < size:
+            if self._in_string:
+                i = self._scan_string(text, i)
+                continue
+            c = text[i]
+            self._skeleton.append(c)
+            i += 1
+            if c == '"':
+                self._start_string()
+            elif c == "{" or c == "[":
+                self._stack.append(_Frame(c == "{"))
+            elif c == "}" or c == "]":
+                if self._stack:
+                    self._stack.pop()
+            elif c == "," and self._stack and self._stack[-1].is_object:
+                self._stack[-1].expect_key = True
+
+    def _start_string(self) -> None:
+        self._in_string = True
+        top = self._stack[-1] if self._stack else None
+        self._is_key = bool(top and top.expect_key)
+        self._is_target = (
+            not self._is_key
+            and len(self._stack) == len(self.path)
+            and all(
+                frame.is_object and frame.key == key
+                for frame, key in zip(self._stack, self.path)
+            )
+        )
+        if self._is_target:
+            self.found = True
+        self._key = []
+
+    def _scan_string(self, text: str, i: int) -> int:
+        if self._escape is not None:
+            return self._scan_escape(text, i)
+        stop = _find_string_stop(text, i)
+        end = stop if stop >= 0 else len(text)
+        self._emit(text[i:end])
+        if stop < 0:
+            return end
+        if text[end] == "\\":
+            self._escape = ""
+            return end + 1
+        self._end_string()
+        return end + 1
+
+    def _scan_escape(self, text: str, i: int) -> int:
+        # Escapes are kept apart until complete, they may be split in pieces
+        escape = self._escape or ""
+        while i < len(text):
+            escape += text[i]
+            i += 1
+            if escape[0] != "u" or len(escape) == 5:
+                self._escape = None
+                if self._is_target:
+                    self.sink(json.loads(f'"\\{escape}"'))
+                else:
+                    self._emit(f"\\{escape}")
+                return i
+        self._escape = escape
+        return i
+
+    def _emit(self, text: str) -> None:
+        if not text:
+            return
+        if self._is_target:
+            self.sink(text)
+            return
+        self._skeleton.append(text)
+        if self._is_key:
+            self._key.append(text)
+
+    def _end_string(self) -> None:
+        self._skeleton.append('"')
+        self._in_string = False
+        if self._is_key:
+            top = self._stack[-1]
+            top.key = json.loads(f'"{"".join(self._key)}"')
+            top.expect_key = False
+        self._is_key = False
+        self._is_target = False
+
+
+class JsonArrayDecoder:
+    """Decodes the items of a JSON array given in pieces.
+
+    Every item is decoded as soon as it is complete, so the memory used is
+    bounded by the size of the largest item and the pieces fed rather than by
+    the size of the array.
+    """
+
+    def __init__(self, encoding: str = "utf-8") -> None:
+        """Creates a :class:`JsonArrayDecoder`.
+
+        :param encoding: The encoding of the document bytes
+        """
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+        self._expect_item = False
+        self._first = False
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Decodes a piece of the document.
+
+        :param data: The bytes of the piece
+        :raises ValueError: If the document is not a JSON array
+        :return: The items completed by the piece
+        """
+        return self._decode(self._decoder.decode(data))
+
+    def close(self) -> List[Any]:
+        """Finishes the decoding.
+
+        :raises ValueError: If the document is not a complete JSON array
+        :return: The items completed on finishing
+        """
+        items = self._decode(self._decoder.decode(b"", final=True))
+        if self._buffer or (self._started and not self._finished):
+            raise ValueError("Incomplete JSON array")
+        return items
+
+    def _decode(self, text: str) -> List[Any]:
+        buffer = self._buffer + text
+        size = len(buffer)
+        i = _skip_whitespace(buffer, 0)
+        items = []
+        while not self._finished and i < size:
+            char = buffer[i]
+            if not self._started:
+                if char != "[":
+                    raise ValueError("Expecting a JSON array")
+                self._started = True
+                self._expect_item = True
+                self._first = True
+            elif char == "]" and (not self._expect_item or self._first):
+                self._finished = True
+            elif self._expect_item:
+                try:
+                    item, end = self._json.raw_decode(buffer, i)
+                except json.JSONDecodeError:
+                    break
+                # A value at the end may be cut, e.g. a number, wait for more
+                if end >= size:
+                    break
+                items.append(item)
+                self._expect_item = False
+                self._first = False
+                i = _skip_whitespace(buffer, end)
+                continue
+            elif char == ",":
+                self._expect_item = True
+            else:
+                raise ValueError(f"Expecting ',' or ']' at {char!r}")
+            i = _skip_whitespace(buffer, i + 1)
+        if self._finished and i < size:
+            raise ValueError("Extra data after the JSON array")
+        self._buffer = buffer[i:]
+        return items
+
+
+def _skip_whitespace(text: str, start: int) -> int:
+    size = len(text)
+    while start < size and text[start] in " \t\n\r":
+        start += 1
+    return start
+
+
+class GzipEncoder:
+    """Compresses a file-like body with gzip while it is read.
+
+    The compressed body has no known length, so :doc:`Requests
+    <requests:index>` sends it with chunked transfer encoding. The sizes of
+    the body before and after compression and the time spent compressing are
+    counted as it is read.
+    """
+
+    def __init__(
+        self,
+        source: Union[BinaryIO, MultipartEncoder],
+        level: int = 6,
+        chunk_size: int = 64 * 1024
+    ) -> None:
+        """Creates a :class:`GzipEncoder`.
+
+        :param source: The body to compress, read up to its end
+        :param level: The compression level, from 1, fastest, to 9, smallest
+        :param chunk_size: The size in bytes of the pieces read from the
+            source
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.compression_time = 0.0
+        # A window of 31 bits writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        self._pending = b""
+        self._finished = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            piece = self.read(self.chunk_size)
+            if not piece:
+                return None
+            yield piece
+
+    def read(self, size: int = -1) -> bytes:
+        """Reads the next piece of the compressed body.
+
+        :param size: Maximum number of bytes to read, everything left if
+            negative
+        :return: The bytes read, empty when the body is exhausted
+        """
+        unbounded = size is None or size < 0
+        while not self._finished and (
+            unbounded or len(self._pending) < size
+        ):
+            data = self.source.read(self.chunk_size)
+            start = time.perf_counter()
+            if data:
+                self.bytes_read += len(data)
+                self._pending += self._compressor.compress(data)
+            else:
+                self._pending += self._compressor.flush()
+                self._finished = True
+            self.compression_time += time.perf_counter() - start
+        if unbounded:
+            piece, self._pending = self._pending, b""
+        else:
+            piece, self._pending = self._pending[:size], self._pending[size:]
+        self.bytes_written += len(piece)
+        return piece
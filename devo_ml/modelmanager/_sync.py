@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import os
+
+from typing import Dict, Optional
+
+from .downloader import write_file_atomically
+
+
+#: The fields of the models listed to sync a directory.
+SYNC_FIELDS = (
+    "name", "engine", "image.id", "image.size", "image.checksum",
+    "image.sha256", "image.md5"
+)
+
+#: The manifest of the models synced in a directory, relative to it.
+SYNC_MANIFEST = os.path.join(".modelmanager", "sync.json")
+
+
+def read_sync_manifest(path: str) -> Dict[str, dict]:
+    """Reads the models synced in a directory.
+
+    :param path: The directory
+    :return: The file name and image key of the models by name. Empty if the
+        directory was never synced or the manifest is not valid
+    """
+    file = os.path.join(path, SYNC_MANIFEST)
+    try:
+        with open(file, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(entries, dict):
+        return {}
+    return {
+        name: {
+            # Only files of the directory, whatever the manifest says
+            "file": os.path.basename(str(entry["file"])),
+            "key": entry.get("key"),
+        }
+        for name, entry in entries.items()
+        if isinstance(entry, dict) and entry.get("file")
+    }
+
+
+def write_sync_manifest(path: str, entries: Dict[str, dict]) -> None:
+    """Writes the models synced in a directory.
+
+    :param path: The directory
+    :param entries: The file name and image key of the models by name
+    :return: Nothing
+    """
+    file = os.path.join(path, SYNC_MANIFEST)
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    write_file_atomically(file, json.dumps(entries, sort_keys=True).encode())
+
+
+def is_synced(entry: Optional[dict], file: str, key: Optional[str]) -> bool:
+    """Whether the file of a model synced is up to date.
+
+    :param entry: The entry of the model in the manifest, if any
+    :param file: The path of the file of the model
+    :param key: The key of the image of the model in the server
+    :return: ``True`` if the file has the image of the server
+    """
+    return (
+        entry is not None
+        and key is not None
+        and entry["key"] == key
+        and entry["file"] == os.path.basename(file)
+        and os.path.exists(file)
+    )
+
+
+def remove_synced_file(path: str, entry: dict) -> None:
+    """Removes the file of a model synced, if still there.
+
+    :param path: The directory
+    :param entry: The entry of the model in the manifest
+    :return: Nothing
+    """
+    try:
+        os.remove(os.path.join(path, entry["file"]))
+    except FileNotFoundError:
+        pass
@@ -4,16 +4,33 @@ library wrapper.
 
 from __future__ import annotations
 
-import requests
+import functools
+import threading
+import time
 
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional
 
 from .auth import AuthCallable
 from .error import ModelManagerError
+from .metrics import ClientMetrics, RequestEvent, RequestHook, emit
+from .retry import RetryPolicy
+from ._stream import GzipEncoder
+
+if TYPE_CHECKING:
+    import requests
 
 
 valid_methods = ["get", "post", "patch", "put", "delete"]
 
+#: Default number of per-host connection pools kept by an :class:`Api`.
+DEFAULT_POOL_CONNECTIONS = 10
+
+#: Default maximum number of connections kept alive per host.
+DEFAULT_POOL_MAXSIZE = 10
+
+#: Default size in bytes of the pieces read from streamed responses.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
 
 def decode_response(response: requests.Response) -> Any:
     """Decodes a requests response to json.
@@ -21,6 +38,8 @@ def decode_response(response: requests.Response) -> Any:
     :param response: The requests response
     :return: A decoded response or None if any decode error.
     """
+    import requests
+
     try:
         return response.json()
     except requests.exceptions.JSONDecodeError:
@@ -50,49 +69,310 @@ def validate_or_raise_error(status_code: int, response: Any) -> None:
     raise ModelManagerError(code=0, msg="Unexpected error")
 
 
+def get_accept_encoding(compression: bool = True) -> str:
+    """Gets the value of the ``Accept-Encoding`` header of the calls.
+
+    :param compression: Whether to accept compressed responses
+    :return: The encodings supported by ``urllib3``, or ``identity`` without
+        compression
+    """
+    if not compression:
+        return "identity"
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    return ACCEPT_ENCODING
+
+
+def iter_response_content(
+    response: requests.Response,
+    chunk_size: int = None
+) -> Iterator[bytes]:
+    """Iterates over the body of a streamed response.
+
+    :param response: The requests response, requested with ``stream=True``
+    :param chunk_size: The size in bytes of the pieces to read,
+        :const:`DEFAULT_CHUNK_SIZE` if not provided
+    :raises ModelManagerError: if any
+        :exc:`RequestException <requests.exceptions.RequestException>` while
+        reading.
+    :return: An iterator over the pieces of the body
+    """
+    import requests
+
+    try:
+        yield from response.iter_content(chunk_size or DEFAULT_CHUNK_SIZE)
+    except requests.exceptions.RequestException as e:
+        raise ModelManagerError(msg=str(e)) from e
+
+
+def _get_body_size(body: Any) -> int:
+    if body is None:
+        return 0
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+def _create_event(
+    response: requests.Response,
+    method: str,
+    operation: Optional[str],
+    phase: Optional[str],
+    attempt: int,
+    elapsed: float,
+    stream: bool
+) -> RequestEvent:
+    ttfb = min(elapsed, response.elapsed.total_seconds())
+    if stream:
+        received = int(response.headers.get("Content-Length") or 0)
+        content_received = received
+    else:
+        content_received = len(response.content or b"")
+        received = _get_received_size(response, content_received)
+    body = response.request.body
+    if isinstance(body, GzipEncoder):
+        sent = body.bytes_written
+        content_sent = body.bytes_read
+        compression_time = body.compression_time
+    else:
+        sent = content_sent = _get_body_size(body)
+        compression_time = 0
+    return RequestEvent(
+        operation,
+        phase,
+        method,
+        response.url or "",
+        attempt=attempt,
+        status=response.status_code,
+        elapsed=elapsed,
+        ttfb=ttfb,
+        transfer=0 if stream else elapsed - ttfb,
+        bytes_sent=sent,
+        bytes_received=received,
+        content_bytes_sent=content_sent,
+        content_bytes_received=content_received,
+        compression_time=compression_time
+    )
+
+
+def _get_received_size(response: requests.Response, content: int) -> int:
+    if not response.headers.get("Content-Encoding"):
+        return content
+    # The raw response counts the bytes read before decompressing them
+    try:
+        return int(response.raw.tell()) or content
+    except (AttributeError, TypeError, ValueError):
+        return content
+
+
 class Api:
-    """Low level api calls based on :doc:`Requests <requests:index>` lib."""
+    """Low level api calls based on :doc:`Requests <requests:index>` lib.
+
+    Every :class:`Api` owns a :class:`requests.Session` whose connections are
+    kept alive and reused between calls, so consecutive calls to the same
+    server don't pay a new TCP connection and TLS handshake each time. Call
+    :meth:`close` (or use the object as a context manager) to release them.
+    """
 
     def __init__(self, auth: AuthCallable = None, **kwargs):
         """Creates a :class:`Api`.
 
+        Besides the options to the underlying requests, these keywords
+        configure the connection pool:
+
+            * `pool_connections`: number of per-host pools to cache.
+            * `pool_maxsize`: maximum number of connections kept per host.
+            * `pool_block`: whether to wait for a free connection when the
+              pool of a host is exhausted instead of opening a new one.
+            * `idle_timeout`: seconds after which idle connections are
+              dropped before the next call. Never dropped if not provided.
+            * `retry`: the :class:`RetryPolicy
+              <devo_ml.modelmanager.retry.RetryPolicy>` of the calls failed
+              by transient errors. Calls are not retried if not provided.
+            * `metrics`: a :class:`ClientMetrics
+              <devo_ml.modelmanager.metrics.ClientMetrics>` to aggregate the
+              calls in. It is added to the hooks of the calls.
+            * `hooks`: callables called with the :class:`RequestEvent
+              <devo_ml.modelmanager.metrics.RequestEvent>` of every call.
+            * `compression`: whether to accept compressed responses, with
+              every encoding supported by ``urllib3``, ``gzip`` and
+              ``deflate`` at least. Compressed responses are decompressed
+              while they are read, streamed ones included. ``True`` if not
+              provided; disable it where the network is faster than
+              decompressing.
+
         :param auth: The authentication to use
         :param kwargs: Options to the underlying requests
         """
         self.auth = auth
         self.timeout = kwargs.pop("timeout", None) or 30
+        self.pool_connections = (
+            kwargs.pop("pool_connections", None) or DEFAULT_POOL_CONNECTIONS
+        )
+        self.pool_maxsize = (
+            kwargs.pop("pool_maxsize", None) or DEFAULT_POOL_MAXSIZE
+        )
+        self.pool_block = bool(kwargs.pop("pool_block", None))
+        self.idle_timeout = kwargs.pop("idle_timeout", None)
+        self.retry: Optional[RetryPolicy] = kwargs.pop("retry", None)
+        self.metrics: Optional[ClientMetrics] = kwargs.pop("metrics", None)
+        self.hooks: List[RequestHook] = list(kwargs.pop("hooks", None) or [])
+        compression = kwargs.pop("compression", None)
+        self.compression = True if compression is None else bool(compression)
+        if self.metrics is not None:
+            self.hooks.append(self.metrics)
         self.request_options = kwargs
         self._http_method = "get"
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._last_used = time.monotonic()
 
     def __getattr__(self, attr):
-        """Saves method to call if `attr` is a valid method. Otherwise,
-        built-in followed.
+        """Returns the object bound to method `attr` if it is a valid method.
+        Otherwise, built-in followed.
+
+        The method is bound to the returned call, not saved in the object, so
+        the same :class:`Api` can be safely shared by several threads.
 
         :param attr: The attribute name to get
-        :return: The object itself or the attribute value
+        :return: The call with the method or the attribute value
         """
         if attr not in valid_methods:
             return super().__getattr__(attr)
-        self._http_method = attr
-        return self
+        return functools.partial(self, method=attr)
 
-    def __call__(self, endpoint: str, **kwargs) -> Any:
+    def __call__(self, endpoint: str, method: str = None, **kwargs) -> Any:
         """Call to an endpoint.
 
+        If the call is made with ``stream=True`` the body of a successful
+        response is not read and the response itself is returned, use it as
+        a context manager to release the connection when done.
+
         :param endpoint: The endpoint to call
+        :param method: The HTTP method, ``get`` if not provided
         :param kwargs: Custom options to the underlying requests for this call
-        :return: The decoded response
+        :return: The decoded response or the response when streaming
         """
-        response = self.request(endpoint, **kwargs)
-        decoded_response = decode_response(response)
+        response = self.request(endpoint, method=method, **kwargs)
+        if kwargs.get("stream") and 200 <= response.status_code < 300:
+            return response
+        with response:
+            decoded_response = decode_response(response)
         validate_or_raise_error(response.status_code, decoded_response)
         return decoded_response
 
-    def request(self, endpoint: str, **kwargs) -> requests.Response:
+    def __enter__(self) -> Api:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def session(self) -> requests.Session:
+        """The :class:`requests.Session` used to perform the calls.
+
+        It is created on first use with an adapter configured with the pool
+        options of the :class:`Api` object.
+
+        :return: The session of the :class:`Api` object
+        """
+        with self._session_lock:
+            if self._session is None:
+                self._session = self.create_session()
+            return self._session
+
+    def create_session(self) -> requests.Session:
+        """Creates a :class:`requests.Session` with pooled connections.
+
+        :return: A new session
+        """
+        import requests
+
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Accept-Encoding"] = get_accept_encoding(
+            self.compression
+        )
+        return session
+
+    def close(self) -> None:
+        """Closes the session and all its pooled connections.
+
+        The :class:`Api` object remains usable, a new session will be created
+        on the next call.
+
+        :return: Nothing
+        """
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def prune_idle_connections(self) -> None:
+        """Drops the pooled connections if they have been idle for longer than
+        `idle_timeout` seconds.
+
+        :return: Nothing
+        """
+        now = time.monotonic()
+        idle = now - self._last_used
+        self._last_used = now
+        if self.idle_timeout is None or idle <= self.idle_timeout:
+            return None
+        with self._session_lock:
+            if self._session is not None:
+                # Pools are recreated on demand after clearing them
+                self._session.close()
+
+    def add_hook(self, hook: RequestHook) -> None:
+        """Adds a hook called with the :class:`RequestEvent
+        <devo_ml.modelmanager.metrics.RequestEvent>` of every call.
+
+        :param hook: The hook
+        :return: Nothing
+        """
+        self.hooks = [*self.hooks, hook]
+
+    def remove_hook(self, hook: RequestHook) -> None:
+        """Removes a hook, if added.
+
+        :param hook: The hook
+        :return: Nothing
+        """
+        self.hooks = [h for h in self.hooks if h != hook]
+
+    def request(
+        self,
+        endpoint: str,
+        method: str = None,
+        idempotent: bool = None,
+        operation: str = None,
+        phase: str = None,
+        **kwargs
+    ) -> requests.Response:
         """Wraps a requests call to catch any error in :exc:`ModelManagerError
         <devo_ml.modelmanager.error.ModelManagerError>`.
 
+        The call is retried according to the `retry` policy of the
+        :class:`Api` object, if any. Calls sending a file-like body are never
+        retried as the body can't be sent again.
+
         :param endpoint: The endpoint to request
+        :param method: The HTTP method, ``get`` if not provided
+        :param idempotent: Whether the call is safe to retry whatever its
+            method. Inferred from the method if not provided
+        :param operation: The kind of endpoint called, reported to the hooks
+        :param phase: The step of a client operation the call is part of,
+            reported to the hooks
         :param kwargs: Custom options to the underlying requests for this
             request. Will be merged with the options of the :class:`Api`
             object.
@@ -100,18 +380,68 @@ class Api:
             :exc:`RequestException <requests.exceptions.RequestException>`.
         :return: Request response
         """
-        try:
-            options = self.build_request_options(**kwargs)
-            return requests.request(self._http_method, endpoint, **options)
-        except requests.exceptions.RequestException as e:
-            raise ModelManagerError(msg=str(e)) from e
+        import requests
+
+        method = method or self._http_method
+        options = self.build_request_options(**kwargs)
+        retry = self.retry
+        if hasattr(options.get("data"), "read"):
+            retry = None
+        attempt = 0
+        while True:
+            attempt += 1
+            hooks = self.hooks
+            start = time.perf_counter()
+            try:
+                self.prune_idle_connections()
+                response = self.session.request(method, endpoint, **options)
+            except requests.exceptions.RequestException as e:
+                if hooks:
+                    emit(hooks, RequestEvent(
+                        operation,
+                        phase,
+                        method,
+                        endpoint,
+                        attempt=attempt,
+                        elapsed=time.perf_counter() - start,
+                        error=e
+                    ))
+                if (
+                    retry is None
+                    or not retry.is_retryable_error(e)
+                    or not retry.can_retry(method, attempt, idempotent)
+                ):
+                    raise ModelManagerError(msg=str(e)) from e
+                retry.sleep(retry.get_backoff(attempt))
+                continue
+            if hooks:
+                emit(hooks, _create_event(
+                    response,
+                    method,
+                    operation,
+                    phase,
+                    attempt,
+                    time.perf_counter() - start,
+                    bool(options.get("stream"))
+                ))
+            if (
+                retry is None
+                or not retry.is_retryable_response(response)
+                or not retry.can_retry(method, attempt, idempotent)
+            ):
+                return response
+            delay = retry.get_delay(attempt, response)
+            if delay is None:
+                return response
+            response.close()
+            retry.sleep(delay)
 
     def build_request_options(self, **kwargs) -> dict:
         """Builds the options for a request by merging the :class:`Api` object
         request options with the options provided.
 
         The options provided take precedence over the options in the
-        :class:`Api` object.
+        :class:`Api` object, except for headers which are merged.
 
         :param kwargs: Custom request options
         :return: Merged request options
@@ -119,5 +449,7 @@ class Api:
         timeout = kwargs.pop("timeout", self.timeout)
         auth = kwargs.pop("auth", self.auth)
         options = {**self.request_options}
+        if "headers" in kwargs and options.get("headers"):
+            kwargs["headers"] = {**options["headers"], **kwargs["headers"]}
         options.update(auth=auth, timeout=timeout, **kwargs)
         return options
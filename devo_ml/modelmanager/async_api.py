@@ -0,0 +1,503 @@
+"""Low-level HTTP API Rest access for :mod:`asyncio` applications.
+
+HTTP/1.1 is spoken directly over :mod:`asyncio` streams, requests are prepared
+with the :doc:`Requests <requests:index>` library so options and
+authentications behave as in :class:`Api <devo_ml.modelmanager.api.Api>`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import ssl
+import time
+import zlib
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from requests.structures import CaseInsensitiveDict
+from requests.utils import default_headers, get_environ_proxies
+from requests.utils import select_proxy
+
+from .api import DEFAULT_CHUNK_SIZE, DEFAULT_POOL_MAXSIZE
+from .api import valid_methods, validate_or_raise_error
+from .auth import AuthCallable
+from .error import ModelManagerError
+
+
+_Origin = Tuple[str, str, int]
+
+
+class _ConnectionClosed(ModelManagerError):
+    """The server closed the connection before responding."""
+
+
+class _Connection:
+    """A connection to an origin server."""
+
+    def __init__(
+        self,
+        origin: _Origin,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        self.origin = origin
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncResponse:
+    """A response of an :class:`AsyncApi` call.
+
+    The body is read on demand. Use it as an asynchronous context manager, or
+    read its whole body, to give back its connection to the pool.
+    """
+
+    def __init__(
+        self,
+        api: AsyncApi,
+        connection: _Connection,
+        status_code: int,
+        headers: CaseInsensitiveDict,
+        has_body: bool
+    ) -> None:
+        """Creates an :class:`AsyncResponse`.
+
+        :param api: The api that made the call
+        :param connection: The connection the body is read from
+        :param status_code: The HTTP status code
+        :param headers: The HTTP headers
+        :param has_body: Whether the response has a body
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self._api = api
+        self._connection: Optional[_Connection] = connection
+        self._left = 0 if not has_body else None
+        self._chunked = (
+            has_body
+            and "chunked" in headers.get("Transfer-Encoding", "").lower()
+        )
+        if has_body and not self._chunked and "Content-Length" in headers:
+            self._left = int(headers["Content-Length"])
+        encoding = headers.get("Content-Encoding", "").lower()
+        self._decompressor = None
+        if encoding in ("gzip", "x-gzip"):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._decompressor = zlib.decompressobj()
+        self._keep_alive = (
+            not has_body or self._chunked or self._left is not None
+        ) and headers.get("Connection", "").lower() != "close"
+        self._done = not has_body
+
+    async def __aenter__(self) -> AsyncResponse:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.close()
+
+    async def iter_content(
+        self,
+        chunk_size: int = None
+    ) -> AsyncIterator[bytes]:
+        """Iterates over the body of the response, decompressed if the server
+        compressed it.
+
+        :param chunk_size: The maximum size in bytes of the pieces to read,
+            :const:`DEFAULT_CHUNK_SIZE
+            <devo_ml.modelmanager.api.DEFAULT_CHUNK_SIZE>` if not provided
+        :raises ModelManagerError: If any connection error while reading
+        :return: An asynchronous iterator over the pieces of the body
+        """
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        while not self._done:
+            try:
+                data = await self._api._wait(self._read_raw(chunk_size))
+            except ModelManagerError:
+                self.close()
+                raise
+            if self._decompressor is not None:
+                data = self._decompressor.decompress(data)
+                if self._done:
+                    data += self._decompressor.flush()
+            if data:
+                yield data
+        self._release()
+
+    async def read(self) -> bytes:
+        """Reads the whole body of the response.
+
+        :return: The body
+        """
+        return b"".join([data async for data in self.iter_content()])
+
+    async def json(self) -> Any:
+        """Reads and decodes the JSON body of the response.
+
+        :return: The decoded body or ``None`` if any decode error
+        """
+        try:
+            return json.loads(await self.read())
+        except ValueError:
+            return None
+
+    def close(self) -> None:
+        """Closes the response. The connection is given back to the pool if
+        the body was completely read, closed otherwise.
+
+        :return: Nothing
+        """
+        if self._connection is None:
+            return None
+        if not self._done:
+            self._keep_alive = False
+            self._done = True
+        self._release()
+
+    def _release(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._api._release(connection, self._keep_alive)
+
+    async def _read_raw(self, size: int) -> bytes:
+        assert self._connection is not None
+        reader = self._connection.reader
+        if self._chunked:
+            return await self._read_chunk(reader, size)
+        if self._left is None:
+            data = await reader.read(size)
+            self._done = not data
+            return data
+        if self._left == 0:
+            self._done = True
+            return b""
+        data = await reader.read(min(size, self._left))
+        if not data:
+            raise ModelManagerError(msg="Connection closed while reading")
+        self._left -= len(data)
+        self._done = self._left == 0
+        return data
+
+    async def _read_chunk(self, reader: asyncio.StreamReader, size: int):
+        if not self._left:
+            line = await reader.readline()
+            self._left = int(line.split(b";")[0].strip() or b"0", 16)
+            if self._left == 0:
+                # Skip trailers up to the empty line ending the body
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self._done = True
+                return b""
+        data = await reader.readexactly(min(size, self._left))
+        self._left -= len(data)
+        if self._left == 0:
+            await reader.readline()
+        return data
+
+
+class AsyncApi:
+    """Low level api calls for :mod:`asyncio` with the same interface as
+    :class:`Api <devo_ml.modelmanager.api.Api>`, but awaitable.
+
+    Connections are kept alive in a pool per host, up to `pool_maxsize`
+    concurrent connections per host. Supported options are `timeout`,
+    `headers`, `verify`, `compression` and the pool options, any other option
+    raises :exc:`TypeError`. Only ``gzip`` and ``deflate`` responses are
+    accepted with `compression`.
+
+    Unlike :class:`Api <devo_ml.modelmanager.api.Api>`, proxies and redirects
+    are not supported. Calls to an endpoint with a proxy set in the
+    environment, ``HTTP_PROXY`` or ``HTTPS_PROXY`` and not excluded by
+    ``NO_PROXY``, and responses redirecting elsewhere raise
+    :exc:`ModelManagerError <devo_ml.modelmanager.error.ModelManagerError>`.
+    """
+
+    def __init__(self, auth: AuthCallable = None, **kwargs) -> None:
+        """Creates an :class:`AsyncApi`.
+
+        :param auth: The authentication to use
+        :param kwargs: Options of the calls and the connection pool
+        """
+        self.auth = auth
+        self.timeout = kwargs.pop("timeout", None) or 30
+        self.pool_maxsize = (
+            kwargs.pop("pool_maxsize", None) or DEFAULT_POOL_MAXSIZE
+        )
+        self.idle_timeout = kwargs.pop("idle_timeout", None)
+        self.headers = kwargs.pop("headers", None) or {}
+        compression = kwargs.pop("compression", None)
+        self.compression = True if compression is None else bool(compression)
+        verify = kwargs.pop("verify", True)
+        kwargs.pop("pool_connections", None)
+        kwargs.pop("pool_block", None)
+        if kwargs:
+            raise TypeError(f"Unsupported options: {', '.join(kwargs)}")
+        self.ssl_context = ssl.create_default_context(
+            cafile=verify if isinstance(verify, str) else None
+        )
+        if verify is False:
+            self.ssl_context.check_hostname = False
+            self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._idle: Dict[_Origin, List[_Connection]] = {}
+        self._slots: Dict[_Origin, asyncio.Semaphore] = {}
+
+    def __getattr__(self, attr):
+        """Returns a coroutine function calling with method `attr` if it is a
+        valid method. Otherwise, built-in followed.
+
+        :param attr: The attribute name to get
+        :return: The call with the method or the attribute value
+        """
+        if attr not in valid_methods:
+            return super().__getattribute__(attr)
+        return functools.partial(self.call, attr)
+
+    async def __aenter__(self) -> AsyncApi:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def call(self, method: str, endpoint: str, **kwargs) -> Any:
+        """Call to an endpoint.
+
+        If the call is made with ``stream=True`` the body of a successful
+        response is not read and the :class:`AsyncResponse` is returned.
+
+        :param method: The HTTP method
+        :param endpoint: The endpoint to call
+        :param kwargs: Custom options for this call; `params`, `data`,
+            `json`, `headers` and `timeout`
+        :return: The decoded response or the response when streaming
+        """
+        stream = kwargs.pop("stream", False)
+        response = await self.request(method, endpoint, **kwargs)
+        if stream and 200 <= response.status_code < 300:
+            return response
+        async with response:
+            decoded_response = await response.json()
+        validate_or_raise_error(response.status_code, decoded_response)
+        return decoded_response
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> AsyncResponse:
+        """Sends a request and reads the head of its response.
+
+        :param method: The HTTP method
+        :param endpoint: The endpoint to request
+        :param kwargs: Custom options for this request; `params`, `data`,
+            `json`, `headers` and `timeout`, the time to wait for every write
+            of the body and for the head of the response
+        :raises ModelManagerError: If any connection error, if a proxy is set
+            for the endpoint or if the server redirects the request
+        :return: The response with its body unread
+        """
+        timeout = kwargs.pop("timeout", self.timeout)
+        prepared = self.prepare_request(method, endpoint, **kwargs)
+        proxy = select_proxy(
+            str(prepared.url),
+            get_environ_proxies(str(prepared.url))
+        )
+        if proxy:
+            raise ModelManagerError(
+                msg=f"Proxies not supported, '{proxy}' set for the URL"
+            )
+        for attempt in range(2):
+            connection = await self._acquire(str(prepared.url))
+            try:
+                response = await self._send(connection, prepared, timeout)
+            except _ConnectionClosed:
+                self._release(connection, False)
+                # A kept alive connection may have been closed by the server
+                replayable = not hasattr(prepared.body, "read")
+                if attempt or not connection.reused or not replayable:
+                    raise
+            except BaseException:
+                self._release(connection, False)
+                raise
+            if 300 <= response.status_code < 400 and (
+                "Location" in response.headers
+            ):
+                response.close()
+                raise ModelManagerError(
+                    msg=f"Redirect to '{response.headers['Location']}' not "
+                        f"followed"
+                )
+            return response
+        raise ModelManagerError(msg="Unexpected error")  # pragma: no cover
+
+    def prepare_request(
+        self,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> requests.PreparedRequest:
+        """Prepares and authenticates a request.
+
+        :param method: The HTTP method
+        :param endpoint: The endpoint to request
+        :param kwargs: `params`, `data`, `json` and `headers` of the request
+        :return: The prepared request
+        """
+        headers = default_headers()
+        headers["Accept-Encoding"] = (
+            "gzip, deflate" if self.compression else "identity"
+        )
+        headers.update(self.headers)
+        headers.update(kwargs.pop("headers", None) or {})
+        return requests.Request(
+            method.upper(),
+            endpoint,
+            headers=headers,
+            auth=kwargs.pop("auth", self.auth),
+            **kwargs
+        ).prepare()
+
+    async def close(self) -> None:
+        """Closes all the idle connections of the pool.
+
+        :return: Nothing
+        """
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    async def _wait(self, awaitable, timeout: float = None) -> Any:
+        try:
+            return await asyncio.wait_for(awaitable, timeout or self.timeout)
+        except asyncio.TimeoutError as e:
+            raise ModelManagerError(msg="Read timed out") from e
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            raise ModelManagerError(msg=str(e) or repr(e)) from e
+
+    async def _acquire(self, url: str) -> _Connection:
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        origin = (
+            parts.scheme,
+            parts.hostname or "",
+            parts.port or (443 if secure else 80)
+        )
+        slots = self._slots.setdefault(
+            origin,
+            asyncio.Semaphore(self.pool_maxsize)
+        )
+        await slots.acquire()
+        idle = self._idle.get(origin, [])
+        now = time.monotonic()
+        while idle:
+            connection = idle.pop()
+            expired = (
+                self.idle_timeout is not None
+                and now - connection.last_used > self.idle_timeout
+            )
+            if expired or connection.reader.at_eof():
+                connection.close()
+                continue
+            connection.reused = True
+            return connection
+        try:
+            reader, writer = await self._wait(asyncio.open_connection(
+                origin[1],
+                origin[2],
+                ssl=self.ssl_context if secure else None
+            ))
+        except BaseException:
+            slots.release()
+            raise
+        return _Connection(origin, reader, writer)
+
+    def _release(self, connection: _Connection, keep_alive: bool) -> None:
+        if keep_alive:
+            connection.last_used = time.monotonic()
+            self._idle.setdefault(connection.origin, []).append(connection)
+        else:
+            connection.close()
+        self._slots[connection.origin].release()
+
+    async def _send(
+        self,
+        connection: _Connection,
+        prepared: requests.PreparedRequest,
+        timeout: Optional[float]
+    ) -> AsyncResponse:
+        parts = urlsplit(str(prepared.url))
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        body: Any = prepared.body
+        if isinstance(body, str):
+            body = body.encode()
+        if body is not None and "Content-Length" not in prepared.headers:
+            prepared.headers["Content-Length"] = str(len(body))
+        head = [
+            f"{prepared.method} {target} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            *(f"{k}: {v}" for k, v in prepared.headers.items())
+        ]
+        writer = connection.writer
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        # The timeout applies to every write, not to the whole body
+        if hasattr(body, "read"):
+            loop = asyncio.get_running_loop()
+            read = functools.partial(body.read, DEFAULT_CHUNK_SIZE)
+            data = await self._wait(loop.run_in_executor(None, read), timeout)
+            while data:
+                writer.write(data)
+                await self._wait(writer.drain(), timeout)
+                data = await self._wait(
+                    loop.run_in_executor(None, read),
+                    timeout
+                )
+        elif body:
+            view = memoryview(body)
+            for start in range(0, len(view), DEFAULT_CHUNK_SIZE):
+                writer.write(view[start:start + DEFAULT_CHUNK_SIZE])
+                await self._wait(writer.drain(), timeout)
+        await self._wait(writer.drain(), timeout)
+        return await self._wait(
+            self._read_head(connection, prepared),
+            timeout
+        )
+
+    async def _read_head(
+        self,
+        connection: _Connection,
+        prepared: requests.PreparedRequest
+    ) -> AsyncResponse:
+        reader = connection.reader
+        status_line = await reader.readline()
+        while status_line.startswith(b"HTTP/1.1 100"):
+            while (await reader.readline()).strip():
+                pass
+            status_line = await reader.readline()
+        if not status_line:
+            raise _ConnectionClosed(msg="Connection closed by server")
+        status_code = int(status_line.split()[1])
+        headers: CaseInsensitiveDict = CaseInsensitiveDict()
+        line = await reader.readline()
+        while line.strip():
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip()] = value.strip()
+            line = await reader.readline()
+        has_body = (
+            prepared.method != "HEAD"
+            and status_code not in (204, 304)
+            and not 100 <= status_code < 200
+        )
+        return AsyncResponse(self, connection, status_code, headers, has_body)
@@ -4,12 +4,14 @@ from __future__ import annotations
 
 import abc
 
-from typing import Callable
-from requests import PreparedRequest
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from requests import PreparedRequest
 
 
 #: Signature type for callable authentications.
-AuthCallable = Callable[[PreparedRequest], PreparedRequest]
+AuthCallable = Callable[["PreparedRequest"], "PreparedRequest"]
 
 #: Constant denoting authentication type Bearer.
 BEARER = "bearer"
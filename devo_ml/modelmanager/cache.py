@@ -0,0 +1,569 @@
+"""Caches of model files and model metadata."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+#: Size in bytes of the pieces read to hash files.
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+_checksum_keys = ("checksum", "sha256", "md5")
+
+_unsafe_chars = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def get_image_key(image: dict) -> Optional[str]:
+    """Gets the key identifying the content of an image from its metadata.
+
+    The key is made of the image id, size and checksum, if any.
+
+    :param image: The image metadata of a model
+    :return: The key or ``None`` if the image has no id
+    """
+    image_id = image.get("id")
+    if image_id is None:
+        return None
+    parts = [str(image_id), str(image.get("size", ""))]
+    for checksum_key in _checksum_keys:
+        if image.get(checksum_key):
+            parts.append(str(image[checksum_key]))
+            break
+    return _unsafe_chars.sub("_", "-".join(parts))
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """Atomically places a file at `dst` with the content of `src`.
+
+    The file is hard linked when possible, copied otherwise. Any file at `dst`
+    is replaced, not overwritten, so files linked to it are not modified.
+
+    :param src: The source file
+    :param dst: The destination file
+    :raises OSError: If the file can not be placed
+    """
+    fd, tmp_file = tempfile.mkstemp(
+        dir=os.path.dirname(dst),
+        prefix=".",
+        suffix=".part"
+    )
+    os.close(fd)
+    os.remove(tmp_file)
+    try:
+        try:
+            os.link(src, tmp_file)
+        except OSError:
+            shutil.copyfile(src, tmp_file)
+        os.replace(tmp_file, dst)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+class ModelFileCache:
+    """A store of model files keyed by their image identity, see
+    :func:`get_image_key`.
+
+    Identical images are stored once whatever the models using them. When
+    the store grows beyond `max_bytes` the least recently used files are
+    evicted. The last use of a file is its modification time, so it is kept
+    between processes sharing the store.
+    """
+
+    def __init__(self, path: str | Path, max_bytes: int = None) -> None:
+        """Creates a :class:`ModelFileCache`.
+
+        :param path: The directory of the store, created if missing
+        :param max_bytes: The maximum total size of the store. Unbounded if
+            not provided
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        for entry in os.scandir(self.path):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                self._entries[entry.name] = (stat.st_size, stat.st_mtime)
+
+    @property
+    def size(self) -> int:
+        """The total size in bytes of the files in the store.
+
+        :return: The size of the store
+        """
+        with self._lock:
+            return sum(size for size, _ in self._entries.values())
+
+    def stats(self) -> dict:
+        """Gets the statistics of the cache.
+
+        :return: The hits, misses, evictions, entries and bytes of the cache
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": sum(size for size, _ in self._entries.values()),
+            }
+
+    def get(self, key: str) -> Optional[str]:
+        """Gets the file stored with a key and marks it as recently used.
+
+        :param key: The key of the file
+        :return: The path of the file or ``None`` if not stored
+        """
+        file = os.path.join(self.path, key)
+        with self._lock:
+            try:
+                now = time.time()
+                os.utime(file, (now, now))
+                self._entries[key] = (os.path.getsize(file), now)
+            except FileNotFoundError:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return file
+
+    def put(self, key: str, file: str) -> str:
+        """Stores a file with a key, evicting the least recently used files if
+        the store grows beyond its limit.
+
+        :param key: The key of the file
+        :param file: The file to store. It is linked when possible
+        :return: The path of the file in the store
+        """
+        stored_file = os.path.join(self.path, key)
+        link_or_copy(file, stored_file)
+        now = time.time()
+        os.utime(stored_file, (now, now))
+        with self._lock:
+            self._entries[key] = (os.path.getsize(stored_file), now)
+            self._evict(keep=key)
+        return stored_file
+
+    def remove(self, key: str) -> None:
+        """Removes a file from the store, if stored.
+
+        :param key: The key of the file
+        :return: Nothing
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            try:
+                os.remove(os.path.join(self.path, key))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self, keep: str) -> None:
+        if self.max_bytes is None:
+            return None
+        total = sum(size for size, _ in self._entries.values())
+        by_use = sorted(self._entries.items(), key=lambda e: e[1][1])
+        for key, (size, _) in by_use:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.path, key))
+            except FileNotFoundError:
+                pass
+            del self._entries[key]
+            total -= size
+            self.evictions += 1
+
+
+class MetadataEntry:
+    """A response cached in a :class:`MetadataCache`."""
+
+    __slots__ = ("value", "etag", "last_modified", "expires")
+
+    def __init__(
+        self,
+        value: Any,
+        etag: str = None,
+        last_modified: str = None,
+        expires: float = 0
+    ) -> None:
+        """Creates a :class:`MetadataEntry`.
+
+        :param value: The decoded response
+        :param etag: The ``ETag`` header of the response, if any
+        :param last_modified: The ``Last-Modified`` header of the response, if
+            any
+        :param expires: The monotonic time the entry expires at
+        """
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the entry has not expired yet.
+
+        :return: ``True`` if the entry can be used without revalidation
+        """
+        return time.monotonic() < self.expires
+
+    def validators(self) -> Dict[str, str]:
+        """Gets the headers to revalidate the entry with a conditional
+        request.
+
+        :return: The ``If-None-Match`` and ``If-Modified-Since`` headers
+            available
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class MetadataCache:
+    """An in-process cache of metadata responses with a time to live.
+
+    Entries live `ttl` seconds, after that they are revalidated with a
+    conditional request if the server provided an ``ETag`` or a
+    ``Last-Modified`` header, fetched again otherwise. Up to `max_entries`
+    entries are kept, least recently used first evicted. It is safe to share
+    between threads.
+    """
+
+    def __init__(self, ttl: float = 60, max_entries: int = 1024) -> None:
+        """Creates a :class:`MetadataCache`.
+
+        :param ttl: Seconds an entry is used without revalidation
+        :param max_entries: The maximum number of entries
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, MetadataEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Gets the statistics of the cache.
+
+        :return: The hits, misses, revalidations and entries of the cache
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "entries": len(self._entries),
+            }
+
+    def get(self, key: Hashable) -> Optional[MetadataEntry]:
+        """Gets an entry, fresh or not, and marks it as recently used.
+
+        A fresh entry counts as a hit, anything else as a miss.
+
+        :param key: The key of the entry
+        :return: The entry or ``None`` if not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            if entry is not None and entry.fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        etag: str = None,
+        last_modified: str = None
+    ) -> MetadataEntry:
+        """Caches a response.
+
+        :param key: The key of the entry
+        :param value: The decoded response
+        :param etag: The ``ETag`` header of the response, if any
+        :param last_modified: The ``Last-Modified`` header of the response, if
+            any
+        :return: The new entry
+        """
+        entry = MetadataEntry(
+            value,
+            etag=etag,
+            last_modified=last_modified,
+            expires=time.monotonic() + self.ttl
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def refresh(self, key: Hashable) -> None:
+        """Extends the life of an entry revalidated by the server.
+
+        :param key: The key of the entry
+        :return: Nothing
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires = time.monotonic() + self.ttl
+                self.revalidations += 1
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """Removes an entry, or all of them.
+
+        :param key: The key of the entry, all entries are removed if not
+            provided
+        :return: Nothing
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_matching(
+        self,
+        predicate: Callable[[Hashable], bool]
+    ) -> None:
+        """Removes the entries whose key matches a predicate.
+
+        :param predicate: Tells whether an entry is removed by its key
+        :return: Nothing
+        """
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+
+class UploadIndex:
+    """An index of uploaded model images keyed by the content of their file.
+
+    It maps the SHA-256 of a file and the server and engine it was uploaded
+    for to the metadata the server returned for the upload, so a file with
+    the same content doesn't need to be uploaded again to that server. If a
+    `path` is provided the index is kept in that JSON file between processes.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        """Creates an :class:`UploadIndex`.
+
+        :param path: The JSON file to keep the index in. The index is only
+            kept in memory if not provided
+        """
+        self.path = (
+            os.path.abspath(os.path.expanduser(path)) if path else None
+        )
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        if self.path and os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def file_digest(self, file: str) -> str:
+        """Gets the SHA-256 of the content of a file.
+
+        The digest is remembered while the size and modification time of the
+        file don't change.
+
+        :param file: The path of the file
+        :return: The hexadecimal digest of the file
+        """
+        file = os.path.realpath(file)
+        stat = os.stat(file)
+        fingerprint = (file, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(fingerprint)
+        if digest is not None:
+            return digest
+        sha256 = hashlib.sha256()
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        with self._lock:
+            self._digests[fingerprint] = digest
+        return digest
+
+    def get(self, url: str, digest: str, engine: str) -> Optional[dict]:
+        """Gets the metadata of an uploaded image.
+
+        :param url: The URL of the server uploaded to
+        :param digest: The SHA-256 of the file uploaded
+        :param engine: The engine the file was uploaded for
+        :return: The metadata of the upload or ``None`` if not uploaded
+        """
+        with self._lock:
+            key = _upload_key(url, digest, engine)
+            image_metadata = self._entries.get(key)
+            return dict(image_metadata) if image_metadata else None
+
+    def put(
+        self,
+        url: str,
+        digest: str,
+        engine: str,
+        image_metadata: dict
+    ) -> None:
+        """Adds the metadata of an uploaded image.
+
+        :param url: The URL of the server uploaded to
+        :param digest: The SHA-256 of the file uploaded
+        :param engine: The engine the file was uploaded for
+        :param image_metadata: The response of the upload
+        :return: Nothing
+        """
+        with self._lock:
+            key = _upload_key(url, digest, engine)
+            self._entries[key] = dict(image_metadata)
+            self._save()
+
+    def remove(self, url: str, digest: str, engine: str) -> None:
+        """Removes the metadata of an uploaded image, if any.
+
+        :param url: The URL of the server uploaded to
+        :param digest: The SHA-256 of the file uploaded
+        :param engine: The engine the file was uploaded for
+        :return: Nothing
+        """
+        with self._lock:
+            key = _upload_key(url, digest, engine)
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        if self.path is not None:
+            _write_json(self.path, self._entries)
+
+
+def _upload_key(url: str, digest: str, engine: str) -> str:
+    # Image ids are only valid in the server, and domain, they came from
+    return f"{url}|{engine}|{digest}"
+
+
+class UploadSessionStore:
+    """A store of the chunked uploads in progress, so an upload interrupted
+    is resumed instead of started over.
+
+    It maps a file, identified by its path, size and modification time, and
+    the server and engine it is uploaded for to the upload session opened in
+    the server. If a `path` is provided the store is kept in that JSON file
+    between processes.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        """Creates an :class:`UploadSessionStore`.
+
+        :param path: The JSON file to keep the store in. The store is only
+            kept in memory if not provided
+        """
+        self.path = (
+            os.path.abspath(os.path.expanduser(path)) if path else None
+        )
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, dict] = {}
+        if self.path and os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._sessions = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @staticmethod
+    def file_key(url: str, engine: str, file: str) -> str:
+        """Gets the key of the upload of a file.
+
+        :param url: The URL of the server uploaded to
+        :param engine: The engine the file is uploaded for
+        :param file: The path of the file
+        :return: The key, changing if the file is modified
+        """
+        file = os.path.realpath(file)
+        stat = os.stat(file)
+        return f"{url}|{engine}|{file}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Gets the session of an upload in progress.
+
+        :param key: The key of the upload, see :meth:`file_key`
+        :return: The session or ``None`` if there is no upload in progress
+        """
+        with self._lock:
+            session = self._sessions.get(key)
+            return dict(session) if session else None
+
+    def put(self, key: str, session: dict) -> None:
+        """Adds the session of an upload in progress.
+
+        :param key: The key of the upload, see :meth:`file_key`
+        :param session: The session opened in the server
+        :return: Nothing
+        """
+        with self._lock:
+            self._sessions[key] = dict(session)
+            self._save()
+
+    def remove(self, key: str) -> None:
+        """Removes the session of an upload, if any.
+
+        :param key: The key of the upload, see :meth:`file_key`
+        :return: Nothing
+        """
+        with self._lock:
+            if self._sessions.pop(key, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        if self.path is not None:
+            _write_json(self.path, self._sessions)
+
+
+def _write_json(path: str, value: Any) -> None:
+    fd, tmp_file = tempfile.mkstemp(
+        dir=os.path.dirname(path),
+        prefix=".",
+        suffix=".part"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
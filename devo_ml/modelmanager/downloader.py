@@ -4,17 +4,29 @@ from __future__ import annotations
 
 import abc
 import base64
+import json
 import os
+import re
+import threading
 
 from pathlib import Path
-from typing import Callable
+from typing import IO, AsyncIterable, Awaitable, Callable, Iterable
+from typing import List, Optional, Tuple
 
+from .cache import ModelFileCache, get_image_key, link_or_copy
 from .engines import get_default_engine_extension
+from ._lock import FileLock, create_partial_file, fsync_directory
+from ._lock import remove_partial_files
+from ._ranged import RangeFetcher, download_ranges
+from ._stream import Base64StreamDecoder, JsonStringExtractor
 
 
 #: Signature type for callable downloaders.
 DownloaderCallable = Callable[[dict], str]
 
+#: Signature type for awaitable downloaders.
+AsyncDownloaderCallable = Callable[[dict], Awaitable[str]]
+
 
 def get_default_downloader() -> Downloader:
     """Returns the default downloader used.
@@ -24,6 +36,14 @@ def get_default_downloader() -> Downloader:
     return FileSystemDownloader(".")
 
 
+def get_default_async_downloader() -> AsyncDownloader:
+    """Returns the default downloader used by asynchronous clients.
+
+    :return: The default asynchronous downloader
+    """
+    return AsyncFileSystemDownloader(".")
+
+
 def get_image_bytes(image: dict) -> bytes:
     """Gets the bytes of an image.
 
@@ -39,6 +59,41 @@ def get_image_bytes(image: dict) -> bytes:
     return base64.b64decode(encoded_image)
 
 
+_unsafe_chars = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def write_file_atomically(file: str, data: bytes) -> None:
+    """Writes a file so that it is either complete or not written at all.
+
+    The data is written to a temporary file flushed to disk, which replaces
+    the file. The file is replaced rather than overwritten, so files linked
+    to it are not modified.
+
+    :param file: The path of the file
+    :param data: The content of the file
+    :raises OSError: If there is a problem writing the file
+    """
+    directory = os.path.dirname(file)
+    fd, tmp_file = create_partial_file(directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    fsync_directory(directory)
+
+
+def _drop_encoded_image(model: dict) -> None:
+    image = model.get("image")
+    if isinstance(image, dict):
+        image.pop("image", None)
+
+
 class Downloader(abc.ABC):
     """An interface to downloaders.
 
@@ -70,16 +125,45 @@ class Downloader(abc.ABC):
         :return: The identification of the download of the model
         """
 
+    def download_stream(
+        self,
+        chunks: Iterable[bytes]
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Downloads the file of a model from the pieces of the body of a
+        model response, the JSON representation of the model.
+
+        This implementation reads the whole body and calls the downloader.
+        Subclasses can override it to process the image without holding
+        the whole model in memory.
+
+        :param chunks: The pieces of the body of the model response
+        :return: The model, with the metadata of its image but without the
+            encoded image, and the identification of the download of the
+            model, or nothing if the body is empty
+        """
+        body = b"".join(chunks)
+        if not body.strip():
+            return None, None
+        model = json.loads(body)
+        if not model:
+            return None, None
+        file = self(model)
+        _drop_encoded_image(model)
+        return model, file
+
 
 class FileSystemDownloader(Downloader):
     """A downloader capable of writing file of model to the file system."""
 
-    def __init__(self, path: str | Path) -> None:
+    def __init__(self, path: str | Path, stream: bool = None) -> None:
         """Creates a :class:`FileSystemDownloader` object.
 
         :param path: The path where files will be written
+        :param stream: Whether clients should stream the model files through
+            :meth:`download_stream` by default
         """
         self.path = os.path.abspath(os.path.expanduser(path))
+        self.stream = bool(stream)
 
     def __call__(self, model: dict) -> str:
         """Downloads the file associated with the model and writes it
@@ -95,13 +179,577 @@ class FileSystemDownloader(Downloader):
         :raises OSError: If there is a problem writing the file to path
         :return: The absolute path of file written
         """
+        file = self.get_file_path(model)
+        image_bytes = get_image_bytes(model.get("image", {}))
+        write_file_atomically(file, image_bytes)
+        return file
+
+    def download_stream(
+        self,
+        chunks: Iterable[bytes]
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Downloads the file of a model from the pieces of the body of a
+        model response and writes it in downloader path.
+
+        The encoded image is decoded while the pieces are read and written to
+        a temporary file in the downloader path, which is renamed once the
+        model is complete. Only a piece at a time is held in memory.
+
+        :param chunks: The pieces of the body of the model response
+        :raises ValueError: If model has invalid or empty keys for `name`,
+            `engine` or `image`
+        :raises OSError: If there is a problem writing the file to path
+        :return: The model, with the metadata of its image but without the
+            encoded image, and the absolute path of file written, or nothing
+            if the body is empty
+        """
+        with self.open_stream() as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+            return writer.commit()
+
+    def download_raw(
+        self,
+        model: dict,
+        fetch: RangeFetcher,
+        segments: int = 1
+    ) -> str:
+        """Downloads the file of a model from its raw image, in ranges, and
+        writes it in downloader path.
+
+        A download interrupted by transfer errors is resumed from the last
+        byte written. If the image has a key, see :func:`get_image_key
+        <devo_ml.modelmanager.cache.get_image_key>`, the partial file is kept
+        after a failure and the next download of the same image resumes it.
+
+        :param model: The model, the image data is not required
+        :param fetch: Gets the bytes of a range of the raw image
+        :param segments: The maximum number of segments of the image
+            downloaded in parallel, if the server supports ranges
+        :raises ValueError: If model has invalid or empty keys for `name` or
+            `engine`
+        :raises ModelManagerError: If the image can't be downloaded
+        :raises OSError: If there is a problem writing the file to path
+        :return: The absolute path of file written
+        """
+        file = self.get_file_path(model)
+        image = model.get("image") or {}
+        download_ranges(
+            file,
+            fetch,
+            key=get_image_key(image),
+            size=image.get("size"),
+            segments=segments
+        )
+        return file
+
+    def open_stream(self) -> ModelStreamWriter:
+        """Opens a writer to feed with the pieces of the body of a model
+        response.
+
+        :return: A writer for the downloader path
+        """
+        return ModelStreamWriter(self)
+
+    def remove_partial_files(self) -> List[str]:
+        """Removes the temporary files left in the downloader path by
+        processes that are no longer running, e.g. killed while downloading.
+        The files of other hosts sharing the path are removed once unchanged
+        for :const:`PARTIAL_FILE_MAX_AGE
+        <devo_ml.modelmanager._lock.PARTIAL_FILE_MAX_AGE>` seconds.
+
+        :return: The paths of the files removed
+        """
+        return remove_partial_files(self.path)
+
+    def get_file_path(self, model: dict) -> str:
+        """Gets the path of the file of a model in the downloader path.
+
+        :param model: The model
+        :raises ValueError: If model has invalid or empty keys for `name` or
+            `engine`
+        :return: The absolute path of the file of the model
+        """
         name = model.get("name")
         engine = model.get("engine")
         if not name or not engine:
             raise ValueError("Invalid model")
-        image_bytes = get_image_bytes(model.get("image", {}))
         ext = get_default_engine_extension(engine)
-        file = os.path.join(self.path, f"{name}{ext}")
-        with open(file, "wb") as f:
-            f.write(image_bytes)
+        return os.path.join(self.path, f"{name}{ext}")
+
+
+class SharedFileSystemDownloader(FileSystemDownloader):
+    """A :class:`FileSystemDownloader` whose path can be shared by several
+    processes, e.g. the workers of a prefork server.
+
+    Clients hold a lock on the model while getting its file, so only one
+    process downloads it while the others wait. Then they look up the file
+    with the metadata of the model and reuse it if its image is the same.
+    Temporary files left by processes killed while downloading are removed
+    when the downloader is created, those of other hosts sharing the path
+    once abandoned, see :meth:`remove_partial_files`. Locks and the images
+    of the files are kept in the directory ``.modelmanager`` of the path.
+    """
+
+    def __init__(self, path: str | Path, stream: bool = None) -> None:
+        """Creates a :class:`SharedFileSystemDownloader` object.
+
+        :param path: The path where files will be written, created if missing
+        :param stream: Whether clients should stream the model files
+        """
+        super().__init__(path, stream=stream)
+        self.state_path = os.path.join(self.path, ".modelmanager")
+        os.makedirs(self.state_path, exist_ok=True)
+        self.remove_partial_files()
+
+    def lock(self, name: str) -> FileLock:
+        """Gets the lock of a model, exclusive between processes and threads.
+
+        :param name: The name of the model
+        :return: The lock, to use as a context manager
+        """
+        lock_name = f"{_unsafe_chars.sub('_', name)}.lock"
+        return FileLock(os.path.join(self.state_path, lock_name))
+
+    def lookup(self, model: dict) -> Optional[str]:
+        """Finds the file of a model already downloaded in the downloader
+        path with the same image.
+
+        :param model: The model, the image data is not required
+        :return: The absolute path of the file or ``None`` if not downloaded
+        """
+        key = get_image_key(model.get("image") or {})
+        if key is None:
+            return None
+        file = self.get_file_path(model)
+        try:
+            with open(self._get_image_file(file), "r", encoding="utf-8") as f:
+                downloaded_key = f.read()
+        except FileNotFoundError:
+            return None
+        if downloaded_key != key or not os.path.exists(file):
+            return None
+        return file
+
+    def __call__(self, model: dict) -> str:
+        """Downloads the file of a model, see
+        :meth:`FileSystemDownloader.__call__`, and records its image.
+
+        :param model: The model to download its file
+        :return: The absolute path of file written
+        """
+        file = super().__call__(model)
+        self._record_image(model, file)
+        return file
+
+    def download_stream(
+        self,
+        chunks: Iterable[bytes]
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Downloads the file of a model from the pieces of the body of a
+        model response, see :meth:`FileSystemDownloader.download_stream`, and
+        records its image.
+
+        :param chunks: The pieces of the body of the model response
+        :return: The model, with the metadata of its image but without the
+            encoded image, and the absolute path of file written, or nothing
+            if the body is empty
+        """
+        model, file = super().download_stream(chunks)
+        if model and file:
+            self._record_image(model, file)
+        return model, file
+
+    def download_raw(
+        self,
+        model: dict,
+        fetch: RangeFetcher,
+        segments: int = 1
+    ) -> str:
+        """Downloads the file of a model from its raw image, see
+        :meth:`FileSystemDownloader.download_raw`, and records its image.
+
+        :param model: The model, the image data is not required
+        :param fetch: Gets the bytes of a range of the raw image
+        :param segments: The maximum number of segments downloaded in parallel
+        :return: The absolute path of file written
+        """
+        file = super().download_raw(model, fetch, segments=segments)
+        self._record_image(model, file)
+        return file
+
+    def _get_image_file(self, file: str) -> str:
+        return os.path.join(self.state_path, f"{os.path.basename(file)}.key")
+
+    def _record_image(self, model: dict, file: str) -> None:
+        image_file = self._get_image_file(file)
+        key = get_image_key(model.get("image") or {})
+        if key is None:
+            if os.path.exists(image_file):
+                os.remove(image_file)
+            return None
+        write_file_atomically(image_file, key.encode())
+
+
+class LazyModelFile(os.PathLike):
+    """A handle to the file of a model, downloaded on first access.
+
+    The file is got when :attr:`path` is accessed, or the handle is opened or
+    read, and only once. The handle is a path-like object, so it can be used
+    wherever a path is expected, e.g. :func:`open`.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[], str]) -> None:
+        """Creates a :class:`LazyModelFile`.
+
+        :param name: The name of the model
+        :param fetch: Gets the file of the model and returns its path
+        """
+        self.name = name
+        self._fetch = fetch
+        self._path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"LazyModelFile({self.name!r}, path={self._path!r})"
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the file has been got.
+
+        :return: ``True`` if the file has been got
+        """
+        return self._path is not None
+
+    @property
+    def path(self) -> str:
+        """The path of the file, got on first access.
+
+        :raises ModelNotFound: If the model doesn't exist anymore
+        :return: The path of the file
+        """
+        with self._lock:
+            if self._path is None:
+                self._path = self._fetch()
+            return self._path
+
+    def open(self, mode: str = "rb") -> IO:
+        """Opens the file, got if not yet.
+
+        :param mode: The mode to open the file in
+        :return: The file object
+        """
+        return open(self.path, mode)
+
+    def read_bytes(self) -> bytes:
+        """Reads the content of the file, got if not yet.
+
+        :return: The content of the file
+        """
+        with self.open("rb") as f:
+            return f.read()
+
+
+class CachingDownloader(Downloader):
+    """A :class:`Downloader` writing the files to a path, like a
+    :class:`FileSystemDownloader`, backed by a :class:`ModelFileCache
+    <devo_ml.modelmanager.cache.ModelFileCache>`.
+
+    Clients look up the cache with the metadata of a model before downloading
+    its file, so the file is only downloaded if its image is not already
+    cached. Cached files are linked, or copied, to the downloader path.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        cache: ModelFileCache = None,
+        max_bytes: int = None,
+        stream: bool = None
+    ) -> None:
+        """Creates a :class:`CachingDownloader` object.
+
+        :param path: The path where files will be written
+        :param cache: The cache to use. A cache in the directory ``.cache`` of
+            `path` is used if not provided
+        :param max_bytes: The maximum total size of the cache created when
+            `cache` is not provided
+        :param stream: Whether clients should stream the model files
+        """
+        self.downloader = FileSystemDownloader(path, stream=stream)
+        self.cache = cache or ModelFileCache(
+            os.path.join(self.downloader.path, ".cache"),
+            max_bytes=max_bytes
+        )
+
+    @property
+    def path(self) -> str:
+        """The path where files will be written.
+
+        :return: The absolute path
+        """
+        return self.downloader.path
+
+    @property
+    def stream(self) -> bool:
+        """Whether clients should stream the model files by default.
+
+        :return: ``True`` if streaming by default
+        """
+        return self.downloader.stream
+
+    def lookup(self, model: dict) -> Optional[str]:
+        """Places the cached file of a model in the downloader path.
+
+        :param model: The model, the image data is not required
+        :return: The absolute path of the file or ``None`` if not cached
+        """
+        key = get_image_key(model.get("image") or {})
+        if key is None:
+            return None
+        cached_file = self.cache.get(key)
+        if cached_file is None:
+            return None
+        file = self.downloader.get_file_path(model)
+        link_or_copy(cached_file, file)
         return file
+
+    def __call__(self, model: dict) -> str:
+        """Downloads the file of a model, see
+        :meth:`FileSystemDownloader.__call__`, and caches it.
+
+        :param model: The model to download its file
+        :return: The absolute path of file written
+        """
+        file = self.downloader(model)
+        self._cache_file(model, file)
+        return file
+
+    def download_stream(
+        self,
+        chunks: Iterable[bytes]
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Downloads the file of a model from the pieces of the body of a
+        model response, see :meth:`FileSystemDownloader.download_stream`, and
+        caches it.
+
+        :param chunks: The pieces of the body of the model response
+        :return: The model, with the metadata of its image but without the
+            encoded image, and the absolute path of file written, or nothing
+            if the body is empty
+        """
+        model, file = self.downloader.download_stream(chunks)
+        if model and file:
+            self._cache_file(model, file)
+        return model, file
+
+    def download_raw(
+        self,
+        model: dict,
+        fetch: RangeFetcher,
+        segments: int = 1
+    ) -> str:
+        """Downloads the file of a model from its raw image, see
+        :meth:`FileSystemDownloader.download_raw`, and caches it.
+
+        :param model: The model, the image data is not required
+        :param fetch: Gets the bytes of a range of the raw image
+        :param segments: The maximum number of segments downloaded in parallel
+        :return: The absolute path of file written
+        """
+        file = self.downloader.download_raw(model, fetch, segments=segments)
+        self._cache_file(model, file)
+        return file
+
+    def _cache_file(self, model: dict, file: str) -> None:
+        key = get_image_key(model.get("image") or {})
+        if key is not None:
+            self.cache.put(key, file)
+
+
+class ModelStreamWriter:
+    """Writes the file of a model in a :class:`FileSystemDownloader` path
+    from the pieces of the body of a model response.
+
+    The encoded image is decoded while the pieces are written to a temporary
+    file, which is renamed once the model is complete. The temporary file is
+    removed if the writer is left without commit, e.g. due to an error.
+    """
+
+    def __init__(self, downloader: FileSystemDownloader) -> None:
+        """Creates a :class:`ModelStreamWriter`.
+
+        :param downloader: The downloader to write the file for
+        """
+        self.downloader = downloader
+        fd, self.tmp_file = create_partial_file(downloader.path)
+        self._file = os.fdopen(fd, "wb")
+        self._decoder = Base64StreamDecoder(self._file.write)
+        self._extractor = JsonStringExtractor(
+            ("image", "image"),
+            self._decoder.feed
+        )
+
+    def __enter__(self) -> ModelStreamWriter:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.abort()
+
+    def write(self, chunk: bytes) -> None:
+        """Writes a piece of the body of the model response.
+
+        :param chunk: The piece
+        :raises ValueError: If the image is not valid base 64
+        """
+        self._extractor.feed(chunk)
+
+    def commit(self) -> Tuple[Optional[dict], Optional[str]]:
+        """Completes the file of the model.
+
+        :raises ValueError: If model has invalid or empty keys for `name`,
+            `engine` or `image`
+        :raises OSError: If there is a problem writing the file to path
+        :return: The model, with the metadata of its image but without the
+            encoded image, and the absolute path of file written, or nothing
+            if the body is empty
+        """
+        model = self._extractor.close()
+        self._decoder.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if not model:
+            self.abort()
+            return None, None
+        file = self.downloader.get_file_path(model)
+        if not self._extractor.found or not os.path.getsize(self.tmp_file):
+            raise ValueError("Invalid image")
+        os.replace(self.tmp_file, file)
+        fsync_directory(self.downloader.path)
+        _drop_encoded_image(model)
+        return model, file
+
+    def abort(self) -> None:
+        """Discards the file being written, if not committed.
+
+        :return: Nothing
+        """
+        self._file.close()
+        if os.path.exists(self.tmp_file):
+            os.remove(self.tmp_file)
+
+
+class AsyncDownloader(abc.ABC):
+    """An interface to asynchronous downloaders.
+
+    Like :class:`Downloader` but awaitable, with the
+    :const:`AsyncDownloaderCallable` signature.
+    """
+
+    @abc.abstractmethod
+    async def __call__(self, model: dict) -> str:
+        """Subclasses must implement this method to asynchronous clients be
+        able to await it as a function.
+
+        :param model: The model to download its file, see
+            :meth:`Downloader.__call__`
+        :return: The identification of the download of the model
+        """
+
+    async def download_stream(
+        self,
+        chunks: AsyncIterable[bytes]
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Downloads the file of a model from the pieces of the body of a
+        model response, see :meth:`Downloader.download_stream`.
+
+        This implementation reads the whole body and awaits the downloader.
+
+        :param chunks: The pieces of the body of the model response
+        :return: The model, with the metadata of its image but without the
+            encoded image, and the identification of the download of the
+            model, or nothing if the body is empty
+        """
+        body = b"".join([chunk async for chunk in chunks])
+        if not body.strip():
+            return None, None
+        model = json.loads(body)
+        if not model:
+            return None, None
+        file = await self(model)
+        _drop_encoded_image(model)
+        return model, file
+
+
+class AsyncFileSystemDownloader(AsyncDownloader):
+    """An asynchronous :class:`FileSystemDownloader`.
+
+    Decoding, writing and syncing of the files run in the default executor of
+    the event loop, never blocking it. When streaming, the pieces are decoded
+    and written in the executor one by one as they are received.
+    """
+
+    def __init__(self, path: str | Path, stream: bool = None) -> None:
+        """Creates an :class:`AsyncFileSystemDownloader` object.
+
+        :param path: The path where files will be written
+        :param stream: Whether clients should stream the model files through
+            :meth:`download_stream` by default
+        """
+        self.downloader = FileSystemDownloader(path, stream=stream)
+
+    @property
+    def path(self) -> str:
+        """The path where files will be written.
+
+        :return: The absolute path
+        """
+        return self.downloader.path
+
+    @property
+    def stream(self) -> bool:
+        """Whether clients should stream the model files by default.
+
+        :return: ``True`` if streaming by default
+        """
+        return self.downloader.stream
+
+    async def __call__(self, model: dict) -> str:
+        """Downloads the file associated with the model and writes it
+        in downloader path, see :meth:`FileSystemDownloader.__call__`.
+
+        :param model: The model to download its file
+        :return: The absolute path of file written
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.downloader, model)
+
+    async def download_stream(
+        self,
+        chunks: AsyncIterable[bytes]
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Downloads the file of a model from the pieces of the body of a
+        model response, see :meth:`FileSystemDownloader.download_stream`.
+
+        :param chunks: The pieces of the body of the model response
+        :return: The model, with the metadata of its image but without the
+            encoded image, and the absolute path of file written, or nothing
+            if the body is empty
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        writer = await loop.run_in_executor(None, self.downloader.open_stream)
+        try:
+            async for chunk in chunks:
+                await loop.run_in_executor(None, writer.write, chunk)
+            return await loop.run_in_executor(None, writer.commit)
+        finally:
+            # Discards the file even if the download is cancelled
+            await asyncio.shield(loop.run_in_executor(None, writer.abort))
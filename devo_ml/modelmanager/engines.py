@@ -1,8 +1,14 @@
-"""Engine code literals to identify the ML engines and infer their model
-file extensions.
+"""Engine code literals to identify the ML engines, infer their model
+file extensions and the engines of model files.
 """
 
-from typing import Sequence
+import os
+
+from typing import Dict, List, Optional, Sequence
+
+from .validator import FileValidator, validate_catboost_file
+from .validator import validate_json_file, validate_onnx_file
+from .validator import validate_zip_file, validate_zip_or_json_file
 
 
 #: | Constant denoting `Open Neural Network Exchange <https://onnx.ai/>`_
@@ -52,30 +58,36 @@ _dot_onnx = ".onnx"
 _dot_h5 = ".h5"
 _dot_cbm = ".cmb"
 
-_aware_engines = {
+_aware_engines: Dict[str, dict] = {
     ONNX: {
         "code": ONNX,
         "extensions": [_dot_onnx],
+        "validator": validate_onnx_file,
     },
     H2O: {
         "code": H2O,
         "extensions": [_dot_zip],
+        "validator": validate_zip_file,
     },
     BIGML: {
         "code": BIGML,
         "extensions": [_dot_json],
+        "validator": validate_json_file,
     },
     CATBOOST: {
         "code": CATBOOST,
         "extensions": [_dot_cbm],
+        "validator": validate_catboost_file,
     },
     DT: {
         "code": DT,
         "extensions": [_dot_json],
+        "validator": validate_zip_or_json_file,
     },
     IDA: {
         "code": IDA,
         "extensions": [_dot_json],
+        "validator": validate_zip_or_json_file,
     },
     MLSTATS: {
         "code": MLSTATS,
@@ -84,18 +96,32 @@ _aware_engines = {
     MUA: {
         "code": MUA,
         "extensions": [_dot_zip],
+        "validator": validate_zip_file,
     },
     UNICODE: {
         "code": UNICODE,
         "extensions": [_dot_zip],
+        "validator": validate_zip_file,
     },
     WORKFLOWS: {
         "code": WORKFLOWS,
         "extensions": [_dot_json],
+        "validator": validate_json_file,
     },
 }
 
 
+def _index_extensions() -> Dict[str, List[str]]:
+    index: Dict[str, List[str]] = {}
+    for code, engine in _aware_engines.items():
+        for extension in engine["extensions"]:
+            index.setdefault(extension, []).append(code)
+    return index
+
+
+_extension_engines = _index_extensions()
+
+
 def get_engine_extensions(engine_code: str) -> Sequence[str]:
     """Returns file extensions associated with an engine represented
     by its code.
@@ -122,3 +148,65 @@ def get_default_engine_extension(engine_code: str) -> str:
     """
     extensions = get_engine_extensions(engine_code)
     return extensions[0] if extensions else ""
+
+
+def get_extension_engines(extension: str) -> Sequence[str]:
+    """Returns the codes of the engines whose model files have an extension.
+
+    An empty list will be returned if no engine is associated with the
+    extension.
+
+    :param extension: The extension, with or without the dot, e.g. ``.zip``
+    :return: The codes of the engines or an empty list
+    """
+    extension = extension.lower()
+    if extension and not extension.startswith("."):
+        extension = f".{extension}"
+    return list(_extension_engines.get(extension, []))
+
+
+def infer_engine(file: str) -> Optional[str]:
+    """Infers the engine of a model file from its name.
+
+    The extension must be associated with a single engine, e.g. ``.onnx``.
+    Extensions shared by several engines, e.g. ``.zip``, are disambiguated by
+    an engine code before the extension, e.g. ``fraud.h2o.zip``.
+
+    :param file: The path or name of the file
+    :return: The code of the engine or ``None`` if it can't be inferred
+    """
+    stem, extension = os.path.splitext(os.path.basename(file))
+    engines = get_extension_engines(extension)
+    if len(engines) == 1:
+        return engines[0]
+    hint = os.path.splitext(stem)[1][1:].upper()
+    return hint if hint in engines else None
+
+
+def get_file_validator(engine_code: str) -> Optional[FileValidator]:
+    """Returns the validator of the model files of an engine represented by
+    its code.
+
+    :param engine_code: The code of the engine
+    :return: The validator or ``None`` if the files of the engine are not
+        validated
+    """
+    engine = _aware_engines.get(engine_code.upper())
+    return engine.get("validator") if engine else None
+
+
+def validate_model_file(engine_code: str, file: str) -> None:
+    """Checks locally that a model file looks valid for its engine, e.g. an
+    ONNX protobuf message or a zip archive, without reading all the file.
+
+    Files of engines without validator are not checked.
+
+    :param engine_code: The code of the engine
+    :param file: The path of the file
+    :raises InvalidModelFile: If the file is not valid for the engine
+    :raises OSError: If the file can't be read
+    :return: Nothing
+    """
+    validator = get_file_validator(engine_code)
+    if validator is not None:
+        validator(file)
@@ -68,6 +68,20 @@ class ModelAlreadyExists(ModelManagerError):
         super().__init__(msg=f"'{model}'")
 
 
+class InvalidModelFile(ModelManagerError):
+    """Indicates that a model file is not valid for its engine."""
+
+    def __init__(self, file: str, reason: str):
+        """Creates an :class:`InvalidModelFile`.
+
+        :param file: The path of the model file
+        :param reason: Why the file is not valid
+        """
+        super().__init__(msg=f"'{file}': {reason}")
+        self.file = file
+        self.reason = reason
+
+
 class ProfileError(ModelManagerError):
     """Any profile error."""
 
@@ -0,0 +1,326 @@
+"""Instrumentation of the calls made to the ML Model Manager server.
+
+Every call made by an :class:`Api <devo_ml.modelmanager.api.Api>` with hooks
+emits a :class:`RequestEvent` to them. :class:`ClientMetrics` is a hook that
+aggregates the events in latency histograms and byte counters.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+#: Upper bounds in seconds of the buckets of the latency histograms.
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300
+)
+
+
+class RequestEvent:
+    """The timing and size of an attempt of a call.
+
+    :ivar operation: The kind of endpoint called, e.g. ``models``, ``model``
+        or ``image_upload``. ``None`` if the caller didn't tell
+    :ivar phase: The step of a client operation the call is part of, e.g.
+        ``add_model.upload``, if any
+    :ivar method: The HTTP method
+    :ivar url: The URL called
+    :ivar attempt: The number of the attempt, starting at 1
+    :ivar status: The status code of the response. ``None`` on errors
+    :ivar elapsed: Seconds since the call started until its body was
+        received, or until its headers were received if it is streamed
+    :ivar ttfb: Seconds since the call started until the headers of the
+        response were received. The time to connect, not exposed by
+        :doc:`Requests <requests:index>`, is included
+    :ivar transfer: Seconds receiving the body of the response. ``0`` if it
+        is streamed
+    :ivar bytes_sent: The size of the body sent, compressed if so
+    :ivar bytes_received: The size of the body received, compressed if so,
+        or the ``Content-Length`` if it is streamed
+    :ivar content_bytes_sent: The size of the body sent before compressing
+        it. The same as `bytes_sent` if not compressed
+    :ivar content_bytes_received: The size of the body received once
+        decompressed. The same as `bytes_received` if not compressed or
+        streamed
+    :ivar compression_time: Seconds spent compressing the body sent
+    :ivar error: The error of the call, if any
+    """
+
+    __slots__ = (
+        "operation", "phase", "method", "url", "attempt", "status",
+        "elapsed", "ttfb", "transfer", "bytes_sent", "bytes_received",
+        "content_bytes_sent", "content_bytes_received", "compression_time",
+        "error",
+    )
+
+    def __init__(
+        self,
+        operation: Optional[str],
+        phase: Optional[str],
+        method: str,
+        url: str,
+        attempt: int = 1,
+        status: int = None,
+        elapsed: float = 0,
+        ttfb: float = 0,
+        transfer: float = 0,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        content_bytes_sent: int = None,
+        content_bytes_received: int = None,
+        compression_time: float = 0,
+        error: Exception = None
+    ) -> None:
+        self.operation = operation
+        self.phase = phase
+        self.method = method
+        self.url = url
+        self.attempt = attempt
+        self.status = status
+        self.elapsed = elapsed
+        self.ttfb = ttfb
+        self.transfer = transfer
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.content_bytes_sent = (
+            bytes_sent if content_bytes_sent is None else content_bytes_sent
+        )
+        self.content_bytes_received = (
+            bytes_received if content_bytes_received is None
+            else content_bytes_received
+        )
+        self.compression_time = compression_time
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (
+            f"RequestEvent({self.method.upper()} {self.url} "
+            f"operation={self.operation} status={self.status} "
+            f"elapsed={self.elapsed:.3f}s)"
+        )
+
+
+RequestHook = Callable[[RequestEvent], None]
+
+
+class Histogram:
+    """A histogram of values in buckets of fixed upper bounds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Creates a :class:`Histogram`.
+
+        :param buckets: The increasing upper bounds of the buckets. Values
+            over the last one are counted in an unbounded bucket
+        """
+        self.bounds = list(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Counts a value.
+
+        :param value: The value
+        :return: Nothing
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimates a quantile as the upper bound of its bucket.
+
+        :param q: The quantile, between 0 and 1
+        :return: The estimated value, ``inf`` if in the unbounded bucket, or
+            ``None`` if no values
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        """Gets the state of the histogram.
+
+        :return: The count, sum, median, 95th and 99th percentiles and counts
+            by bucket upper bound
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip(
+                [str(bound) for bound in self.bounds] + ["+Inf"],
+                self.counts
+            )),
+        }
+
+
+class _Stats:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.latency = Histogram(buckets)
+        self.ttfb = Histogram(buckets)
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.content_bytes_sent = 0
+        self.content_bytes_received = 0
+        self.compression_time = 0.0
+        self.statuses: Dict[int, int] = {}
+
+    def add(self, event: RequestEvent) -> None:
+        self.latency.observe(event.elapsed)
+        self.ttfb.observe(event.ttfb)
+        if event.error is not None:
+            self.errors += 1
+        if event.status is not None:
+            self.statuses[event.status] = (
+                self.statuses.get(event.status, 0) + 1
+            )
+        self.bytes_sent += event.bytes_sent
+        self.bytes_received += event.bytes_received
+        self.content_bytes_sent += event.content_bytes_sent
+        self.content_bytes_received += event.content_bytes_received
+        self.compression_time += event.compression_time
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.latency.count,
+            "errors": self.errors,
+            "statuses": dict(self.statuses),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "content_bytes_sent": self.content_bytes_sent,
+            "content_bytes_received": self.content_bytes_received,
+            "compression_ratio_sent": _ratio(
+                self.content_bytes_sent,
+                self.bytes_sent
+            ),
+            "compression_ratio_received": _ratio(
+                self.content_bytes_received,
+                self.bytes_received
+            ),
+            "compression_time": self.compression_time,
+            "latency": self.latency.to_dict(),
+            "ttfb": self.ttfb.to_dict(),
+        }
+
+
+def _ratio(content: int, transferred: int) -> Optional[float]:
+    return content / transferred if transferred else None
+
+
+class ClientMetrics:
+    """Aggregates the events of the calls of clients.
+
+    Events are aggregated by operation and by phase in latency and time to
+    first byte histograms, byte counters and status counters. The ratio of
+    the bytes of the bodies to the bytes transferred shows how much
+    compression saves. Calls slower than `slow_threshold` are logged as
+    warnings in the ``devo_ml.modelmanager.metrics`` logger. It is safe to
+    share between threads and clients.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        """Creates a :class:`ClientMetrics`.
+
+        :param slow_threshold: Seconds over which calls are logged. Calls are
+            not logged if not provided
+        :param buckets: The upper bounds of the buckets of the histograms
+        """
+        self.slow_threshold = slow_threshold
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._operations: Dict[str, _Stats] = {}
+        self._phases: Dict[str, _Stats] = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        """Aggregates an event.
+
+        :param event: The event of a call
+        :return: Nothing
+        """
+        with self._lock:
+            self._get_stats(self._operations, event.operation).add(event)
+            if event.phase is not None:
+                self._get_stats(self._phases, event.phase).add(event)
+        if (
+            self.slow_threshold is not None
+            and event.elapsed > self.slow_threshold
+        ):
+            logger.warning(
+                "Slow call %s %s (%s): %.3fs, first byte %.3fs, %d bytes "
+                "sent, %d bytes received, status %s",
+                event.method.upper(),
+                event.url,
+                event.operation,
+                event.elapsed,
+                event.ttfb,
+                event.bytes_sent,
+                event.bytes_received,
+                event.status
+            )
+
+    def _get_stats(self, stats: Dict[str, _Stats], key: Optional[str]):
+        key = key or "other"
+        if key not in stats:
+            stats[key] = _Stats(self.buckets)
+        return stats[key]
+
+    def snapshot(self) -> dict:
+        """Gets the aggregated metrics.
+
+        :return: The metrics by operation and by phase
+        """
+        with self._lock:
+            return {
+                "operations": {
+                    key: stats.to_dict()
+                    for key, stats in self._operations.items()
+                },
+                "phases": {
+                    key: stats.to_dict()
+                    for key, stats in self._phases.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """Discards the aggregated metrics.
+
+        :return: Nothing
+        """
+        with self._lock:
+            self._operations.clear()
+            self._phases.clear()
+
+
+def emit(hooks: List[RequestHook], event: RequestEvent) -> None:
+    """Emits an event to hooks. Errors of the hooks are logged, not raised,
+    so they never break a call.
+
+    :param hooks: The hooks
+    :param event: The event
+    :return: Nothing
+    """
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception:
+            logger.exception("Error in request hook %r", hook)
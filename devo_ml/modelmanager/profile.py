@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import configparser
 import os
+import threading
+import time
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 from .auth import validate_auth_type, get_default_auth_type
 from .error import ProfileError, ProfileValueRequired
@@ -54,41 +56,69 @@ def read_profile_from_file(profile: str, path: str = None) -> dict:
     :return: The profile values found
     """
     try:
-        paths: list[str | Path] = [".", os.path.expanduser("~")]
-        file = None
-        path = os.path.expanduser(path or "")
-        if os.path.isfile(path):
-            path, file = os.path.split(path)
-        if path and path not in paths:
-            paths.insert(0, path)
-        profile_file = resolve_profile_file(paths, file_name=file)
-        config = configparser.ConfigParser()
-        config.read(os.path.expanduser(profile_file))
+        profile_file = _find_profile_file(path)
+        config = _read_config(profile_file)
         if profile not in config:
             raise ProfileError(f"Missing profile '{profile}'")
-        values = config[profile]
-        url = get_required_profile_value(values, "url")
-        if not is_valid_url(url):
-            raise ProfileError(f"Invalid url: '{url}'")
-        token = get_required_profile_value(values, "token")
-        auth_type = values.get("auth_type", get_default_auth_type())
-        if not validate_auth_type(auth_type):
-            raise ProfileError(f"Invalid auth type '{auth_type}'")
-        download_path = values.get("download_path")
-        if download_path:
-            download_path = os.path.expanduser(download_path)
-        return {
-            "url": url,
-            "token": token,
-            "auth_type": auth_type,
-            "download_path": download_path,
-        }
+        return parse_profile(config[profile])
+    except configparser.Error as e:
+        raise ProfileError(str(e)) from e
+
+
+def read_profiles_from_file(
+    path: str = None,
+    ignore_invalid: bool = False
+) -> Dict[str, dict]:
+    """Reads every profile located in a file.
+
+    The file is searched as in :func:`read_profile_from_file`.
+
+    :param path: Path, file path or file name to search for a profile file
+    :param ignore_invalid: Whether to leave out the profiles that don't pass
+        the validation instead of raising an error
+    :raises ProfileError: if no file found, or if values of a profile don't
+        pass the validation and not `ignore_invalid`, or any syntax error in
+        the file detected
+    :raises ProfileValueRequired: if a profile misses a value and not
+        `ignore_invalid`
+    :return: The values of the profiles by name
+    """
+    try:
+        config = _read_config(_find_profile_file(path))
+        return _parse_profiles(config, ignore_invalid)
     except configparser.Error as e:
         raise ProfileError(str(e)) from e
 
 
+def parse_profile(section: Mapping[str, str]) -> dict:
+    """Validates the values of a profile section and parses them to the dict
+    returned by :func:`read_profile_from_file`.
+
+    :param section: The values of the profile
+    :raises ProfileError: if values of the profile don't pass the validation
+    :raises ProfileValueRequired: if the url or the token is missing
+    :return: The profile values
+    """
+    url = get_required_profile_value(section, "url")
+    if not is_valid_url(url):
+        raise ProfileError(f"Invalid url: '{url}'")
+    token = get_required_profile_value(section, "token")
+    auth_type = section.get("auth_type", get_default_auth_type())
+    if not validate_auth_type(auth_type):
+        raise ProfileError(f"Invalid auth type '{auth_type}'")
+    download_path = section.get("download_path")
+    if download_path:
+        download_path = os.path.expanduser(download_path)
+    return {
+        "url": url,
+        "token": token,
+        "auth_type": auth_type,
+        "download_path": download_path,
+    }
+
+
 def get_required_profile_value(
-    section: configparser.SectionProxy,
+    section: Mapping[str, str],
     key: str
 ) -> Any:
     """Gets the value of a key of a
@@ -128,3 +158,161 @@ def resolve_profile_file(
         if os.path.isfile(f):
             return f
     raise ProfileError(f"File not found in paths: {paths}")
+
+
+def _find_profile_file(path: Optional[str]) -> str:
+    paths: list[str | Path] = [".", os.path.expanduser("~")]
+    file = None
+    path = os.path.expanduser(path or "")
+    if os.path.isfile(path):
+        path, file = os.path.split(path)
+    if path and path not in paths:
+        paths.insert(0, path)
+    return resolve_profile_file(paths, file_name=file)
+
+
+def _read_config(file: str) -> configparser.ConfigParser:
+    config = configparser.ConfigParser()
+    config.read(os.path.expanduser(file))
+    return config
+
+
+def _parse_profiles(
+    config: configparser.ConfigParser,
+    ignore_invalid: bool
+) -> Dict[str, dict]:
+    profiles = {}
+    for name in config.sections():
+        try:
+            profiles[name] = parse_profile(config[name])
+        except (ProfileError, ProfileValueRequired):
+            if not ignore_invalid:
+                raise
+    return profiles
+
+
+class _ProfileFile:
+    def __init__(
+        self,
+        file: str,
+        stamp: Tuple[int, int],
+        config: configparser.ConfigParser
+    ) -> None:
+        self.file = file
+        self.stamp = stamp
+        self.sections = {
+            name: dict(config[name]) for name in config.sections()
+        }
+        self.profiles: Dict[str, dict] = {}
+        self.checked = time.monotonic()
+
+
+def _get_stamp(file: str) -> Tuple[int, int]:
+    stat = os.stat(file)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ProfileStore:
+    """A cache of the profiles read from profile files.
+
+    Every profile file is parsed once and its profiles are validated once,
+    then they are served from memory until the modification time or the size
+    of the file changes. The file is searched and checked for changes at most
+    once every `check_interval` seconds, so reading profiles often doesn't
+    touch the file system. It is safe to share between threads.
+    """
+
+    def __init__(self, check_interval: float = 1.0) -> None:
+        """Creates a :class:`ProfileStore`.
+
+        :param check_interval: Seconds a file is trusted without checking it
+            for changes
+        """
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._files: Dict[Tuple[str, str], _ProfileFile] = {}
+
+    def read_profile(self, profile: str, path: str = None) -> dict:
+        """Reads a profile, see :func:`read_profile_from_file`.
+
+        :param profile: Name of the profile to read
+        :param path: Path, file path or file name to search for a profile file
+        :raises ProfileError: if no file found, or if profile not found in the
+            file, or if values of the profile don't pass the validation, or
+            any syntax error in the file detected
+        :return: The profile values found
+        """
+        entry = self._get_file(path)
+        values = entry.profiles.get(profile)
+        if values is None:
+            section = entry.sections.get(profile)
+            if section is None:
+                raise ProfileError(f"Missing profile '{profile}'")
+            values = parse_profile(section)
+            entry.profiles[profile] = values
+        return dict(values)
+
+    def read_profiles(
+        self,
+        path: str = None,
+        ignore_invalid: bool = False
+    ) -> Dict[str, dict]:
+        """Reads every profile of a file, see
+        :func:`read_profiles_from_file`.
+
+        :param path: Path, file path or file name to search for a profile file
+        :param ignore_invalid: Whether to leave out the profiles that don't
+            pass the validation instead of raising an error
+        :raises ProfileError: if no file found, or if values of a profile
+            don't pass the validation and not `ignore_invalid`, or any syntax
+            error in the file detected
+        :raises ProfileValueRequired: if a profile misses a value and not
+            `ignore_invalid`
+        :return: The values of the profiles by name
+        """
+        entry = self._get_file(path)
+        profiles = {}
+        for name in entry.sections:
+            try:
+                profiles[name] = self.read_profile(name, path)
+            except (ProfileError, ProfileValueRequired):
+                if not ignore_invalid:
+                    raise
+        return profiles
+
+    def clear(self) -> None:
+        """Forgets every file read, so they are read again on next use.
+
+        :return: Nothing
+        """
+        with self._lock:
+            self._files.clear()
+
+    def _get_file(self, path: Optional[str]) -> _ProfileFile:
+        # The search depends on the working directory
+        key = (path or "", os.getcwd())
+        with self._lock:
+            entry = self._files.get(key)
+            now = time.monotonic()
+            if entry is not None and now - entry.checked < self.check_interval:
+                return entry
+            try:
+                file = _find_profile_file(path)
+                stamp = _get_stamp(file)
+                if (
+                    entry is None
+                    or entry.file != file
+                    or entry.stamp != stamp
+                ):
+                    entry = _ProfileFile(file, stamp, _read_config(file))
+                    self._files[key] = entry
+            except configparser.Error as e:
+                raise ProfileError(str(e)) from e
+            except OSError as e:
+                raise ProfileError(f"Unable to read profile file: {e}") from e
+            entry.checked = now
+            return entry
+
+
+#: The store of the profiles read by the factories of clients.
+default_store = ProfileStore()
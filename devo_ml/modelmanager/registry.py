@@ -0,0 +1,128 @@
+"""A registry of clients shared by the calls of a process."""
+
+from __future__ import annotations
+
+import threading
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Hashable, List
+
+if TYPE_CHECKING:
+    from ._client import Client
+
+
+#: Maximum number of clients kept by the default registry.
+DEFAULT_MAX_CLIENTS = 16
+
+
+def freeze(value: Any) -> Hashable:
+    """Gets a hashable version of a value to use it as part of a key.
+
+    Dicts, lists, tuples and sets are frozen recursively. Any other value
+    unhashable, e.g. a metrics object, is identified by its identity.
+
+    :param value: The value to freeze
+    :return: The hashable value
+    """
+    if isinstance(value, dict):
+        return tuple(sorted(
+            ((k, freeze(v)) for k, v in value.items()),
+            key=lambda item: repr(item[0])
+        ))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return (type(value).__name__, id(value))
+    return value
+
+
+class ClientRegistry:
+    """A bounded registry of clients, so calls with the same server,
+    credentials and options reuse one client and its pooled connections.
+
+    Up to `max_clients` clients are kept, the least recently used is closed
+    and evicted first. It is safe to share between threads.
+    """
+
+    def __init__(self, max_clients: int = DEFAULT_MAX_CLIENTS) -> None:
+        """Creates a :class:`ClientRegistry`.
+
+        :param max_clients: The maximum number of clients kept
+        """
+        self.max_clients = max(1, max_clients)
+        self._lock = threading.Lock()
+        self._clients: OrderedDict[Hashable, Client] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._clients
+
+    def get(self, key: Hashable, factory: Callable[[], Client]) -> Client:
+        """Gets the client of a key, creating it if not registered.
+
+        :param key: The key of the client
+        :param factory: Creates the client if not registered
+        :return: The client
+        """
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+            client = factory()
+            self._clients[key] = client
+            evicted = []
+            while len(self._clients) > self.max_clients:
+                evicted.append(self._clients.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        return client
+
+    def remove(self, key: Hashable) -> None:
+        """Closes and removes the client of a key, if registered.
+
+        :param key: The key of the client
+        :return: Nothing
+        """
+        with self._lock:
+            client = self._clients.pop(key, None)
+        if client is not None:
+            client.close()
+
+    def clear(self) -> List[Client]:
+        """Removes all the clients without closing them.
+
+        :return: The clients removed
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        return clients
+
+    def close(self) -> None:
+        """Closes and removes all the clients.
+
+        :return: Nothing
+        """
+        for client in self.clear():
+            client.close()
+
+
+#: The registry of the clients of the functions facade and the shared clients
+#: of the factories.
+default_registry = ClientRegistry()
+
+
+def close_clients() -> None:
+    """Closes and removes all the clients of the :data:`default_registry`,
+    e.g. before forking a process or when credentials are revoked.
+
+    :return: Nothing
+    """
+    default_registry.close()
@@ -0,0 +1,167 @@
+"""Policies to retry calls failed by transient errors."""
+
+from __future__ import annotations
+
+import random
+import time
+
+from typing import TYPE_CHECKING, Collection, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+
+#: Status codes of responses retried by default.
+DEFAULT_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+#: HTTP methods retried by default. Calls with other methods are retried only
+#: if marked as idempotent.
+DEFAULT_RETRY_METHODS = frozenset({"get", "head", "put", "delete", "options"})
+
+
+class RetryPolicy:
+    """How to retry calls failed by transient errors.
+
+    A call is retried up to `max_attempts` attempts in total when it fails
+    with a connection error or a timeout, or the server responds with one of
+    `retry_statuses`. Only calls with idempotent methods are retried, unless
+    the call is explicitly marked as idempotent.
+
+    Attempts are spaced by an exponential backoff with full jitter, a random
+    delay between zero and ``backoff_factor * 2 ** retry`` capped to
+    `max_backoff` seconds, so many clients failing at once don't retry at
+    once. The delay requested by the server in a ``Retry-After`` header takes
+    precedence, but the call is not retried if it is longer than
+    `max_backoff`.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30,
+        retry_statuses: Collection[int] = DEFAULT_RETRY_STATUSES,
+        retry_methods: Collection[str] = DEFAULT_RETRY_METHODS,
+        respect_retry_after: bool = True
+    ) -> None:
+        """Creates a :class:`RetryPolicy`.
+
+        :param max_attempts: Maximum number of attempts, the first included
+        :param backoff_factor: Seconds of the base delay between attempts
+        :param max_backoff: Maximum seconds to wait between attempts
+        :param retry_statuses: Status codes of the responses to retry
+        :param retry_methods: HTTP methods of the calls to retry
+        :param respect_retry_after: Whether to wait the delay requested by the
+            server in the ``Retry-After`` header
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(m.lower() for m in retry_methods)
+        self.respect_retry_after = respect_retry_after
+
+    def can_retry(
+        self,
+        method: str,
+        attempt: int,
+        idempotent: bool = None
+    ) -> bool:
+        """Whether a call can be attempted again.
+
+        :param method: The HTTP method of the call
+        :param attempt: The number of attempts made, starting at 1
+        :param idempotent: Whether the call is idempotent whatever its
+            method. Inferred from the method if not provided
+        :return: ``True`` if there are attempts left and the call is safe to
+            repeat
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if idempotent is None:
+            return method.lower() in self.retry_methods
+        return idempotent
+
+    def is_retryable_error(self, error: Exception) -> bool:
+        """Whether an error of a call is transient: a connection error, a
+        timeout or a broken response. The request may not have reached the
+        server or the response was lost.
+
+        :param error: The error raised by the call
+        :return: ``True`` if the call can succeed when retried
+        """
+        import requests
+
+        return isinstance(error, (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ))
+
+    def is_retryable_response(self, response: requests.Response) -> bool:
+        """Whether a response is a transient error.
+
+        :param response: The response of the call
+        :return: ``True`` if the call can succeed when retried
+        """
+        return response.status_code in self.retry_statuses
+
+    def get_backoff(self, attempt: int) -> float:
+        """Gets a random delay before the next attempt.
+
+        :param attempt: The number of attempts made, starting at 1
+        :return: The seconds to wait
+        """
+        ceiling = self.backoff_factor * (2 ** (attempt - 1))
+        return random.uniform(0, min(self.max_backoff, ceiling))
+
+    def get_retry_after(self, response: requests.Response) -> Optional[float]:
+        """Gets the delay requested by the server in a response.
+
+        :param response: The response of the call
+        :return: The seconds to wait, or ``None`` if not requested or not
+            respected
+        """
+        value = response.headers.get("Retry-After")
+        if not value or not self.respect_retry_after:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        import email.utils
+
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, date.timestamp() - time.time())
+
+    def get_delay(
+        self,
+        attempt: int,
+        response: requests.Response = None
+    ) -> Optional[float]:
+        """Gets the delay before the next attempt.
+
+        :param attempt: The number of attempts made, starting at 1
+        :param response: The response of the failed attempt, if any
+        :return: The seconds to wait, or ``None`` if the server requested a
+            delay longer than `max_backoff`
+        """
+        retry_after = (
+            self.get_retry_after(response) if response is not None else None
+        )
+        if retry_after is None:
+            return self.get_backoff(attempt)
+        if retry_after > self.max_backoff:
+            return None
+        return retry_after
+
+    def sleep(self, seconds: float) -> None:
+        """Waits before the next attempt.
+
+        :param seconds: The seconds to wait
+        :return: Nothing
+        """
+        time.sleep(seconds)
@@ -0,0 +1,137 @@
+"""Projections of the metadata of models."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence
+
+
+#: The fields of the models kept by a :class:`ModelSummary`.
+SUMMARY_FIELDS = (
+    "id", "name", "engine", "category", "image.id", "image.size"
+)
+
+Projection = Dict[str, Optional["Projection"]]
+
+
+def compile_fields(fields: Sequence[str]) -> Projection:
+    """Compiles the fields to keep in a tree of keys.
+
+    Nested fields are given as dotted paths, e.g. ``image.size``. A field
+    keeps the whole value, including the fields nested in it.
+
+    :param fields: The fields to keep
+    :return: The fields by key, with the nested fields to keep or ``None``
+        to keep the whole value
+    """
+    projection: Projection = {}
+    for field in fields:
+        node = projection
+        keys = field.split(".")
+        for key in keys[:-1]:
+            child = node.setdefault(key, {})
+            if child is None:
+                break
+            node = child
+        else:
+            node[keys[-1]] = None
+    return projection
+
+
+def project(value: Any, projection: Projection) -> Any:
+    """Keeps only some fields of a value.
+
+    Dicts keep the keys of the projection, lists are projected item by item
+    and any other value is kept as is.
+
+    :param value: The value to project
+    :param projection: The fields to keep, see :func:`compile_fields`
+    :return: The projected value
+    """
+    if isinstance(value, list):
+        return [project(item, projection) for item in value]
+    if not isinstance(value, dict):
+        return value
+    projected = {}
+    for key, fields in projection.items():
+        if key in value:
+            child = value[key]
+            if fields is not None:
+                child = project(child, fields)
+            projected[key] = child
+    return projected
+
+
+def project_model(model: dict, fields: Sequence[str]) -> dict:
+    """Keeps only some fields of a model.
+
+    :param model: The model
+    :param fields: The fields to keep, dotted paths for nested fields,
+        e.g. ``image.size``
+    :return: The projected model
+    """
+    return project(model, compile_fields(fields))
+
+
+class ModelSummary:
+    """A compact record of the fields of a model most listings need.
+
+    :ivar id: The id of the model
+    :ivar name: The name of the model
+    :ivar engine: The engine of the model
+    :ivar category: The category of the model, e.g. ``Regression``
+    :ivar image_id: The id of the image of the model
+    :ivar image_size: The size in bytes of the image of the model
+    """
+
+    __slots__ = ("id", "name", "engine", "category", "image_id", "image_size")
+
+    def __init__(
+        self,
+        id: Optional[int],
+        name: str,
+        engine: Optional[str],
+        category: Optional[str] = None,
+        image_id: Optional[int] = None,
+        image_size: Optional[int] = None
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.engine = engine
+        self.category = category
+        self.image_id = image_id
+        self.image_size = image_size
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"name={self.name!r}, engine={self.engine!r})"
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ModelSummary):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    @classmethod
+    def from_model(cls, model: dict) -> ModelSummary:
+        """Creates a :class:`ModelSummary` from the metadata of a model.
+
+        :param model: The model
+        :return: The summary of the model
+        """
+        image = model.get("image") or {}
+        return cls(
+            model.get("id"),
+            model["name"],
+            model.get("engine"),
+            category=model.get("category"),
+            image_id=image.get("id"),
+            image_size=image.get("size")
+        )
+
+    def to_dict(self) -> dict:
+        """Gets the fields of the summary.
+
+        :return: The fields by name
+        """
+        return {key: getattr(self, key) for key in self.__slots__}
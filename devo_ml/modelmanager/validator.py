@@ -1,12 +1,252 @@
 """A set of convenient validators."""
 
-import validators
+import functools
+import ipaddress
+import os
+import re
 
+from typing import BinaryIO, Callable
+from urllib.parse import urlsplit
 
-def is_valid_url(url: str) -> bool:
+from .error import InvalidModelFile
+
+
+_schemes = ("http", "https", "ftp")
+
+_label = re.compile(r"^(?!-)[A-Za-z0-9-]{1,63}(?<!-)$")
+
+_tld = re.compile(r"^(?:[A-Za-z]{2,63}|xn--[A-Za-z0-9-]{1,59})$")
+
+_userinfo = re.compile(r"^[^\s/?#@]*$")
+
+#: Signature type for validators of model files.
+FileValidator = Callable[[str], None]
+
+#: Size in bytes of the pieces of the model files read by the validators.
+VALIDATION_CHUNK_SIZE = 1024 * 1024
+
+#: Magic bytes the binary models of CatBoost start with.
+CATBOOST_MAGIC = b"CBM1"
+
+# Wire types of the top level fields of an ONNX ``ModelProto``
+_onnx_fields = {
+    1: 0, 2: 2, 3: 2, 4: 2, 5: 0, 6: 2, 7: 2, 8: 2, 14: 2, 20: 2, 25: 2,
+    26: 2,
+}
+_onnx_graph = 7
+
+_json_token = re.compile(rb"[^\s,:0-9A-Za-z+\-.]")
+_json_string_body = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+_json_closers = {ord("}"): ord("{"), ord("]"): ord("[")}
+
+
+def _is_valid_host(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        pass
+    labels = host.rstrip(".").split(".")
+    if len(labels) < 2 or not _tld.match(labels[-1]):
+        return False
+    return all(_label.match(label) for label in labels)
+
+
+@functools.lru_cache(maxsize=256)
+def is_valid_url(url: str, strict: bool = False) -> bool:
     """Checks whether a URL is valid.
 
+    The URL must be an absolute ``http``, ``https`` or ``ftp`` URL with a
+    valid domain name, IP address or ``localhost`` host and a valid port, if
+    any. The check only uses the standard library. With `strict` the URL is
+    also checked with the `validators <https://pypi.org/project/validators/>`_
+    package, imported on first use.
+
     :param url: URL to check
+    :param strict: Whether to also check with ``validators``
     :return: True if url is valid, False otherwise
     """
-    return validators.url(url)
+    if not isinstance(url, str) or any(c.isspace() for c in url):
+        return False
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return False
+    if parts.scheme.lower() not in _schemes or not parts.hostname:
+        return False
+    userinfo, _, _ = parts.netloc.rpartition("@")
+    if not _userinfo.match(userinfo):
+        return False
+    if port is not None and port == 0:
+        return False
+    if not _is_valid_host(parts.hostname):
+        return False
+    if strict:
+        import validators
+
+        return bool(validators.url(url))
+    return True
+
+
+def validate_onnx_file(file: str) -> None:
+    """Checks that a file is an ONNX model.
+
+    The top level fields of the protobuf message are walked, skipping their
+    content, so only a few bytes of the file are read. The file must have a
+    graph and end with the last field.
+
+    :param file: The path of the file
+    :raises InvalidModelFile: If the file is not an ONNX model
+    :return: Nothing
+    """
+    size = os.path.getsize(file)
+    has_graph = False
+    with open(file, "rb") as f:
+        while f.tell() < size:
+            key = _read_varint(f, file)
+            field, wire_type = key >> 3, key & 7
+            expected = _onnx_fields.get(field)
+            if expected is None or wire_type != expected:
+                raise InvalidModelFile(file, "not an ONNX protobuf message")
+            value = _read_varint(f, file)
+            if wire_type == 2:
+                if f.tell() + value > size:
+                    raise InvalidModelFile(file, "truncated ONNX message")
+                f.seek(value, os.SEEK_CUR)
+            has_graph = has_graph or field == _onnx_graph
+    if not has_graph:
+        raise InvalidModelFile(file, "ONNX model without graph")
+
+
+def _read_varint(f: BinaryIO, file: str) -> int:
+    value = 0
+    for shift in range(0, 70, 7):
+        byte = f.read(1)
+        if not byte:
+            raise InvalidModelFile(file, "truncated ONNX message")
+        value |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return value
+    raise InvalidModelFile(file, "not an ONNX protobuf message")
+
+
+def validate_zip_file(file: str) -> None:
+    """Checks that a file is a zip archive with a sound central directory.
+
+    Only the central directory is read. Every entry must lie within the
+    file, so truncated archives are rejected.
+
+    :param file: The path of the file
+    :raises InvalidModelFile: If the file is not a zip archive
+    :return: Nothing
+    """
+    import zipfile
+
+    try:
+        with zipfile.ZipFile(file) as archive:
+            entries = archive.infolist()
+    except zipfile.BadZipFile as e:
+        raise InvalidModelFile(file, f"not a zip archive: {e}") from e
+    if not entries:
+        raise InvalidModelFile(file, "empty zip archive")
+    size = os.path.getsize(file)
+    for entry in entries:
+        if entry.header_offset + entry.compress_size > size:
+            raise InvalidModelFile(file, "truncated zip archive")
+
+
+def validate_json_file(file: str) -> None:
+    """Checks that a file is a JSON object or array.
+
+    The file is read in pieces checking its structure: brackets and braces
+    are balanced, strings are terminated and nothing follows the document.
+    Numbers and literals are not decoded.
+
+    :param file: The path of the file
+    :raises InvalidModelFile: If the file is not a JSON object or array
+    :return: Nothing
+    """
+    stack = bytearray()
+    # Strings may span pieces, the state is carried instead of the string
+    in_string = False
+    escaped = False
+    with open(file, "rb") as f:
+        chunks = iter(lambda: f.read(VALIDATION_CHUNK_SIZE), b"")
+        for chunk in chunks:
+            pos = 0
+            if not stack:
+                pos = len(chunk) - len(chunk.lstrip())
+                if pos == len(chunk):
+                    continue
+                if chunk[pos] not in b"{[":
+                    raise InvalidModelFile(file, "not a JSON object or array")
+            while True:
+                if in_string:
+                    if escaped:
+                        pos += 1
+                        escaped = False
+                    body = _json_string_body.match(chunk, pos)
+                    end = body.end() if body is not None else pos
+                    if end == len(chunk):
+                        break
+                    if chunk[end] == ord("\\"):
+                        # The escaped character is in the next piece
+                        escaped = True
+                        break
+                    in_string = False
+                    pos = end + 1
+                match = _json_token.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.start()
+                token = chunk[pos]
+                if token == ord('"'):
+                    in_string = True
+                elif token in b"{[":
+                    stack.append(token)
+                elif token in _json_closers:
+                    if not stack or stack.pop() != _json_closers[token]:
+                        raise InvalidModelFile(file, "unbalanced JSON")
+                    if not stack:
+                        # The document ended, only whitespace may follow
+                        if chunk[pos + 1:].strip() or any(
+                            rest.strip() for rest in chunks
+                        ):
+                            raise InvalidModelFile(file, "data after JSON")
+                        return None
+                else:
+                    raise InvalidModelFile(file, "invalid JSON")
+                pos += 1
+    raise InvalidModelFile(file, "truncated JSON")
+
+
+def validate_zip_or_json_file(file: str) -> None:
+    """Checks that a file is a zip archive or a JSON object or array, for
+    engines whose models come in both forms.
+
+    :param file: The path of the file
+    :raises InvalidModelFile: If the file is neither valid zip nor JSON
+    :return: Nothing
+    """
+    with open(file, "rb") as f:
+        is_zip = f.read(2) == b"PK"
+    if is_zip:
+        validate_zip_file(file)
+    else:
+        validate_json_file(file)
+
+
+def validate_catboost_file(file: str) -> None:
+    """Checks that a file is a binary CatBoost model by its magic bytes.
+
+    :param file: The path of the file
+    :raises InvalidModelFile: If the file is not a CatBoost model
+    :return: Nothing
+    """
+    with open(file, "rb") as f:
+        magic = f.read(len(CATBOOST_MAGIC))
+    if magic != CATBOOST_MAGIC:
+        raise InvalidModelFile(file, "not a CatBoost model")
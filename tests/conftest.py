@@ -1,4 +1,12 @@
+import base64
+import gzip
+import http.server
+import json
 import os
+import re
+import threading
+
+from urllib.parse import parse_qs, unquote, urlsplit
 
 import pytest
 import requests
@@ -6,6 +14,7 @@ import requests
 from devo_ml.modelmanager import Client, LegacyClient
 from devo_ml.modelmanager.auth import create_auth_from_token, STANDALONE
 from devo_ml.modelmanager.downloader import Downloader
+from devo_ml.modelmanager.registry import close_clients
 
 
 class MockDownloader(Downloader):
@@ -13,6 +22,12 @@ class MockDownloader(Downloader):
         return f"{self.__class__.__name__}__returns"
 
 
+@pytest.fixture(autouse=True)
+def shared_clients():
+    yield
+    close_clients()
+
+
 @pytest.fixture
 def get_client():
     def _get_client(url, auth, downloader):
@@ -181,3 +196,228 @@ def mock_image_upload(requests_mock):
             json=response
         )
     return _mock_image_upload
+
+
+SESSIONS_PATH = "/models/images/upload/sessions"
+
+
+class StubModelManagerHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+        parts = urlsplit(self.path)
+        if parts.path.startswith(SESSIONS_PATH + "/"):
+            session = self.get_session(parts.path)
+            if session is None:
+                return self.send_json(404, {"code": 0, "msg": "Not found"})
+            return self.send_json(200, {"parts": sorted(session["parts"])})
+        if parts.path == "/models":
+            models = [
+                {**m, "image": {k: v for k, v in m["image"].items()
+                                if k != "image"}}
+                for m in self.server.models.values()
+            ]
+            return self.send_json(200, models)
+        name = unquote(parts.path[len("/models/"):])
+        if name.endswith("/image"):
+            return self.send_image(name[:-len("/image")])
+        model = self.server.models.get(name)
+        if model is None:
+            return self.send_json(204, None)
+        fast = parse_qs(parts.query).get("fast", ["True"])[0] == "True"
+        if fast:
+            image = {k: v for k, v in model["image"].items() if k != "image"}
+            model = {**model, "image": image}
+        return self.send_json(200, model)
+
+    def send_image(self, name):
+        image = self.server.images.get(name)
+        if not self.server.raw_images:
+            # Older servers don't know the route
+            return self.send_json(404, {"error": "Not Found"})
+        if image is None:
+            return self.send_json(404, {"code": 0, "msg": "Not found"})
+        start, end = 0, len(image)
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if self.server.segment_error and match and int(match.group(1)):
+            # Fails the segments after the first one
+            return self.send_json(*self.server.segment_error)
+        if self.server.ranges and match:
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(end, int(match.group(2)) + 1)
+            self.send_response(206)
+            self.send_header(
+                "Content-Range",
+                f"bytes {start}-{end - 1}/{len(image)}"
+            )
+        else:
+            self.send_response(200)
+        body = image[start:end]
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.server.image_failures:
+            # Cuts the body to fail the transfer
+            self.server.image_failures -= 1
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return None
+        self.wfile.write(body)
+
+    def read_body(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            pieces = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                pieces.append(self.rfile.read(size))
+                self.rfile.readline()
+                if not size:
+                    break
+            body = b"".join(pieces)
+        else:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.encodings.append(self.headers.get("Content-Encoding"))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return body
+
+    def get_session(self, path):
+        session_id = path[len(SESSIONS_PATH) + 1:].split("/")[0]
+        return self.server.sessions.get(session_id)
+
+    def send_upload(self, body):
+        self.server.uploads.append(body)
+        return self.send_json(200, {
+            "valid": True,
+            "imageId": len(self.server.uploads),
+            "size": len(body),
+        })
+
+    def do_POST(self):
+        self.server.requests.append(("POST", self.path))
+        body = self.read_body()
+        if self.path == "/models/images/upload":
+            return self.send_upload(body)
+        if self.path == SESSIONS_PATH:
+            if not self.server.upload_sessions:
+                return self.send_json(404, {"code": 0, "msg": "Not found"})
+            request = json.loads(body)
+            session_id = str(len(self.server.sessions) + 1)
+            self.server.sessions[session_id] = {**request, "parts": {}}
+            return self.send_json(200, {
+                "sessionId": session_id,
+                "partSize": request["partSize"],
+            })
+        if self.path.startswith(SESSIONS_PATH + "/"):
+            session = self.get_session(self.path)
+            parts = session["parts"]
+            if sorted(parts) != list(range(json.loads(body)["parts"])):
+                return self.send_json(400, {"code": 0, "msg": "Missing part"})
+            return self.send_upload(b"".join(parts[i] for i in sorted(parts)))
+        model = json.loads(body)
+        self.server.models[model["name"]] = model
+        return self.send_json(200, None)
+
+    def do_PUT(self):
+        self.server.requests.append(("PUT", self.path))
+        body = self.read_body()
+        session = self.get_session(self.path)
+        index = int(self.path.rsplit("/", 1)[1])
+        if index in self.server.failing_parts:
+            self.server.failing_parts.remove(index)
+            return self.send_json(500, {"code": 0, "msg": "Unexpected"})
+        session["parts"][index] = body
+        return self.send_json(200, None)
+
+    def send_json(self, code, response):
+        body = b"" if response is None else json.dumps(response).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        accept = self.headers.get("Accept-Encoding", "")
+        if self.server.gzip and body and "gzip" in accept:
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        if self.server.chunked and body:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(body), 1000):
+                piece = body[i:i + 1000]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def stub_server():
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        StubModelManagerHandler
+    )
+    server.daemon_threads = True
+    server.models = {}
+    server.uploads = []
+    server.requests = []
+    server.chunked = False
+    server.gzip = False
+    server.encodings = []
+    server.images = {}
+    server.raw_images = True
+    server.ranges = True
+    server.image_failures = 0
+    server.segment_error = None
+    server.upload_sessions = True
+    server.sessions = {}
+    server.failing_parts = set()
+    server.url = f"http://127.0.0.1:{server.server_port}"
+
+    def add_model(name, engine, image_bytes):
+        server.images[name] = image_bytes
+        server.models[name] = {
+            "name": name,
+            "engine": engine,
+            "image": {
+                "id": len(server.models) + 1,
+                "size": len(image_bytes),
+                "image": base64.b64encode(image_bytes).decode(),
+            },
+        }
+
+    server.add_model = add_model
+    thread = threading.Thread(
+        target=server.serve_forever,
+        args=(0.01,),
+        daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def read_file():
+    def _read_file(file):
+        with open(file, "rb") as f:
+            return f.read()
+    return _read_file
+
+
+@pytest.fixture
+def stub_downloads(stub_server):
+    def _stub_downloads(name=None):
+        # Calls getting a model with its image, of a model if a name given
+        return [
+            r for r in stub_server.requests
+            if "fast=False" in r[1]
+            and (name is None or f"/{name}?" in r[1])
+        ]
+    return _stub_downloads
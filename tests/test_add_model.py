@@ -1,7 +1,14 @@
+import json
+import os
+
 import pytest
 
-from devo_ml.modelmanager import engines
+from devo_ml.modelmanager import Client, engines
+from devo_ml.modelmanager.auth import HttpDevoStandAloneTokenAuth
+from devo_ml.modelmanager.cache import UploadIndex, UploadSessionStore
+from devo_ml.modelmanager.error import InvalidModelFile
 from devo_ml.modelmanager.error import ModelManagerError, ModelAlreadyExists
+from devo_ml.modelmanager.error import TokenError
 
 
 def test_add_non_existing_model(
@@ -99,3 +106,344 @@ def test_add_model_with_invalid_image(
             engines.IDA,
             abs_path("./data/test.zip")
         )
+
+
+def test_add_model_streams_and_closes_file(
+    client,
+    abs_path,
+    mock_get_model,
+    mock_image_upload,
+    mock_post_model,
+    image_metadata,
+    requests_mock,
+    monkeypatch
+):
+    opened = []
+    real_open = open
+
+    def spy_open(*args, **kwargs):
+        f = real_open(*args, **kwargs)
+        opened.append(f)
+        return f
+
+    monkeypatch.setattr("builtins.open", spy_open)
+    mock_get_model("model_name", fast=True)
+    mock_image_upload(response=image_metadata)
+    mock_post_model()
+    client.add_model("model_name", engines.IDA, abs_path("./data/test.zip"))
+    upload = requests_mock.request_history[1]
+    assert upload.headers["Content-Type"].startswith("multipart/form-data")
+    assert int(upload.headers["Content-Length"]) > 240406
+    assert opened and all(f.closed for f in opened)
+
+
+@pytest.fixture
+def indexed_client(client, tmp_path):
+    client.upload_index = UploadIndex(tmp_path / "uploads.json")
+    return client
+
+
+def test_add_model_reuses_uploaded_image(
+    indexed_client,
+    abs_path,
+    requests_mock,
+    mock_get_model,
+    mock_image_upload,
+    mock_post_model,
+    image_metadata
+):
+    mock_get_model("first", fast=True)
+    mock_get_model("second", fast=True)
+    mock_image_upload(response=image_metadata)
+    mock_post_model()
+    indexed_client.add_model("first", engines.IDA, abs_path("data/test.zip"))
+    indexed_client.add_model("second", engines.IDA, abs_path("data/test.zip"))
+    uploads = [
+        r for r in requests_mock.request_history
+        if r.path == "/models/images/upload"
+    ]
+    assert len(uploads) == 1
+    assert requests_mock.request_history[-1].json()["image"] == {
+        "id": image_metadata["imageId"],
+        "size": image_metadata["size"]
+    }
+    index = UploadIndex(indexed_client.upload_index.path)
+    digest = index.file_digest(abs_path("data/test.zip"))
+    upload_url = "http://localhost/models/images/upload"
+    assert index.get(upload_url, digest, engines.IDA) == image_metadata
+    assert index.get(upload_url, digest, engines.ONNX) is None
+    assert index.get("http://other.example.com", digest, engines.IDA) is None
+
+
+def test_add_model_uploads_again_a_missing_image(
+    indexed_client,
+    abs_path,
+    requests_mock,
+    mock_get_model,
+    mock_image_upload,
+    image_metadata
+):
+    mock_get_model("model_name", fast=True)
+    mock_image_upload(response=image_metadata)
+    requests_mock.post("http://localhost/models", [
+        {"status_code": 404, "json": {"code": 0, "msg": "Image not found"}},
+        {"json": {}},
+    ])
+    index = indexed_client.upload_index
+    digest = index.file_digest(abs_path("data/test.zip"))
+    upload_url = "http://localhost/models/images/upload"
+    index.put(
+        upload_url,
+        digest,
+        engines.IDA,
+        {**image_metadata, "imageId": "gone"}
+    )
+    indexed_client.add_model(
+        "model_name",
+        engines.IDA,
+        abs_path("data/test.zip")
+    )
+    assert requests_mock.request_history[-1].json()["image"]["id"] == (
+        image_metadata["imageId"]
+    )
+    assert index.get(upload_url, digest, engines.IDA) == image_metadata
+
+
+@pytest.mark.parametrize("code,response,exception", [
+    (401, {"code": 5, "msg": "Token invalid"}, TokenError),
+    (500, {"code": 0, "msg": "Internal error"}, ModelManagerError),
+])
+def test_add_model_errors_not_uploaded_again(
+    indexed_client,
+    abs_path,
+    requests_mock,
+    mock_get_model,
+    mock_image_upload,
+    image_metadata,
+    code,
+    response,
+    exception
+):
+    mock_get_model("model_name", fast=True)
+    mock_image_upload(response=image_metadata)
+    requests_mock.post(
+        "http://localhost/models",
+        status_code=code,
+        json=response
+    )
+    index = indexed_client.upload_index
+    digest = index.file_digest(abs_path("data/test.zip"))
+    upload_url = "http://localhost/models/images/upload"
+    index.put(upload_url, digest, engines.IDA, image_metadata)
+    with pytest.raises(exception):
+        indexed_client.add_model(
+            "model_name",
+            engines.IDA,
+            abs_path("data/test.zip")
+        )
+    assert not [
+        r for r in requests_mock.request_history if r.url == upload_url
+    ]
+    assert index.get(upload_url, digest, engines.IDA) == image_metadata
+
+
+def test_add_model_index_shared_by_servers(
+    indexed_client,
+    abs_path,
+    requests_mock,
+    mock_get_model,
+    mock_image_upload,
+    mock_post_model,
+    image_metadata
+):
+    mock_get_model("model_name", fast=True)
+    mock_image_upload(response=image_metadata)
+    mock_post_model()
+    other_url = "http://other.example.com"
+    requests_mock.get(f"{other_url}/models/model_name?fast=True", json={})
+    requests_mock.post(f"{other_url}/models/images/upload", json={
+        **image_metadata,
+        "imageId": "other"
+    })
+    requests_mock.post(f"{other_url}/models", json={})
+    other_client = Client(
+        other_url,
+        HttpDevoStandAloneTokenAuth("token"),
+        upload_index=indexed_client.upload_index
+    )
+    model_file = abs_path("data/test.zip")
+    indexed_client.add_model("model_name", engines.IDA, model_file)
+    other_client.add_model("model_name", engines.IDA, model_file)
+    uploads = [
+        r.url for r in requests_mock.request_history
+        if r.path == "/models/images/upload"
+    ]
+    assert uploads == [
+        "http://localhost/models/images/upload",
+        f"{other_url}/models/images/upload",
+    ]
+    assert requests_mock.last_request.json()["image"]["id"] == "other"
+
+
+def _chunked_client(stub_server, tmp_path, **kwargs):
+    return Client(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        chunked_uploads=True,
+        upload_sessions=UploadSessionStore(tmp_path / "sessions.json"),
+        **{"upload_part_size": 100, **kwargs}
+    )
+
+
+def _requests(stub_server, method, path):
+    return [
+        r for r in stub_server.requests
+        if r[0] == method and path in r[1]
+    ]
+
+
+@pytest.fixture
+def large_file(tmp_path):
+    file = tmp_path / "model.zip"
+    file.write_bytes(os.urandom(1000))
+    return str(file)
+
+
+def test_add_model_in_parts(stub_server, tmp_path, large_file):
+    client = _chunked_client(stub_server, tmp_path)
+    client.add_model("foo", engines.H2O, large_file)
+    with open(large_file, "rb") as f:
+        assert stub_server.uploads == [f.read()]
+    assert stub_server.models["foo"]["image"] == {"id": 1, "size": 1000}
+    assert len(_requests(stub_server, "PUT", "/parts/")) == 10
+    assert len(client.upload_sessions) == 0
+
+
+def test_add_model_resumes_upload(stub_server, tmp_path, large_file):
+    stub_server.failing_parts.add(5)
+    client = _chunked_client(stub_server, tmp_path, upload_workers=1)
+    with pytest.raises(ModelManagerError):
+        client.add_model("foo", engines.H2O, large_file)
+    assert not stub_server.uploads
+    # Another process resumes the upload from the persisted session
+    client = _chunked_client(stub_server, tmp_path)
+    assert len(client.upload_sessions) == 1
+    key = client.upload_sessions.file_key(
+        f"{stub_server.url}/models/images/upload/sessions",
+        engines.H2O,
+        large_file
+    )
+    assert client.upload_sessions.get(key) is not None
+    client.add_model("foo", engines.H2O, large_file)
+    with open(large_file, "rb") as f:
+        assert stub_server.uploads == [f.read()]
+    assert len(_requests(stub_server, "PUT", "/parts/")) == 6 + 5
+    assert len(_requests(stub_server, "POST", "/sessions")) == 2
+    assert len(UploadSessionStore(tmp_path / "sessions.json")) == 0
+
+
+def test_add_model_restarts_expired_upload(stub_server, tmp_path, large_file):
+    stub_server.failing_parts.add(5)
+    client = _chunked_client(stub_server, tmp_path, upload_workers=1)
+    with pytest.raises(ModelManagerError):
+        client.add_model("foo", engines.H2O, large_file)
+    stub_server.sessions.clear()
+    client.add_model("foo", engines.H2O, large_file)
+    with open(large_file, "rb") as f:
+        assert stub_server.uploads == [f.read()]
+    assert len(_requests(stub_server, "PUT", "/parts/")) == 6 + 10
+
+
+def test_add_model_without_chunked_uploads(stub_server, tmp_path, large_file):
+    stub_server.upload_sessions = False
+    client = _chunked_client(stub_server, tmp_path)
+    client.add_model("foo", engines.H2O, large_file)
+    client.add_model("bar", engines.H2O, large_file)
+    assert len(stub_server.uploads) == 2
+    assert len(_requests(stub_server, "POST", "/sessions")) == 1
+    assert not _requests(stub_server, "PUT", "/parts/")
+
+
+def test_add_small_model_in_one_call(stub_server, tmp_path, abs_path):
+    client = _chunked_client(stub_server, tmp_path, upload_part_size=10 ** 6)
+    client.add_model("foo", engines.IDA, abs_path("data/test.zip"))
+    assert len(stub_server.uploads) == 1
+    assert not _requests(stub_server, "POST", "/sessions")
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    models = tmp_path / "models"
+    models.mkdir()
+    for file in ["a.onnx", "b.h2o.zip", "c.zip", ".hidden.onnx"]:
+        (models / file).write_bytes(file.encode())
+    return models
+
+
+def test_add_models_from_directory(stub_server, models_dir):
+    stub_server.add_model("a", engines.ONNX, b"a")
+    client = Client(stub_server.url, HttpDevoStandAloneTokenAuth("token"))
+    stub_server.requests.clear()
+    report = client.add_models(models_dir)
+    assert list(report) == ["a", "b", "c"]
+    assert isinstance(report["a"], ModelAlreadyExists)
+    assert report["b"] == {
+        "name": "b",
+        "file": str(models_dir / "b.h2o.zip"),
+        "engine": engines.H2O,
+        "description": None,
+        "replaced": False,
+    }
+    assert isinstance(report["c"], ModelManagerError)
+    assert stub_server.models["b"]["engine"] == engines.H2O
+    checks = [r for r in stub_server.requests if r[0] == "GET"]
+    assert len(checks) == 1 and checks[0][1].startswith("/models?")
+
+
+def test_add_models_with_force(stub_server, models_dir):
+    stub_server.add_model("a", engines.ONNX, b"a")
+    client = Client(stub_server.url, HttpDevoStandAloneTokenAuth("token"))
+    report = client.add_models(models_dir, force=True, max_workers=2)
+    assert report["a"]["replaced"]
+    assert not report["b"]["replaced"]
+    assert len(stub_server.uploads) == 2
+
+
+def test_add_models_from_manifest(stub_server, models_dir):
+    manifest = models_dir / "manifest.json"
+    manifest.write_text(json.dumps({"models": [
+        {"file": "c.zip", "engine": engines.MUA, "description": "first"},
+        {"name": "renamed", "file": str(models_dir / "a.onnx")},
+    ]}))
+    client = Client(stub_server.url, HttpDevoStandAloneTokenAuth("token"))
+    report = client.add_models(manifest)
+    assert report["c"]["engine"] == engines.MUA
+    assert stub_server.models["c"]["description"] == "first"
+    assert report["renamed"]["engine"] == engines.ONNX
+
+
+@pytest.mark.parametrize("manifest", [
+    '[{"file": "a.onnx"}, {"name": "a", "file": "b.onnx"}]',
+    '[{"name": "a"}]',
+    '{"models": {}}',
+    '[{"file": ',
+])
+def test_add_models_with_invalid_manifest(stub_server, tmp_path, manifest):
+    (tmp_path / "manifest.json").write_text(manifest)
+    client = Client(stub_server.url, HttpDevoStandAloneTokenAuth("token"))
+    with pytest.raises(ModelManagerError):
+        client.add_models(tmp_path / "manifest.json")
+    assert not stub_server.requests
+
+
+def test_add_model_validates_file(stub_server, tmp_path, abs_path):
+    client = Client(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        validate_files=True
+    )
+    with pytest.raises(InvalidModelFile):
+        client.add_model("foo", engines.ONNX, abs_path("data/test.zip"))
+    assert not stub_server.uploads
+    client.add_model("foo", engines.H2O, abs_path("data/test.zip"))
+    assert len(stub_server.uploads) == 1
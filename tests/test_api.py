@@ -0,0 +1,69 @@
+from requests.adapters import HTTPAdapter
+
+from devo_ml.modelmanager.api import Api
+
+
+def test_api_reuses_session(requests_mock):
+    requests_mock.get("http://localhost/models", json=[])
+    api = Api()
+    session = api.session
+    assert api.get("http://localhost/models") == []
+    assert api.get("http://localhost/models") == []
+    assert api.session is session
+
+
+def test_api_pool_options():
+    api = Api(pool_connections=2, pool_maxsize=20, pool_block=True)
+    adapter = api.session.get_adapter("https://localhost")
+    assert isinstance(adapter, HTTPAdapter)
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 20
+    assert adapter._pool_block is True
+    assert "pool_maxsize" not in api.request_options
+
+
+def test_api_close_releases_session():
+    with Api() as api:
+        session = api.session
+    assert api._session is None
+    assert api.session is not session
+
+
+def test_api_prunes_idle_connections(monkeypatch):
+    api = Api(idle_timeout=10)
+    session = api.session
+    closed = []
+    monkeypatch.setattr(session, "close", lambda: closed.append(True))
+    api._last_used -= 5
+    api.prune_idle_connections()
+    assert not closed
+    api._last_used -= 11
+    api.prune_idle_connections()
+    assert closed
+    assert api.session is session
+
+
+def test_client_context_manager_closes_api(client):
+    session = client.api.session
+    with client:
+        assert client.api.session is session
+    assert client.api._session is None
+
+
+def test_api_methods_are_bound_per_call(requests_mock):
+    requests_mock.get("http://localhost/models", json="get")
+    requests_mock.post("http://localhost/models", json="post")
+    api = Api()
+    get, post = api.get, api.post
+    assert post("http://localhost/models") == "post"
+    assert get("http://localhost/models") == "get"
+
+
+def test_api_accepts_compressed_responses(requests_mock):
+    requests_mock.get("http://localhost/models", json=[])
+    Api().get("http://localhost/models")
+    encodings = requests_mock.last_request.headers["Accept-Encoding"]
+    assert "gzip" in encodings
+    Api(compression=False).get("http://localhost/models")
+    assert requests_mock.last_request.headers["Accept-Encoding"] == "identity"
+    assert "compression" not in Api().request_options
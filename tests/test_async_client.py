@@ -0,0 +1,323 @@
+import asyncio
+import base64
+import io
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from devo_ml.modelmanager import AsyncClient, AsyncLegacyClient
+from devo_ml.modelmanager import create_async_client_from_token
+from devo_ml.modelmanager import get_models_async, get_model_async
+from devo_ml.modelmanager import find_model_async, add_model_async
+from devo_ml.modelmanager import engines, error
+from devo_ml.modelmanager.async_api import AsyncApi
+from devo_ml.modelmanager.auth import HttpDevoStandAloneTokenAuth
+from devo_ml.modelmanager.downloader import AsyncFileSystemDownloader
+from devo_ml.modelmanager.downloader import CachingDownloader
+from devo_ml.modelmanager.downloader import ModelStreamWriter
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def async_client(stub_server, tmp_path):
+    return AsyncClient(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        downloader=AsyncFileSystemDownloader(tmp_path)
+    )
+
+
+def test_async_get_models(async_client, stub_server):
+    stub_server.add_model("foo", engines.ONNX, b"foo")
+
+    async def main():
+        async with async_client:
+            return await async_client.get_models()
+
+    assert run(main()) == [{
+        "name": "foo",
+        "engine": engines.ONNX,
+        "image": {"id": 1, "size": 3},
+    }]
+
+
+@pytest.mark.parametrize("chunked,compressed", [
+    (False, False),
+    (True, False),
+    (False, True),
+    (True, True),
+])
+@pytest.mark.parametrize("stream", [False, True])
+def test_async_get_model_with_download_file(
+    async_client,
+    stub_server,
+    tmp_path,
+    chunked,
+    compressed,
+    stream
+):
+    stub_server.chunked = chunked
+    stub_server.gzip = compressed
+    image = os.urandom(100000)
+    stub_server.add_model("foo", engines.ONNX, image)
+
+    async def main():
+        async with async_client:
+            return await async_client.get_model(
+                "foo",
+                download_file=True,
+                stream=stream
+            )
+
+    model = run(main())
+    assert model == {
+        "name": "foo",
+        "engine": engines.ONNX,
+        "file": str(tmp_path / "foo.onnx"),
+    }
+    with open(model["file"], "rb") as f:
+        assert f.read() == image
+
+
+def test_async_client_reuses_connections(async_client, stub_server):
+    stub_server.add_model("foo", engines.ONNX, b"foo")
+
+    async def main():
+        async with async_client:
+            models = await asyncio.gather(*[
+                async_client.get_model("foo") for _ in range(20)
+            ])
+            idle = sum(len(c) for c in async_client.api._idle.values())
+            return models, idle
+
+    models, idle = run(main())
+    assert len(models) == 20
+    assert 0 < idle <= async_client.api.pool_maxsize
+
+
+def test_async_get_non_existing_model(async_client):
+    async def main():
+        async with async_client:
+            with pytest.raises(error.ModelNotFound):
+                await async_client.get_model("foo")
+            return await async_client.find_model("foo")
+
+    assert run(main()) is None
+
+
+def test_async_add_model(async_client, stub_server, abs_path):
+    async def main():
+        async with async_client:
+            await async_client.add_model(
+                "foo",
+                engines.IDA,
+                abs_path("./data/test.zip"),
+                description="bar"
+            )
+            with pytest.raises(error.ModelAlreadyExists):
+                await async_client.add_model(
+                    "foo",
+                    engines.IDA,
+                    abs_path("./data/test.zip")
+                )
+
+    run(main())
+    assert stub_server.models["foo"]["description"] == "bar"
+    assert stub_server.models["foo"]["image"]["id"] == 1
+    with open(abs_path("./data/test.zip"), "rb") as f:
+        assert f.read() in stub_server.uploads[0]
+
+
+def test_async_network_error():
+    client = AsyncClient(
+        "http://127.0.0.1:19",
+        HttpDevoStandAloneTokenAuth("token")
+    )
+    with pytest.raises(error.ModelManagerError):
+        run(client.get_models())
+
+
+def test_async_unsupported_option():
+    with pytest.raises(TypeError):
+        AsyncClient(
+            "http://localhost",
+            HttpDevoStandAloneTokenAuth("token"),
+            proxies={}
+        )
+
+
+def test_async_legacy_client_endpoints():
+    client = AsyncLegacyClient(
+        "http://localhost",
+        "self",
+        HttpDevoStandAloneTokenAuth("token")
+    )
+    assert client.endpoints.models() == "http://localhost/domains/self/models"
+
+
+def test_create_async_client_from_token(tmp_path):
+    client = create_async_client_from_token(
+        "http://localhost",
+        "token",
+        download_path=tmp_path
+    )
+    assert isinstance(client, AsyncClient)
+    assert client.downloader.path == str(tmp_path)
+
+
+def test_async_func_facade(stub_server, tmp_path, abs_path):
+    url = stub_server.url
+    run(add_model_async(
+        url,
+        "token",
+        "foo",
+        engines.IDA,
+        abs_path("./data/test.zip")
+    ))
+    models = run(get_models_async(url, "token"))
+    assert [m["name"] for m in models] == ["foo"]
+    assert run(get_model_async(url, "token", "foo"))["name"] == "foo"
+    assert run(find_model_async(url, "token", "bar")) is None
+
+
+def test_async_get_model_with_caching_downloader(stub_server, tmp_path):
+    stub_server.add_model("foo", engines.ONNX, b"foo")
+    client = AsyncClient(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        downloader=CachingDownloader(tmp_path)
+    )
+
+    async def main():
+        async with client:
+            await client.get_model("foo", download_file=True)
+            return await client.get_model("foo", download_file=True)
+
+    assert run(main())["file"] == str(tmp_path / "foo.onnx")
+    assert client.downloader.cache.hits == 1
+
+
+def test_async_api_compression():
+    request = AsyncApi().prepare_request("get", "http://localhost/models")
+    assert "gzip" in request.headers["Accept-Encoding"]
+    api = AsyncApi(compression=False)
+    request = api.prepare_request("get", "http://localhost/models")
+    assert request.headers["Accept-Encoding"] == "identity"
+
+
+async def _serve(handle):
+    # A small receive buffer, so the bodies are not absorbed by the socket
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024)
+    sock.bind(("127.0.0.1", 0))
+    server = await asyncio.start_server(handle, sock=sock)
+    port = sock.getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def _read_head(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").lower().split("\r\n")
+    return {
+        name.strip(): value.strip()
+        for name, _, value in (line.partition(":") for line in lines[1:])
+    }
+
+
+@pytest.mark.parametrize("as_file", [False, True])
+def test_async_api_timeout_by_write(as_file):
+    size = 12 * 1024 * 1024
+
+    async def handle(reader, writer):
+        # Reads the body slower than the timeout of the whole upload, but
+        # the end that may be buffered by the socket of the client
+        left = int((await _read_head(reader))["content-length"])
+        while left:
+            left -= len(await reader.read(min(left, 64 * 1024)))
+            if left > size // 2:
+                await asyncio.sleep(0.01)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+        await writer.drain()
+        writer.close()
+
+    async def main():
+        server, url = await _serve(handle)
+        body = b"x" * size
+        async with server, AsyncApi(timeout=0.3) as api:
+            start = time.monotonic()
+            response = await api.post(
+                f"{url}/models/images/upload",
+                data=io.BytesIO(body) if as_file else body
+            )
+            return response, time.monotonic() - start
+
+    response, elapsed = run(main())
+    assert response == {}
+    assert elapsed > 0.6
+
+
+def test_async_api_redirect_not_followed():
+    async def handle(reader, writer):
+        await _read_head(reader)
+        writer.write(
+            b"HTTP/1.1 302 Found\r\nLocation: http://elsewhere/models\r\n"
+            b"Content-Length: 0\r\n\r\n"
+        )
+        await writer.drain()
+        writer.close()
+
+    async def main():
+        server, url = await _serve(handle)
+        async with server, AsyncApi() as api:
+            await api.get(f"{url}/models")
+
+    with pytest.raises(error.ModelManagerError, match="Redirect"):
+        run(main())
+
+
+def test_async_api_proxy_not_supported(monkeypatch):
+    for name in ("NO_PROXY", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTP_PROXY", "http://proxy:3128")
+    with pytest.raises(error.ModelManagerError, match="Proxies"):
+        run(AsyncApi().get("http://localhost/models"))
+
+
+def test_async_download_stream_off_event_loop(tmp_path, monkeypatch):
+    threads = []
+    for method in ("write", "commit"):
+        original = getattr(ModelStreamWriter, method)
+
+        def record(self, *args, _original=original):
+            threads.append(threading.get_ident())
+            return _original(self, *args)
+
+        monkeypatch.setattr(ModelStreamWriter, method, record)
+    body = json.dumps({
+        "name": "foo",
+        "engine": engines.ONNX,
+        "image": {"image": base64.b64encode(b"foo").decode()},
+    }).encode()
+
+    async def chunks():
+        for i in range(0, len(body), 8):
+            yield body[i:i + 8]
+
+    async def main():
+        downloader = AsyncFileSystemDownloader(tmp_path)
+        model = await downloader.download_stream(chunks())
+        return model, threading.get_ident()
+
+    (model, file), loop_thread = run(main())
+    assert model["name"] == "foo"
+    with open(file, "rb") as f:
+        assert f.read() == b"foo"
+    assert len(threads) > 2 and loop_thread not in threads
+    assert os.listdir(tmp_path) == ["foo.onnx"]
@@ -0,0 +1,245 @@
+import os
+
+import pytest
+
+from devo_ml.modelmanager import Client, engines
+from devo_ml.modelmanager.auth import HttpDevoStandAloneTokenAuth
+from devo_ml.modelmanager.cache import MetadataCache, ModelFileCache
+from devo_ml.modelmanager.cache import get_image_key
+from devo_ml.modelmanager.downloader import CachingDownloader
+
+
+def _write(path, content):
+    with open(path, "wb") as f:
+        f.write(content)
+    return str(path)
+
+
+@pytest.mark.parametrize("image,key", [
+    ({"id": 1, "size": 10}, "1-10"),
+    ({"id": 1, "size": 10, "checksum": "a/b"}, "1-10-a_b"),
+    ({"size": 10}, None),
+])
+def test_get_image_key(image, key):
+    assert get_image_key(image) == key
+
+
+def test_model_file_cache_hits_and_misses(tmp_path):
+    cache = ModelFileCache(tmp_path / "cache")
+    assert cache.get("1-3") is None
+    stored = cache.put("1-3", _write(tmp_path / "a", b"foo"))
+    assert cache.get("1-3") == stored
+    with open(stored, "rb") as f:
+        assert f.read() == b"foo"
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "entries": 1,
+        "bytes": 3,
+    }
+
+
+def test_model_file_cache_evicts_least_recently_used(tmp_path):
+    cache = ModelFileCache(tmp_path / "cache", max_bytes=6)
+    cache.put("a", _write(tmp_path / "a", b"aaa"))
+    cache.put("b", _write(tmp_path / "b", b"bbb"))
+    os.utime(cache.get("b"), (1, 1))
+    cache._entries["b"] = (3, 1)
+    cache.put("c", _write(tmp_path / "c", b"ccc"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.size == 6
+    assert cache.evictions == 1
+
+
+def test_model_file_cache_reloads_entries(tmp_path):
+    ModelFileCache(tmp_path).put("a", _write(tmp_path / "x", b"aaa"))
+    assert ModelFileCache(tmp_path).get("a") == str(tmp_path / "a")
+
+
+def test_client_skips_download_of_cached_file(stub_server, tmp_path):
+    stub_server.add_model("foo", engines.ONNX, b"image")
+    stub_server.add_model("bar", engines.ONNX, b"other")
+    stub_server.models["bar"]["image"]["id"] = 1
+    stub_server.models["bar"]["image"]["size"] = 5
+    downloader = CachingDownloader(tmp_path)
+    with Client(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        downloader=downloader
+    ) as client:
+        first = client.get_model("foo", download_file=True)
+        second = client.get_model("foo", download_file=True)
+        # Same image identity, reused across model names
+        third = client.get_model("bar", download_file=True, stream=True)
+    heavy = [r for r in stub_server.requests if "fast=False" in r[1]]
+    assert len(heavy) == 1
+    assert first == second
+    assert third["file"] == str(tmp_path / "bar.onnx")
+    for model in (first, third):
+        with open(model["file"], "rb") as f:
+            assert f.read() == b"image"
+    assert downloader.cache.stats()["hits"] == 2
+
+
+def test_client_caches_streamed_file(stub_server, tmp_path):
+    stub_server.add_model("foo", engines.ONNX, b"image")
+    downloader = CachingDownloader(tmp_path, max_bytes=100, stream=True)
+    with Client(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        downloader=downloader
+    ) as client:
+        client.get_model("foo", download_file=True)
+        os.remove(tmp_path / "foo.onnx")
+        model = client.get_model("foo", download_file=True)
+    with open(model["file"], "rb") as f:
+        assert f.read() == b"image"
+    assert downloader.cache.stats()["hits"] == 1
+    assert downloader.cache.stats()["misses"] == 1
+
+
+@pytest.fixture
+def cached_client():
+    return Client(
+        "http://localhost",
+        HttpDevoStandAloneTokenAuth("token"),
+        metadata_cache=MetadataCache(ttl=60)
+    )
+
+
+def test_metadata_cache_evicts_least_recently_used():
+    cache = MetadataCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a").value == 1
+    assert len(cache) == 2
+
+
+def test_metadata_cache_expires_entries():
+    cache = MetadataCache(ttl=0)
+    cache.put("a", 1, etag='"1"')
+    entry = cache.get("a")
+    assert not entry.fresh
+    assert entry.validators() == {"If-None-Match": '"1"'}
+    assert cache.stats()["misses"] == 1
+
+
+def test_client_serves_fresh_metadata_from_cache(
+    cached_client,
+    requests_mock
+):
+    requests_mock.get(
+        "http://localhost/models/name?fast=True",
+        json={"name": "name", "image": {"id": 1}}
+    )
+    assert cached_client.get_model("name") == {"name": "name"}
+    assert cached_client.find_model("name") == {"name": "name"}
+    assert requests_mock.call_count == 1
+    assert cached_client.metadata_cache.stats()["hits"] == 1
+
+
+def test_client_revalidates_stale_metadata(cached_client, requests_mock):
+    cached_client.metadata_cache.ttl = 0
+    requests_mock.get("http://localhost/models", [
+        {"json": [{"name": "a"}], "headers": {"ETag": '"v1"'}},
+        {"status_code": 304},
+    ])
+    assert cached_client.get_models() == [{"name": "a"}]
+    assert cached_client.get_models() == [{"name": "a"}]
+    last_request = requests_mock.request_history[-1]
+    assert last_request.headers["If-None-Match"] == '"v1"'
+    assert cached_client.metadata_cache.revalidations == 1
+
+
+def test_client_refetches_changed_metadata(cached_client, requests_mock):
+    cached_client.metadata_cache.ttl = 0
+    last_modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+    requests_mock.get("http://localhost/models", [
+        {"json": [], "headers": {"Last-Modified": last_modified}},
+        {"json": [{"name": "a"}]},
+    ])
+    assert cached_client.get_models() == []
+    assert cached_client.get_models() == [{"name": "a"}]
+    last_request = requests_mock.request_history[-1]
+    assert last_request.headers["If-Modified-Since"] == last_modified
+
+
+def test_client_invalidates_metadata_of_added_model(
+    cached_client,
+    abs_path,
+    requests_mock
+):
+    requests_mock.get("http://localhost/models/name?fast=True", [
+        {"status_code": 204},
+        {"status_code": 204},
+        {"json": {"name": "name"}},
+    ])
+    requests_mock.get("http://localhost/models", json=[])
+    requests_mock.post(
+        "http://localhost/models/images/upload",
+        json={"valid": True, "imageId": 1, "size": 1}
+    )
+    requests_mock.post("http://localhost/models", json={})
+    assert cached_client.find_model("name") is None
+    cached_client.get_models()
+    cached_client.add_model(
+        "name",
+        engines.IDA,
+        abs_path("data/test.zip")
+    )
+    assert len(cached_client.metadata_cache) == 0
+    assert cached_client.find_model("name") == {"name": "name"}
+
+
+def test_client_invalidates_projected_metadata_of_added_model(
+    cached_client,
+    abs_path,
+    requests_mock
+):
+    requests_mock.get("http://localhost/models/name?fast=True", [
+        {"status_code": 204},
+        {"status_code": 204},
+        {"json": {"name": "name", "engine": engines.IDA}},
+    ])
+    requests_mock.get("http://localhost/models", [
+        {"json": []},
+        {"json": []},
+        {"json": [{"name": "name"}]},
+        {"json": [{"name": "name"}]},
+    ])
+    requests_mock.post(
+        "http://localhost/models/images/upload",
+        json={"valid": True, "imageId": 1, "size": 1}
+    )
+    requests_mock.post("http://localhost/models", json={})
+    assert cached_client.get_models(fields=["name"]) == []
+    assert cached_client.get_summaries() == []
+    assert cached_client.find_model("name", fields=["engine"]) is None
+    cached_client.add_model(
+        "name",
+        engines.IDA,
+        abs_path("data/test.zip")
+    )
+    assert len(cached_client.metadata_cache) == 0
+    assert cached_client.get_models(fields=["name"]) == [{"name": "name"}]
+    assert [s.name for s in cached_client.get_summaries()] == ["name"]
+    assert cached_client.find_model("name", fields=["engine"]) == {
+        "engine": engines.IDA
+    }
+
+
+def test_metadata_cache_invalidate_matching():
+    cache = MetadataCache()
+    cache.put(("a", ()), 1)
+    cache.put(("a", (("fields", "name"),)), 2)
+    cache.put(("b", ()), 3)
+    cache.invalidate_matching(lambda key: key[0] == "a")
+    assert cache.get(("a", ())) is None
+    assert cache.get(("b", ())).value == 3
+    assert len(cache) == 1
@@ -1,9 +1,22 @@
+import base64
+import json
 import os
+import subprocess
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
-from devo_ml.modelmanager import engines
+from devo_ml.modelmanager import Client, engines, error
+from devo_ml.modelmanager import _ranged
+from devo_ml.modelmanager._lock import PARTIAL_FILE_MAX_AGE
+from devo_ml.modelmanager._lock import create_partial_file
+from devo_ml.modelmanager.auth import HttpDevoStandAloneTokenAuth
 from devo_ml.modelmanager.downloader import Downloader, FileSystemDownloader
+from devo_ml.modelmanager.downloader import SharedFileSystemDownloader
+from devo_ml.modelmanager.downloader import write_file_atomically
 from devo_ml.modelmanager.downloader import get_default_downloader
 from devo_ml.modelmanager.downloader import get_image_bytes
 
@@ -54,3 +67,291 @@ def test_get_image_bytes_with_no_image():
         get_image_bytes({"foo": "bar"})
     with pytest.raises(ValueError):
         get_image_bytes({})
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_file_system_downloader_download_stream(
+    encoded_image,
+    tmp_path,
+    chunk_size
+):
+    image = {"id": 1, "image": encoded_image, "size": 295}
+    body = json.dumps({
+        "name": "model_name",
+        "image": image,
+        "description": "with \"escapes\" and \u00f1",
+        "engine": engines.IDA,
+    }).encode()
+    downloader = FileSystemDownloader(tmp_path)
+    model, output_file = downloader.download_stream(_chunks(body, chunk_size))
+    assert model == {
+        "name": "model_name",
+        "image": {"id": 1, "size": 295},
+        "description": "with \"escapes\" and \u00f1",
+        "engine": engines.IDA,
+    }
+    with open(output_file, "rb") as f:
+        assert f.read() == get_image_bytes(image)
+    assert os.listdir(tmp_path) == [os.path.basename(output_file)]
+
+
+def test_file_system_downloader_download_stream_escaped_image(tmp_path):
+    encoded = base64.b64encode(b"\xff" * 100).decode()
+    body = (
+        '{"name": "model_name", "engine": "ONNX", "image": {"image": "'
+        + encoded.replace("/", "\\/")
+        + '"}}'
+    ).encode()
+    assert b"\\/" in body
+    _, output_file = FileSystemDownloader(tmp_path).download_stream([body])
+    with open(output_file, "rb") as f:
+        assert f.read() == b"\xff" * 100
+
+
+def test_file_system_downloader_download_stream_empty(tmp_path):
+    downloader = FileSystemDownloader(tmp_path)
+    assert downloader.download_stream([b""]) == (None, None)
+    assert os.listdir(tmp_path) == []
+
+
+def test_file_system_downloader_download_stream_no_image(tmp_path):
+    body = json.dumps({"name": "model_name", "engine": engines.ONNX})
+    with pytest.raises(ValueError):
+        FileSystemDownloader(tmp_path).download_stream([body.encode()])
+    assert os.listdir(tmp_path) == []
+
+
+def test_write_file_atomically_keeps_previous_file(tmp_path, monkeypatch):
+    file = str(tmp_path / "model.onnx")
+    write_file_atomically(file, b"old")
+
+    def fail(*args):
+        raise OSError("Disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        write_file_atomically(file, b"new")
+    assert os.listdir(tmp_path) == ["model.onnx"]
+    with open(file, "rb") as f:
+        assert f.read() == b"old"
+
+
+def test_remove_partial_files_of_dead_processes(tmp_path):
+    process = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        check=True
+    )
+    dead_pid = int(process.stdout)
+    fd, partial_file = create_partial_file(str(tmp_path))
+    os.close(fd)
+    running = os.path.basename(partial_file)
+    host, _, rest = running.rpartition(f"-{os.getpid()}-")
+    dead = f"{host}-{dead_pid}-{rest}"
+    (tmp_path / dead).write_bytes(b"partial")
+    (tmp_path / "model.onnx").write_bytes(b"model")
+    downloader = SharedFileSystemDownloader(tmp_path)
+    assert sorted(os.listdir(tmp_path)) == sorted([
+        running, ".modelmanager", "model.onnx"
+    ])
+    assert downloader.remove_partial_files() == []
+
+
+def test_remove_partial_files_of_other_hosts(tmp_path):
+    # Processes of other hosts can't be probed, only old files are removed
+    (tmp_path / ".other-host-1-abc.part").write_bytes(b"writing")
+    (tmp_path / ".other-host-2-abc.part").write_bytes(b"partial")
+    (tmp_path / f".{os.getpid()}-abc.part").write_bytes(b"unknown host")
+    old = time.time() - PARTIAL_FILE_MAX_AGE - 60
+    os.utime(tmp_path / ".other-host-2-abc.part", (old, old))
+    os.utime(tmp_path / f".{os.getpid()}-abc.part", (old, old))
+    downloader = SharedFileSystemDownloader(tmp_path)
+    assert sorted(os.listdir(tmp_path)) == [
+        ".modelmanager", ".other-host-1-abc.part"
+    ]
+    assert downloader.remove_partial_files() == []
+
+
+def test_shared_downloader_lock_is_exclusive(tmp_path):
+    downloader = SharedFileSystemDownloader(tmp_path)
+    with downloader.lock("model"):
+        assert not downloader.lock("model").acquire(blocking=False)
+        other = downloader.lock("other")
+        assert other.acquire(blocking=False)
+        other.release()
+    lock = downloader.lock("model")
+    assert lock.acquire(blocking=False)
+    lock.release()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_shared_downloader_downloads_once(stub_server, tmp_path, stream):
+    stub_server.add_model("foo", engines.ONNX, b"image")
+    auth = HttpDevoStandAloneTokenAuth("token")
+    # A client per worker process, sharing the download path
+    clients = [
+        Client(
+            stub_server.url,
+            auth,
+            downloader=SharedFileSystemDownloader(tmp_path, stream=stream)
+        )
+        for _ in range(4)
+    ]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        models = list(pool.map(
+            lambda client: client.get_model("foo", download_file=True),
+            clients
+        ))
+    heavy = [r for r in stub_server.requests if "fast=False" in r[1]]
+    assert len(heavy) == 1
+    assert all(m["file"] == str(tmp_path / "foo.onnx") for m in models)
+    with open(tmp_path / "foo.onnx", "rb") as f:
+        assert f.read() == b"image"
+    stub_server.add_model("foo", engines.ONNX, b"new image")
+    stub_server.models["foo"]["image"]["id"] = 99
+    clients[0].get_model("foo", download_file=True)
+    with open(tmp_path / "foo.onnx", "rb") as f:
+        assert f.read() == b"new image"
+
+
+def _image_requests(stub_server):
+    return [r for r in stub_server.requests if r[1].endswith("/image")]
+
+
+def _raw_client(stub_server, downloader, **kwargs):
+    return Client(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        downloader=downloader,
+        raw_images=True,
+        **kwargs
+    )
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_download_raw_image(stub_server, tmp_path, ranges):
+    stub_server.ranges = ranges
+    stub_server.add_model("foo", engines.ONNX, b"image")
+    client = _raw_client(stub_server, FileSystemDownloader(tmp_path))
+    model = client.get_model("foo", download_file=True)
+    assert model["file"] == str(tmp_path / "foo.onnx")
+    assert "image" not in model
+    with open(model["file"], "rb") as f:
+        assert f.read() == b"image"
+    assert len(_image_requests(stub_server)) == 1
+    assert not [r for r in stub_server.requests if "fast=False" in r[1]]
+    assert os.listdir(tmp_path) == ["foo.onnx"]
+
+
+def test_download_raw_image_resumes(stub_server, tmp_path):
+    image = os.urandom(1000)
+    stub_server.add_model("foo", engines.ONNX, image)
+    stub_server.image_failures = 2
+    client = _raw_client(stub_server, SharedFileSystemDownloader(tmp_path))
+    model = client.get_model("foo", download_file=True)
+    with open(model["file"], "rb") as f:
+        assert f.read() == image
+    assert len(_image_requests(stub_server)) == 3
+    assert client.get_model("foo", download_file=True)["file"] == model["file"]
+    assert len(_image_requests(stub_server)) == 3
+
+
+def test_download_raw_image_keeps_partial_file(stub_server, tmp_path):
+    image = os.urandom(1000)
+    stub_server.add_model("foo", engines.ONNX, image)
+    stub_server.image_failures = _ranged.DEFAULT_MAX_RESUMES + 1
+    client = _raw_client(stub_server, FileSystemDownloader(tmp_path))
+    with pytest.raises(error.ModelManagerError):
+        client.get_model("foo", download_file=True)
+    assert not (tmp_path / "foo.onnx").exists()
+    assert len(os.listdir(tmp_path)) == 2
+    requests_before = len(_image_requests(stub_server))
+    model = client.get_model("foo", download_file=True)
+    with open(model["file"], "rb") as f:
+        assert f.read() == image
+    assert len(_image_requests(stub_server)) == requests_before + 1
+    assert os.listdir(tmp_path) == ["foo.onnx"]
+
+
+def test_download_raw_image_in_segments(stub_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(_ranged, "MIN_SEGMENT_SIZE", 100)
+    image = os.urandom(1000)
+    stub_server.add_model("foo", engines.ONNX, image)
+    stub_server.image_failures = 1
+    client = _raw_client(
+        stub_server,
+        FileSystemDownloader(tmp_path),
+        image_segments=4
+    )
+    model = client.get_model("foo", download_file=True)
+    with open(model["file"], "rb") as f:
+        assert f.read() == image
+    assert len(_image_requests(stub_server)) == 5
+
+
+def test_plan_segments(monkeypatch):
+    monkeypatch.setattr(_ranged, "MIN_SEGMENT_SIZE", 100)
+    segments = _ranged.plan_segments(1000, 3)
+    assert [(s.start, s.end) for s in segments] == [
+        (0, 334), (334, 668), (668, 1000)
+    ]
+    assert len(_ranged.plan_segments(150, 3)) == 1
+    assert [(s.start, s.end) for s in _ranged.plan_segments(0, 3)] == [(0, 0)]
+
+
+def test_download_raw_image_fallback(stub_server, tmp_path):
+    stub_server.raw_images = False
+    stub_server.add_model("foo", engines.ONNX, b"image")
+    client = _raw_client(stub_server, FileSystemDownloader(tmp_path))
+    for _ in range(2):
+        model = client.get_model("foo", download_file=True)
+        with open(model["file"], "rb") as f:
+            assert f.read() == b"image"
+    assert client._raw_images_unavailable
+    assert len(_image_requests(stub_server)) == 1
+    assert os.listdir(tmp_path) == ["foo.onnx"]
+
+
+@pytest.mark.parametrize("status,code,exception", [
+    (401, 5, error.TokenError),
+    (500, 0, error.ModelManagerError),
+])
+def test_download_raw_image_server_error_not_resumed(
+    stub_server,
+    tmp_path,
+    monkeypatch,
+    status,
+    code,
+    exception
+):
+    monkeypatch.setattr(_ranged, "MIN_SEGMENT_SIZE", 100)
+    stub_server.add_model("foo", engines.ONNX, os.urandom(1000))
+    stub_server.segment_error = (status, {"code": code, "msg": "Refused"})
+    client = _raw_client(
+        stub_server,
+        FileSystemDownloader(tmp_path),
+        image_segments=4
+    )
+    with pytest.raises(exception):
+        client.get_model("foo", download_file=True)
+    # The first segment and one request of each of the other three
+    assert len(_image_requests(stub_server)) == 4
+    assert not client._raw_images_unavailable
+
+
+def test_download_raw_image_of_deleted_model(stub_server, tmp_path):
+    stub_server.add_model("foo", engines.ONNX, b"foo")
+    stub_server.add_model("bar", engines.ONNX, b"bar")
+    client = _raw_client(stub_server, FileSystemDownloader(tmp_path))
+    del stub_server.images["foo"]
+    with pytest.raises(error.ModelNotFound):
+        client.get_model("foo", download_file=True)
+    assert not client._raw_images_unavailable
+    model = client.get_model("bar", download_file=True)
+    with open(model["file"], "rb") as f:
+        assert f.read() == b"bar"
+    assert len(_image_requests(stub_server)) == 2
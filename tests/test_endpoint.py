@@ -6,6 +6,7 @@ def test_endpoint_renderer():
     endpoints = LatestEndpointRenderer("http://localhost")
     assert endpoints.models() == "http://localhost/models"
     assert endpoints.model("foo") == "http://localhost/models/foo"
+    assert endpoints.image("foo") == "http://localhost/models/foo/image"
     assert endpoints.image_upload() == "http://localhost/models/images/upload"
     endpoints = LatestEndpointRenderer("http://localhost/")
     assert endpoints.models() == "http://localhost/models"
@@ -17,8 +18,22 @@ def test_legacy_endpoint_renderer():
     endpoints = LegacyEndpointRenderer("http://localhost", "self")
     assert endpoints.models() == "http://localhost/domains/self/models"
     assert endpoints.model("foo") == "http://localhost/domains/self/models/foo"  # noqa
+    assert endpoints.image("foo") == "http://localhost/domains/self/models/foo/image"  # noqa
     assert endpoints.image_upload() == "http://localhost/domains/self/models/images/upload"  # noqa
     endpoints = LegacyEndpointRenderer("http://localhost/", "self")
     assert endpoints.models() == "http://localhost/domains/self/models"
     assert endpoints.model("foo") == "http://localhost/domains/self/models/foo"  # noqa
     assert endpoints.image_upload() == "http://localhost/domains/self/models/images/upload"  # noqa
+
+
+def test_upload_session_endpoints():
+    endpoints = LatestEndpointRenderer("http://localhost")
+    sessions = "http://localhost/models/images/upload/sessions"
+    assert endpoints.upload_sessions() == sessions
+    assert endpoints.upload_session("a b") == f"{sessions}/a%20b"
+    assert endpoints.upload_part("1", 3) == f"{sessions}/1/parts/3"
+    assert endpoints.upload_commit("1") == f"{sessions}/1/commit"
+    endpoints = LegacyEndpointRenderer("http://localhost", "self")
+    assert endpoints.upload_sessions() == (
+        "http://localhost/domains/self/models/images/upload/sessions"
+    )
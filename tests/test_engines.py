@@ -0,0 +1,27 @@
+import pytest
+
+from devo_ml.modelmanager import engines
+
+
+def test_get_extension_engines():
+    assert engines.get_extension_engines(".onnx") == [engines.ONNX]
+    assert engines.get_extension_engines("ONNX") == [engines.ONNX]
+    assert set(engines.get_extension_engines(".zip")) == {
+        engines.H2O, engines.MUA, engines.UNICODE
+    }
+    assert engines.get_extension_engines(".xyz") == []
+    assert engines.get_extension_engines("") == []
+
+
+@pytest.mark.parametrize("file, engine", [
+    ("model.onnx", engines.ONNX),
+    ("/models/model.cmb", engines.CATBOOST),
+    ("model.zip", None),
+    ("model.h2o.zip", engines.H2O),
+    ("model.MUA.zip", engines.MUA),
+    ("model.onnx.zip", None),
+    ("model.workflows.json", engines.WORKFLOWS),
+    ("model", None),
+])
+def test_infer_engine(file, engine):
+    assert engines.infer_engine(file) == engine
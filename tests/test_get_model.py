@@ -1,7 +1,13 @@
+import base64
+
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from devo_ml.modelmanager import engines
 from devo_ml.modelmanager import error
+from devo_ml.modelmanager.downloader import FileSystemDownloader
+from devo_ml.modelmanager.downloader import LazyModelFile
 
 
 def test_get_models(client, mock_get_models):
@@ -16,6 +22,39 @@ def test_get_existing_model(client, mock_get_model):
     assert response == {"name": "name", "engine": engines.ONNX}
 
 
+def test_get_model_fields(client, requests_mock):
+    requests_mock.get(
+        "http://localhost/models/name?fast=True",
+        json={
+            "name": "name",
+            "engine": engines.ONNX,
+            "fields": [{"name": "Age"}],
+            "image": {"id": 1, "size": 295},
+        }
+    )
+    model = client.get_model("name", fields=["name", "image.size"])
+    assert model == {"name": "name", "image": {"size": 295}}
+    assert requests_mock.last_request.qs["fields"] == ["name,image.size"]
+
+
+def test_get_model_fields_with_download_file(
+    client,
+    encoded_image,
+    mock_get_model
+):
+    mock_get_model(
+        "model_name",
+        fast=False,
+        response={
+            "name": "model_name",
+            "engine": engines.IDA,
+            "image": {"id": 1, "image": encoded_image, "size": 295}
+        }
+    )
+    model = client.get_model("model_name", download_file=True, fields=["name"])
+    assert model == {"name": "model_name", "file": "MockDownloader__returns"}
+
+
 def test_get_existing_model_with_download_file(
     client,
     abs_path,
@@ -63,3 +102,121 @@ def test_get_model_with_invalid_token(client, mock_get_model):
     )
     with pytest.raises(error.TokenError):
         client.get_model("model_name")
+
+
+def test_get_existing_model_with_stream(
+    client,
+    encoded_image,
+    mock_get_model,
+    tmp_path
+):
+    client.downloader = FileSystemDownloader(tmp_path, stream=True)
+    mock_get_model(
+        "model_name",
+        fast=False,
+        response={
+            "name": "model_name",
+            "engine": engines.IDA,
+            "image": {"id": 1, "image": encoded_image, "size": 295}
+        }
+    )
+    model = client.get_model("model_name", download_file=True)
+    assert model == {
+        "name": "model_name",
+        "engine": engines.IDA,
+        "file": str(tmp_path / "model_name.json")
+    }
+    with open(model["file"], "rb") as f:
+        assert f.read() == base64.b64decode(encoded_image)
+
+
+def test_get_non_existing_model_with_stream(client, mock_get_model):
+    mock_get_model("model_name", fast=False, code=204)
+    with pytest.raises(error.ModelNotFound):
+        client.get_model("model_name", download_file=True, stream=True)
+
+
+def test_get_many(client, mock_get_model):
+    mock_get_model("foo", response={"name": "foo", "engine": engines.ONNX})
+    mock_get_model("bar", code=204)
+    mock_get_model(
+        "baz",
+        code=403,
+        response={"code": 5, "msg": "Token invalid or expired"}
+    )
+    models = client.get_many(["foo", "bar", "baz", "foo"], max_workers=2)
+    assert list(models) == ["foo", "bar", "baz"]
+    assert models["foo"] == {"name": "foo", "engine": engines.ONNX}
+    assert isinstance(models["bar"], error.ModelNotFound)
+    assert isinstance(models["baz"], error.TokenError)
+
+
+def test_get_many_with_executor(client, mock_get_model):
+    mock_get_model("foo", response={"name": "foo", "engine": engines.ONNX})
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        models = client.get_many(["foo"], executor=executor)
+    assert models == {"foo": {"name": "foo", "engine": engines.ONNX}}
+    assert client.get_many([]) == {}
+
+
+def test_download_many(client, encoded_image, mock_get_model):
+    for name in ("foo", "bar"):
+        mock_get_model(
+            name,
+            fast=False,
+            response={
+                "name": name,
+                "engine": engines.IDA,
+                "image": {"id": 1, "image": encoded_image, "size": 295}
+            }
+        )
+    models = client.download_many(["foo", "bar"])
+    assert all(m["file"] == "MockDownloader__returns" for m in models.values())
+
+
+def test_get_model_with_lazy_file(
+    client,
+    requests_mock,
+    encoded_image,
+    mock_get_model,
+    tmp_path
+):
+    client.downloader = FileSystemDownloader(tmp_path)
+    mock_get_model(
+        "model_name",
+        response={
+            "name": "model_name",
+            "engine": engines.IDA,
+            "image": {"id": 1, "size": 295}
+        }
+    )
+    mock_get_model(
+        "model_name",
+        fast=False,
+        response={
+            "name": "model_name",
+            "engine": engines.IDA,
+            "image": {"id": 1, "image": encoded_image, "size": 295}
+        }
+    )
+    model = client.get_model("model_name", download_file=True, lazy=True)
+    file = model.pop("file")
+    assert model == {"name": "model_name", "engine": engines.IDA}
+    assert isinstance(file, LazyModelFile)
+    assert not file.loaded
+    assert requests_mock.call_count == 1
+    content = file.read_bytes()
+    assert content == base64.b64decode(encoded_image)
+    assert file.path == str(tmp_path / "model_name.json")
+    with open(file, "rb") as f:
+        assert f.read() == content
+    assert requests_mock.call_count == 2
+
+
+def test_get_many_with_lazy_files(client, mock_get_model):
+    mock_get_model("foo", response={"name": "foo", "engine": engines.ONNX})
+    mock_get_model("bar", code=204)
+    models = client.get_many(["foo", "bar"], download_file=True, lazy=True)
+    assert isinstance(models["foo"]["file"], LazyModelFile)
+    assert isinstance(models["bar"], error.ModelNotFound)
+    assert client.find_model("bar", download_file=True, lazy=True) is None
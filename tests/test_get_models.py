@@ -0,0 +1,173 @@
+import itertools
+import json
+
+import pytest
+
+from devo_ml.modelmanager import engines
+from devo_ml.modelmanager import error
+from devo_ml.modelmanager._stream import JsonArrayDecoder
+
+
+MODELS = [
+    {"name": f"model_{i}", "engine": engines.ONNX, "fields": ["a", "b"]}
+    for i in range(10)
+]
+
+
+def decode(document, piece_size):
+    decoder = JsonArrayDecoder()
+    items = []
+    for i in range(0, len(document), piece_size):
+        items += decoder.feed(document[i:i + piece_size])
+    return items + decoder.close()
+
+
+@pytest.mark.parametrize("piece_size", [1, 3, 64, 1024])
+def test_decode_array_in_pieces(piece_size):
+    items = [*MODELS, 12345, "é\"]", None, [], {}]
+    document = json.dumps(items).encode()
+    assert decode(document, piece_size) == items
+
+
+@pytest.mark.parametrize("document", [b"", b"[]", b" [ ]\n"])
+def test_decode_empty_array(document):
+    assert decode(document, 1) == []
+
+
+@pytest.mark.parametrize("document", [
+    b"{}",
+    b"[1,]",
+    b"[,1]",
+    b"[1 2]",
+    b"[1",
+    b"[1]x",
+])
+def test_decode_invalid_array(document):
+    with pytest.raises(ValueError):
+        decode(document, 1)
+
+
+def test_iter_models(client, requests_mock):
+    requests_mock.get(
+        "http://localhost/models",
+        content=json.dumps(MODELS).encode()
+    )
+    models = client.iter_models()
+    assert next(models) == MODELS[0]
+    assert list(models) == MODELS[1:]
+
+
+def test_iter_no_models(client, requests_mock):
+    requests_mock.get("http://localhost/models", status_code=204)
+    assert list(client.iter_models()) == []
+
+
+def test_iter_invalid_models(client, requests_mock):
+    requests_mock.get("http://localhost/models", content=b'[{"name": }]')
+    with pytest.raises(error.ModelManagerError):
+        list(client.iter_models())
+
+
+def test_iter_models_error(client, requests_mock):
+    requests_mock.get(
+        "http://localhost/models",
+        status_code=401,
+        json={"code": 0, "msg": "Unauthorized"}
+    )
+    with pytest.raises(error.ModelManagerError):
+        list(client.iter_models())
+
+
+def test_iter_models_in_pages(client, requests_mock):
+    for offset in range(0, 12, 4):
+        requests_mock.get(
+            f"http://localhost/models?offset={offset}&limit=4",
+            complete_qs=True,
+            json=MODELS[offset:offset + 4]
+        )
+    assert list(client.iter_models(page_size=4)) == MODELS
+    assert len(requests_mock.request_history) == 3
+
+
+def test_iter_models_in_full_pages(client, requests_mock):
+    for offset in range(0, 15, 5):
+        requests_mock.get(
+            f"http://localhost/models?offset={offset}&limit=5",
+            complete_qs=True,
+            json=MODELS[offset:offset + 5]
+        )
+    assert list(client.iter_models(page_size=5)) == MODELS
+    assert len(requests_mock.request_history) == 3
+
+
+@pytest.mark.parametrize("page_size", [4, 10])
+def test_iter_models_without_paging(client, requests_mock, page_size):
+    requests_mock.get("http://localhost/models", json=MODELS)
+    assert list(client.iter_models(page_size=page_size)) == MODELS
+    assert len(requests_mock.request_history) <= 2
+
+
+def test_get_models_fields(client, requests_mock):
+    requests_mock.get("http://localhost/models", json=MODELS)
+    models = client.get_models(fields=["name"])
+    assert models == [{"name": model["name"]} for model in MODELS]
+    assert requests_mock.last_request.qs == {"fields": ["name"]}
+
+
+def test_iter_models_fields(client, requests_mock):
+    requests_mock.get("http://localhost/models", json=MODELS)
+    models = list(client.iter_models(fields=["name", "engine"]))
+    assert models == [
+        {"name": model["name"], "engine": model["engine"]}
+        for model in MODELS
+    ]
+
+
+def test_iter_models_fields_in_pages(client, requests_mock):
+    for offset in range(0, 12, 4):
+        requests_mock.get(
+            f"http://localhost/models?offset={offset}&limit=4"
+            "&fields=engine,name",
+            complete_qs=True,
+            json=MODELS[offset:offset + 4]
+        )
+    models = list(client.iter_models(page_size=4, fields=["engine"]))
+    assert models == [{"engine": engines.ONNX}] * len(MODELS)
+
+
+def test_get_summaries(client, requests_mock):
+    models = [
+        {**model, "id": i, "image": {"id": i, "size": 10 * i}}
+        for i, model in enumerate(MODELS)
+    ]
+    requests_mock.get("http://localhost/models", json=models)
+    summaries = client.get_summaries()
+    assert [s.name for s in summaries] == [m["name"] for m in MODELS]
+    assert summaries[3].image_size == 30
+    fields = requests_mock.last_request.qs["fields"][0].split(",")
+    assert "image.size" in fields
+
+
+@pytest.mark.parametrize("with_names", [True, False])
+def test_iter_models_fields_without_paging(
+    client,
+    requests_mock,
+    with_names
+):
+    models = MODELS[:4]
+
+    def projected(request, context):
+        # Honours the fields, but not the offset and limit
+        fields = request.qs["fields"][0].split(",")
+        if not with_names:
+            fields = [f for f in fields if f != "name"]
+        return [{f: model[f] for f in fields} for model in models]
+
+    requests_mock.get("http://localhost/models", json=projected)
+    iterator = client.iter_models(page_size=4, fields=["engine"])
+    assert list(itertools.islice(iterator, 10)) == (
+        [{"engine": engines.ONNX}] * 4
+    )
+    assert len(requests_mock.request_history) == 2
+    fields = requests_mock.request_history[0].qs["fields"][0].split(",")
+    assert sorted(fields) == ["engine", "name"]
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+import pytest
+
+import devo_ml.modelmanager
+
+
+def _imported_modules(statement):
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    process = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        text=True
+    )
+    return set(process.stdout.split())
+
+
+def test_import_is_lazy():
+    modules = _imported_modules("import devo_ml.modelmanager")
+    assert "devo_ml.modelmanager._client" not in modules
+    assert "requests" not in modules
+    assert "validators" not in modules
+
+
+def test_client_import_defers_dependencies():
+    modules = _imported_modules("from devo_ml.modelmanager import Client")
+    assert "devo_ml.modelmanager._client" in modules
+    assert "devo_ml.modelmanager.async_api" not in modules
+    assert "validators" not in modules
+    assert "asyncio" not in modules
+
+
+def test_lazy_attributes():
+    from devo_ml.modelmanager._client import Client
+
+    assert devo_ml.modelmanager.Client is Client
+    assert "get_model_async" in dir(devo_ml.modelmanager)
+    with pytest.raises(AttributeError):
+        devo_ml.modelmanager.NotAName
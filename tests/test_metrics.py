@@ -0,0 +1,128 @@
+import logging
+import os
+
+import requests
+
+from devo_ml.modelmanager import Client, engines
+from devo_ml.modelmanager.api import Api
+from devo_ml.modelmanager.auth import HttpDevoStandAloneTokenAuth
+from devo_ml.modelmanager.downloader import FileSystemDownloader
+from devo_ml.modelmanager.metrics import ClientMetrics, Histogram
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=[1, 2, 3])
+    assert histogram.quantile(0.5) is None
+    for value in [0.5, 1.5, 1.5, 2.5, 10]:
+        histogram.observe(value)
+    assert histogram.count == 5
+    assert histogram.sum == 16
+    assert histogram.quantile(0.5) == 2
+    assert histogram.quantile(1) == float("inf")
+    assert histogram.to_dict()["buckets"] == {
+        "1": 1, "2": 2, "3": 1, "+Inf": 1
+    }
+
+
+def test_api_emits_events_to_hooks(requests_mock):
+    requests_mock.post("http://localhost/models", json={"a": 1})
+    events = []
+    api = Api(hooks=[events.append])
+    api.post("http://localhost/models", data=b"12345", operation="models")
+    event, = events
+    assert event.operation == "models"
+    assert event.method == "post"
+    assert event.status == 200
+    assert event.bytes_sent == 5
+    assert event.bytes_received == len(b'{"a": 1}')
+    assert event.elapsed >= event.ttfb >= 0
+
+
+def test_api_emits_errors(requests_mock):
+    requests_mock.get(
+        "http://localhost/models",
+        exc=requests.exceptions.ConnectTimeout
+    )
+    events = []
+    api = Api()
+    api.add_hook(events.append)
+    try:
+        api.get("http://localhost/models")
+    except Exception:
+        pass
+    assert isinstance(events[0].error, requests.exceptions.ConnectTimeout)
+    api.remove_hook(events.append)
+    assert not api.hooks
+
+
+def test_failing_hook_does_not_break_calls(requests_mock):
+    requests_mock.get("http://localhost/models", json=[])
+
+    def hook(event):
+        raise RuntimeError
+
+    assert Api(hooks=[hook]).get("http://localhost/models") == []
+
+
+def test_client_metrics_by_operation_and_phase(
+    client,
+    abs_path,
+    mock_get_model,
+    mock_image_upload,
+    mock_post_model,
+    image_metadata
+):
+    metrics = ClientMetrics()
+    client.add_hook(metrics)
+    mock_get_model("model_name", fast=True)
+    mock_image_upload(response=image_metadata)
+    mock_post_model()
+    client.add_model("model_name", engines.IDA, abs_path("data/test.zip"))
+    client.find_model("model_name")
+    snapshot = metrics.snapshot()
+    assert snapshot["operations"]["model"]["count"] == 2
+    upload = snapshot["operations"]["image_upload"]
+    assert upload["bytes_sent"] > os.path.getsize(abs_path("data/test.zip"))
+    assert snapshot["operations"]["models"]["statuses"] == {200: 1}
+    assert set(snapshot["phases"]) == {
+        "add_model.check", "add_model.upload", "add_model.register"
+    }
+    metrics.reset()
+    assert metrics.snapshot() == {"operations": {}, "phases": {}}
+
+
+def test_client_metrics_logs_slow_calls(requests_mock, caplog):
+    requests_mock.get("http://localhost/models", json=[])
+    api = Api(metrics=ClientMetrics(slow_threshold=-1))
+    with caplog.at_level(logging.WARNING):
+        api.get("http://localhost/models", operation="models")
+    assert "Slow call GET http://localhost/models (models)" in caplog.text
+    assert api.metrics.snapshot()["operations"]["models"]["count"] == 1
+
+
+def test_client_metrics_compression(stub_server, tmp_path):
+    image = b"0123456789" * 10000
+    stub_server.add_model("foo", engines.ONNX, image)
+    stub_server.gzip = True
+    file = tmp_path / "model.onnx"
+    file.write_bytes(image)
+    metrics = ClientMetrics()
+    with Client(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        downloader=FileSystemDownloader(str(tmp_path)),
+        metrics=metrics,
+        compress_uploads=True
+    ) as client:
+        client.get_model("foo", download_file=True)
+        client.add_model("bar", engines.ONNX, str(file))
+    assert stub_server.uploads[-1].count(image) == 1
+    assert "gzip" in stub_server.encodings
+    operations = metrics.snapshot()["operations"]
+    model = operations["model"]
+    assert model["content_bytes_received"] > 10 * model["bytes_received"]
+    assert model["compression_ratio_received"] > 10
+    upload = operations["image_upload"]
+    assert upload["content_bytes_sent"] > len(image)
+    assert upload["compression_ratio_sent"] > 10
+    assert upload["compression_time"] > 0
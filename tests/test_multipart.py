@@ -0,0 +1,46 @@
+import os
+
+from requests.models import RequestEncodingMixin
+
+from devo_ml.modelmanager._multipart import MultipartEncoder
+
+
+def test_multipart_encoder_matches_requests(abs_path):
+    model_file = abs_path("./data/test.zip")
+    with open(model_file, "rb") as f:
+        expected, content_type = RequestEncodingMixin._encode_files(
+            [("fileName", f)],
+            {"engine": "IDA"}
+        )
+    boundary = content_type.split("boundary=")[1]
+    with open(model_file, "rb") as f:
+        body = MultipartEncoder(
+            fields=[("engine", "IDA")],
+            files=[("fileName", f)],
+            boundary=boundary
+        )
+        assert body.content_type == content_type
+        assert len(body) == len(expected)
+        pieces = []
+        piece = body.read(1000)
+        while piece:
+            assert len(piece) <= 1000
+            pieces.append(piece)
+            piece = body.read(1000)
+    assert b"".join(pieces) == expected
+
+
+def test_multipart_encoder_read_all(tmp_path):
+    model_file = os.path.join(tmp_path, "model.onnx")
+    with open(model_file, "wb") as f:
+        f.write(b"content")
+    with open(model_file, "rb") as f:
+        body = MultipartEncoder(files=[("file", f)], boundary="b")
+        assert body.read() == (
+            b'--b\r\n'
+            b'Content-Disposition: form-data; name="file"; '
+            b'filename="model.onnx"\r\n\r\n'
+            b'content\r\n'
+            b'--b--\r\n'
+        )
+        assert body.read() == b""
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+
+from devo_ml.modelmanager import Client, engines
+from devo_ml.modelmanager.auth import HttpDevoStandAloneTokenAuth
+from devo_ml.modelmanager.downloader import FileSystemDownloader
+from devo_ml.modelmanager.error import ModelNotFound
+
+
+@pytest.fixture
+def prefetch_client(stub_server, tmp_path):
+    stub_server.add_model("foo", engines.ONNX, b"foo")
+    stub_server.add_model("bar", engines.H2O, b"bar")
+    client = Client(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        downloader=FileSystemDownloader(tmp_path)
+    )
+    yield client
+    client.close()
+
+
+def _block_downloads(client):
+    # Holds the downloads of the client until the event is set
+    release = threading.Event()
+    started = threading.Event()
+    get_model = client._get_model
+
+    def blocked_get_model(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return get_model(*args, **kwargs)
+
+    client._get_model = blocked_get_model
+    return started, release
+
+
+def test_prefetch(prefetch_client, stub_server, read_file, stub_downloads):
+    futures = prefetch_client.prefetch(["foo", "bar", "foo"])
+    assert sorted(futures) == ["bar", "foo"]
+    assert futures["foo"].result(5)["name"] == "foo"
+    assert futures["bar"].result(5)["name"] == "bar"
+    model = prefetch_client.get_model("foo", download_file=True)
+    assert read_file(model["file"]) == b"foo"
+    assert len(stub_downloads("foo")) == 1
+
+
+def test_prefetch_used_once(prefetch_client, stub_server, stub_downloads):
+    prefetch_client.prefetch(["foo"])["foo"].result(5)
+    prefetch_client.get_model("foo", download_file=True)
+    prefetch_client.get_model("foo", download_file=True)
+    assert len(stub_downloads("foo")) == 2
+
+
+def test_prefetch_fields(
+    prefetch_client,
+    stub_server,
+    tmp_path,
+    stub_downloads
+):
+    prefetch_client.prefetch(["foo"])
+    model = prefetch_client.get_model(
+        "foo",
+        download_file=True,
+        fields=["engine"]
+    )
+    assert model == {
+        "engine": engines.ONNX,
+        "file": str(tmp_path / "foo.onnx"),
+    }
+    assert len(stub_downloads("foo")) == 1
+
+
+def test_get_model_waits_for_prefetch(
+    prefetch_client,
+    stub_server,
+    read_file,
+    stub_downloads
+):
+    started, release = _block_downloads(prefetch_client)
+    future = prefetch_client.prefetch(["foo"])["foo"]
+    assert started.wait(5)
+    result = []
+    thread = threading.Thread(
+        target=lambda: result.append(
+            prefetch_client.get_model("foo", download_file=True)
+        )
+    )
+    thread.start()
+    thread.join(0.2)
+    assert thread.is_alive()
+    assert not future.done()
+    release.set()
+    thread.join(5)
+    assert read_file(result[0]["file"]) == b"foo"
+    assert len(stub_downloads("foo")) == 1
+
+
+def test_prefetch_in_progress_reused(prefetch_client):
+    started, release = _block_downloads(prefetch_client)
+    first = prefetch_client.prefetch(["foo"])["foo"]
+    assert started.wait(5)
+    assert prefetch_client.prefetch(["foo"])["foo"] is first
+    release.set()
+    first.result(5)
+
+
+def test_failed_prefetch_not_reused(prefetch_client, stub_server, read_file):
+    future = prefetch_client.prefetch(["baz"])["baz"]
+    with pytest.raises(ModelNotFound):
+        future.result(5)
+    stub_server.add_model("baz", engines.ONNX, b"baz")
+    model = prefetch_client.get_model("baz", download_file=True)
+    assert read_file(model["file"]) == b"baz"
+
+
+def test_close_cancels_prefetches(stub_server, tmp_path):
+    for i in range(4):
+        stub_server.add_model(f"model_{i}", engines.ONNX, b"model")
+    client = Client(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        downloader=FileSystemDownloader(tmp_path),
+        pool_maxsize=1
+    )
+    started, release = _block_downloads(client)
+    futures = client.prefetch([f"model_{i}" for i in range(4)])
+    assert started.wait(5)
+    client.close()
+    release.set()
+    assert all(futures[f"model_{i}"].cancelled() for i in range(1, 4))
+
+
+def test_prefetch_again_gets_newer_model(
+    prefetch_client,
+    stub_server,
+    read_file
+):
+    first = prefetch_client.prefetch(["foo"])["foo"]
+    first.result(5)
+    stub_server.add_model("foo", engines.ONNX, b"new foo")
+    second = prefetch_client.prefetch(["foo"])["foo"]
+    assert second is not first
+    second.result(5)
+    model = prefetch_client.get_model("foo", download_file=True)
+    assert read_file(model["file"]) == b"new foo"
+
+
+def test_prefetch_not_taken_expires(stub_server, tmp_path, stub_downloads):
+    stub_server.add_model("foo", engines.ONNX, b"foo")
+    client = Client(
+        stub_server.url,
+        HttpDevoStandAloneTokenAuth("token"),
+        downloader=FileSystemDownloader(tmp_path),
+        prefetch_ttl=0
+    )
+    with client:
+        client.prefetch(["foo"])["foo"].result(5)
+        time.sleep(0.01)
+        client.get_model("foo", download_file=True)
+        assert not client._prefetches
+    assert len(stub_downloads("foo")) == 2
@@ -2,7 +2,10 @@ import pytest
 
 from devo_ml.modelmanager.auth import STANDALONE, BEARER
 from devo_ml.modelmanager.error import ProfileValueRequired, ProfileError
+from devo_ml.modelmanager import profile as profile_module
+from devo_ml.modelmanager.profile import ProfileStore
 from devo_ml.modelmanager.profile import read_profile_from_file
+from devo_ml.modelmanager.profile import read_profiles_from_file
 
 
 @pytest.fixture
@@ -76,3 +79,104 @@ def test_read_profile_from_invalid_file(f, abs_path):
     file = abs_path(f)
     with pytest.raises(ProfileError):
         read_profile_from_file("invalid_auth_type_profile", file)
+
+
+def test_read_profiles_from_file(profiles_file):
+    with pytest.raises((ProfileError, ProfileValueRequired)):
+        read_profiles_from_file(profiles_file)
+    profiles = read_profiles_from_file(profiles_file, ignore_invalid=True)
+    assert list(profiles) == [
+        "foo_profile",
+        "bar_profile",
+        "no_auth_type_profile",
+    ]
+    assert profiles["foo_profile"] == read_profile_from_file(
+        "foo_profile",
+        profiles_file
+    )
+
+
+@pytest.fixture
+def write_profiles(tmp_path):
+    file = tmp_path / "modelmanager.ini"
+
+    def _write_profiles(token):
+        file.write_text(
+            f"[dev]\nurl = https://localhost\ntoken = {token}\n"
+        )
+        return str(file)
+    return _write_profiles
+
+
+@pytest.fixture
+def count_reads(monkeypatch):
+    reads = []
+    read_config = profile_module._read_config
+
+    def _read_config(file):
+        reads.append(file)
+        return read_config(file)
+    monkeypatch.setattr(profile_module, "_read_config", _read_config)
+    return reads
+
+
+def test_store_reads_file_once(write_profiles, count_reads):
+    file = write_profiles("token")
+    store = ProfileStore(check_interval=0)
+    profile = store.read_profile("dev", file)
+    assert profile == {
+        "url": "https://localhost",
+        "token": "token",
+        "auth_type": STANDALONE,
+        "download_path": None,
+    }
+    profile["token"] = "changed"
+    assert store.read_profile("dev", file)["token"] == "token"
+    assert store.read_profiles(file) == {
+        "dev": store.read_profile("dev", file)
+    }
+    assert len(count_reads) == 1
+
+
+def test_store_reads_changed_file(write_profiles, count_reads):
+    file = write_profiles("token")
+    store = ProfileStore(check_interval=0)
+    store.read_profile("dev", file)
+    write_profiles("new_token")
+    assert store.read_profile("dev", file)["token"] == "new_token"
+    assert len(count_reads) == 2
+
+
+def test_store_checks_file_every_interval(write_profiles, count_reads):
+    file = write_profiles("token")
+    store = ProfileStore(check_interval=60)
+    store.read_profile("dev", file)
+    write_profiles("new_token")
+    assert store.read_profile("dev", file)["token"] == "token"
+    store.clear()
+    assert store.read_profile("dev", file)["token"] == "new_token"
+    assert len(count_reads) == 2
+
+
+def test_store_read_invalid_profiles(profiles_file):
+    store = ProfileStore()
+    with pytest.raises(ProfileError):
+        store.read_profile("missing_profile", profiles_file)
+    with pytest.raises(ProfileValueRequired):
+        store.read_profile("no_url_profile", profiles_file)
+    with pytest.raises((ProfileError, ProfileValueRequired)):
+        store.read_profiles(profiles_file)
+    profiles = store.read_profiles(profiles_file, ignore_invalid=True)
+    assert profiles == read_profiles_from_file(
+        profiles_file,
+        ignore_invalid=True
+    )
+
+
+@pytest.mark.parametrize("f", [
+    "./profiles/duplicate_profiles.ini",
+    "./profiles/no_existing_file.ini"
+])
+def test_store_read_invalid_file(f, abs_path):
+    with pytest.raises(ProfileError):
+        ProfileStore().read_profile("profile", abs_path(f))
@@ -0,0 +1,116 @@
+import threading
+
+from devo_ml.modelmanager import get_models
+from devo_ml.modelmanager import create_client_from_token
+from devo_ml.modelmanager import create_client_from_profile
+from devo_ml.modelmanager.registry import ClientRegistry, default_registry
+from devo_ml.modelmanager.registry import close_clients, freeze
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Unhashable:
+    __hash__ = None  # type: ignore[assignment]
+
+
+def test_freeze_unhashable_values():
+    hook = Unhashable()
+    key = freeze({"timeout": 5, "hooks": [hook], "headers": {"a": "b"}})
+    assert hash(key)
+    assert key == freeze({"headers": {"a": "b"}, "timeout": 5,
+                          "hooks": [hook]})
+    assert key != freeze({"timeout": 5, "hooks": [Unhashable()],
+                          "headers": {"a": "b"}})
+
+
+def test_registry_reuses_clients():
+    registry = ClientRegistry()
+    client = registry.get("key", FakeClient)
+    assert registry.get("key", FakeClient) is client
+    assert registry.get("other", FakeClient) is not client
+    assert len(registry) == 2
+
+
+def test_registry_closes_least_recently_used_client():
+    registry = ClientRegistry(max_clients=2)
+    first = registry.get("first", FakeClient)
+    second = registry.get("second", FakeClient)
+    registry.get("first", FakeClient)
+    registry.get("third", FakeClient)
+    assert "second" not in registry
+    assert second.closed
+    assert not first.closed
+
+
+def test_registry_close():
+    registry = ClientRegistry()
+    clients = [registry.get(i, FakeClient) for i in range(3)]
+    registry.remove(0)
+    assert clients[0].closed
+    registry.close()
+    assert len(registry) == 0
+    assert all(client.closed for client in clients)
+
+
+def test_registry_creates_one_client_between_threads():
+    registry = ClientRegistry()
+    clients = []
+
+    def get():
+        clients.append(registry.get("key", FakeClient))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_shared_clients_from_token():
+    client = create_client_from_token("http://localhost", "token", shared=True)
+    assert create_client_from_token(
+        "http://localhost",
+        "token",
+        shared=True
+    ) is client
+    assert create_client_from_token(
+        "http://localhost",
+        "token",
+        shared=True,
+        timeout=5
+    ) is not client
+    assert create_client_from_token("http://localhost", "token") is not client
+    close_clients()
+    assert len(default_registry) == 0
+
+
+def test_shared_clients_from_profile(abs_path):
+    file = abs_path("./profiles/profiles.ini")
+    client = create_client_from_profile("foo_profile", file, shared=True)
+    assert create_client_from_profile(
+        "foo_profile",
+        file,
+        shared=True
+    ) is client
+    assert create_client_from_profile(
+        "bar_profile",
+        file,
+        shared=True
+    ) is not client
+
+
+def test_functions_facade_reuses_client(mock_get_models):
+    mock_get_models(response=[])
+    get_models("http://localhost", "token")
+    assert len(default_registry) == 1
+    get_models("http://localhost", "token")
+    assert len(default_registry) == 1
+    get_models("http://localhost", "other_token")
+    assert len(default_registry) == 2
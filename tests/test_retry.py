@@ -0,0 +1,99 @@
+import pytest
+import requests
+
+from devo_ml.modelmanager.api import Api
+from devo_ml.modelmanager.error import ModelManagerError
+from devo_ml.modelmanager.retry import RetryPolicy
+
+
+class RecordingRetryPolicy(RetryPolicy):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.delays = []
+
+    def sleep(self, seconds):
+        self.delays.append(seconds)
+
+
+def test_retries_transient_status(requests_mock):
+    requests_mock.get("http://localhost/models", [
+        {"status_code": 503},
+        {"status_code": 502},
+        {"json": []},
+    ])
+    retry = RecordingRetryPolicy(max_attempts=3, backoff_factor=1)
+    assert Api(retry=retry).get("http://localhost/models") == []
+    assert requests_mock.call_count == 3
+    assert len(retry.delays) == 2
+    assert 0 <= retry.delays[0] <= 1
+    assert 0 <= retry.delays[1] <= 2
+
+
+def test_gives_up_after_max_attempts(requests_mock):
+    requests_mock.get("http://localhost/models", status_code=503)
+    retry = RecordingRetryPolicy(max_attempts=2)
+    with pytest.raises(ModelManagerError):
+        Api(retry=retry).get("http://localhost/models")
+    assert requests_mock.call_count == 2
+
+
+def test_retries_connection_errors(requests_mock):
+    requests_mock.get("http://localhost/models", [
+        {"exc": requests.exceptions.ConnectionError},
+        {"json": []},
+    ])
+    retry = RecordingRetryPolicy()
+    assert Api(retry=retry).get("http://localhost/models") == []
+    assert requests_mock.call_count == 2
+
+
+def test_honors_retry_after(requests_mock):
+    requests_mock.get("http://localhost/models", [
+        {"status_code": 429, "headers": {"Retry-After": "7"}},
+        {"json": []},
+    ])
+    retry = RecordingRetryPolicy(max_backoff=10)
+    assert Api(retry=retry).get("http://localhost/models") == []
+    assert retry.delays == [7]
+
+
+def test_does_not_wait_longer_than_max_backoff(requests_mock):
+    requests_mock.get(
+        "http://localhost/models",
+        status_code=503,
+        headers={"Retry-After": "120"}
+    )
+    retry = RecordingRetryPolicy(max_backoff=10)
+    with pytest.raises(ModelManagerError):
+        Api(retry=retry).get("http://localhost/models")
+    assert requests_mock.call_count == 1
+
+
+def test_retries_non_idempotent_calls_only_if_marked(requests_mock):
+    requests_mock.post("http://localhost/models", [
+        {"status_code": 503},
+        {"json": {}},
+    ])
+    api = Api(retry=RecordingRetryPolicy())
+    with pytest.raises(ModelManagerError):
+        api.post("http://localhost/models")
+    assert api.post("http://localhost/models", idempotent=True) == {}
+
+
+def test_does_not_retry_file_like_bodies(requests_mock):
+    class Body:
+        def read(self, size=-1):
+            return b""
+
+    requests_mock.put("http://localhost/models", status_code=503)
+    api = Api(retry=RecordingRetryPolicy())
+    with pytest.raises(ModelManagerError):
+        api.put("http://localhost/models", data=Body())
+    assert requests_mock.call_count == 1
+
+
+def test_does_not_retry_without_policy(requests_mock):
+    requests_mock.get("http://localhost/models", status_code=503)
+    with pytest.raises(ModelManagerError):
+        Api().get("http://localhost/models")
+    assert requests_mock.call_count == 1
@@ -0,0 +1,58 @@
+import pytest
+
+from devo_ml.modelmanager import engines
+from devo_ml.modelmanager.summary import ModelSummary, compile_fields
+from devo_ml.modelmanager.summary import project_model
+
+
+MODEL = {
+    "id": 35,
+    "name": "pokemon",
+    "engine": engines.ONNX,
+    "category": "Regression",
+    "fields": [{"name": "Age", "type": "float8"}],
+    "clusters": [],
+    "image": {"id": 7, "size": 1024, "fileName": "pokemon.onnx"},
+}
+
+
+@pytest.mark.parametrize("fields,expected", [
+    (["name"], {"name": None}),
+    (["image.id", "image.size"], {"image": {"id": None, "size": None}}),
+    (["image", "image.id"], {"image": None}),
+    (["image.id", "image"], {"image": None}),
+])
+def test_compile_fields(fields, expected):
+    assert compile_fields(fields) == expected
+
+
+def test_project_model():
+    model = project_model(
+        MODEL,
+        ["name", "image.size", "fields.name", "missing"]
+    )
+    assert model == {
+        "name": "pokemon",
+        "image": {"size": 1024},
+        "fields": [{"name": "Age"}],
+    }
+
+
+def test_summary_from_model():
+    summary = ModelSummary.from_model(MODEL)
+    assert summary.to_dict() == {
+        "id": 35,
+        "name": "pokemon",
+        "engine": engines.ONNX,
+        "category": "Regression",
+        "image_id": 7,
+        "image_size": 1024,
+    }
+    assert summary == ModelSummary.from_model(dict(MODEL))
+    assert repr(summary) == "ModelSummary(name='pokemon', engine='ONNX')"
+
+
+def test_summary_from_model_without_image():
+    summary = ModelSummary.from_model({"name": "foo"})
+    assert summary.image_id is None
+    assert summary.engine is None
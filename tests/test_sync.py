@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from devo_ml.modelmanager import Client, engines
+from devo_ml.modelmanager.auth import HttpDevoStandAloneTokenAuth
+from devo_ml.modelmanager.error import ModelNotFound
+
+
+@pytest.fixture
+def sync_client(stub_server):
+    stub_server.add_model("foo", engines.ONNX, b"foo")
+    stub_server.add_model("bar", engines.H2O, b"bar")
+    return Client(stub_server.url, HttpDevoStandAloneTokenAuth("token"))
+
+
+def test_sync_to(sync_client, stub_server, tmp_path, read_file):
+    report = sync_client.sync_to(tmp_path / "mirror")
+    assert report["foo"] == {
+        "name": "foo",
+        "file": str(tmp_path / "mirror" / "foo.onnx"),
+        "status": "downloaded",
+    }
+    assert report["bar"]["status"] == "downloaded"
+    assert read_file(report["foo"]["file"]) == b"foo"
+    assert read_file(report["bar"]["file"]) == b"bar"
+    assert sorted(os.listdir(tmp_path / "mirror")) == [
+        ".modelmanager", "bar.zip", "foo.onnx"
+    ]
+
+
+def test_sync_to_downloads_only_changes(
+    sync_client,
+    stub_server,
+    tmp_path,
+    read_file,
+    stub_downloads
+):
+    sync_client.sync_to(tmp_path)
+    stub_server.requests.clear()
+    report = sync_client.sync_to(tmp_path)
+    assert {r["status"] for r in report.values()} == {"unchanged"}
+    assert stub_server.requests == [
+        ("GET", stub_server.requests[0][1])
+    ]
+    stub_server.add_model("foo", engines.ONNX, b"new foo")
+    stub_server.models["foo"]["image"]["id"] = 99
+    os.remove(tmp_path / "bar.zip")
+    report = sync_client.sync_to(tmp_path)
+    assert report["foo"]["status"] == "downloaded"
+    assert report["bar"]["status"] == "downloaded"
+    assert read_file(tmp_path / "foo.onnx") == b"new foo"
+    assert len(stub_downloads()) == 2
+
+
+def test_sync_to_some_models(sync_client, stub_server, tmp_path):
+    report = sync_client.sync_to(tmp_path, names=["foo", "missing"])
+    assert report["foo"]["status"] == "downloaded"
+    assert isinstance(report["missing"], ModelNotFound)
+    assert "bar" not in report
+    assert not (tmp_path / "bar.zip").exists()
+
+
+def test_sync_to_prune(sync_client, stub_server, tmp_path):
+    sync_client.sync_to(tmp_path)
+    del stub_server.models["bar"]
+    report = sync_client.sync_to(tmp_path)
+    assert "bar" not in report
+    assert (tmp_path / "bar.zip").exists()
+    report = sync_client.sync_to(tmp_path, prune=True)
+    assert report["bar"] == {
+        "name": "bar",
+        "file": str(tmp_path / "bar.zip"),
+        "status": "removed",
+    }
+    assert not (tmp_path / "bar.zip").exists()
+    report = sync_client.sync_to(tmp_path, names=["bar"], prune=True)
+    assert report["foo"]["status"] == "removed"
+    assert isinstance(report["bar"], ModelNotFound)
+
+
+def test_sync_to_engine_change(sync_client, stub_server, tmp_path, read_file):
+    sync_client.sync_to(tmp_path)
+    stub_server.add_model("foo", engines.CATBOOST, b"catboost")
+    stub_server.models["foo"]["image"]["id"] = 99
+    sync_client.sync_to(tmp_path)
+    assert not (tmp_path / "foo.onnx").exists()
+    assert read_file(tmp_path / "foo.cmb") == b"catboost"
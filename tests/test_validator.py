@@ -0,0 +1,134 @@
+import json
+import zipfile
+
+import pytest
+
+from devo_ml.modelmanager import engines
+from devo_ml.modelmanager.error import InvalidModelFile
+from devo_ml.modelmanager.validator import is_valid_url
+from devo_ml.modelmanager.validator import validate_catboost_file
+from devo_ml.modelmanager.validator import validate_json_file
+from devo_ml.modelmanager.validator import validate_onnx_file
+from devo_ml.modelmanager.validator import validate_zip_file
+
+
+ONNX_MODEL = b"\x08\x08" + b"\x12\x04test" + b"\x3a\x03abc" + b"\x42\x00"
+
+
+@pytest.fixture
+def write(tmp_path):
+    def _write(content, name="model"):
+        file = tmp_path / name
+        file.write_bytes(content)
+        return str(file)
+    return _write
+
+
+def test_is_valid_url():
+    assert is_valid_url("http://localhost:8080/models")
+    assert is_valid_url("https://ml.devo.com")
+    assert not is_valid_url("localhost")
+    assert not is_valid_url("http://local host")
+
+
+def test_validate_onnx_file(write):
+    validate_onnx_file(write(ONNX_MODEL))
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"\x08\x08",
+    ONNX_MODEL[:-3],
+    b"PK\x03\x04" + ONNX_MODEL,
+    b"\x08" + b"\xff" * 12,
+])
+def test_validate_invalid_onnx_file(write, content):
+    with pytest.raises(InvalidModelFile):
+        validate_onnx_file(write(content))
+
+
+def test_validate_zip_file(write, abs_path):
+    validate_zip_file(abs_path("data/test.zip"))
+    with open(abs_path("data/test.zip"), "rb") as f:
+        content = f.read()
+    with pytest.raises(InvalidModelFile):
+        validate_zip_file(write(content[:len(content) // 2]))
+    with pytest.raises(InvalidModelFile):
+        validate_zip_file(write(b"not a zip"))
+
+
+def test_validate_empty_zip_file(tmp_path):
+    with zipfile.ZipFile(tmp_path / "empty.zip", "w"):
+        pass
+    with pytest.raises(InvalidModelFile):
+        validate_zip_file(str(tmp_path / "empty.zip"))
+
+
+@pytest.mark.parametrize("content", [
+    json.dumps({"a": [1, 2.5e3, None, True], "b": "x]}\"\\\\\\u00e9"}),
+    "  [ ]\n",
+    json.dumps([{"nested": [[{}]] * 1000}]),
+])
+def test_validate_json_file(write, monkeypatch, content):
+    monkeypatch.setattr(
+        "devo_ml.modelmanager.validator.VALIDATION_CHUNK_SIZE",
+        7
+    )
+    validate_json_file(write(content.encode()))
+
+
+@pytest.mark.parametrize("content", [
+    "",
+    "12",
+    '"text"',
+    "<html></html>",
+    '{"a": [1, 2}',
+    '{"a": "b}',
+    '{"a": 1} {}',
+    '{"a": 1',
+    '{"a": <1>}',
+])
+def test_validate_invalid_json_file(write, monkeypatch, content):
+    monkeypatch.setattr(
+        "devo_ml.modelmanager.validator.VALIDATION_CHUNK_SIZE",
+        3
+    )
+    with pytest.raises(InvalidModelFile):
+        validate_json_file(write(content.encode()))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 64])
+def test_validate_json_file_with_long_strings(write, monkeypatch, chunk_size):
+    monkeypatch.setattr(
+        "devo_ml.modelmanager.validator.VALIDATION_CHUNK_SIZE",
+        chunk_size
+    )
+    text = ("abc\\\"]}" * 200) + "x" * 1000
+    content = json.dumps({"weights": text, "tail": [text, {"k": "\\"}]})
+    validate_json_file(write(content.encode()))
+    with pytest.raises(InvalidModelFile):
+        validate_json_file(write(content[:-len(text)].encode()))
+
+
+def test_validate_catboost_file(write):
+    validate_catboost_file(write(b"CBM1" + b"\x00" * 16))
+    with pytest.raises(InvalidModelFile):
+        validate_catboost_file(write(b"CBM"))
+
+
+def test_validate_model_file_by_engine(write, abs_path):
+    engines.validate_model_file(engines.H2O, abs_path("data/test.zip"))
+    engines.validate_model_file(engines.MLSTATS, write(b"anything"))
+    engines.validate_model_file("UNKNOWN", write(b"anything"))
+    with pytest.raises(InvalidModelFile):
+        engines.validate_model_file(engines.ONNX, abs_path("data/test.zip"))
+    assert engines.get_file_validator(engines.MLSTATS) is None
+
+
+def test_validate_zip_or_json_model(write, abs_path):
+    engines.validate_model_file(engines.IDA, abs_path("data/test.zip"))
+    engines.validate_model_file(engines.DT, write(b'{"tree": []}'))
+    with pytest.raises(InvalidModelFile):
+        engines.validate_model_file(engines.IDA, write(b"PK broken"))
+    with pytest.raises(InvalidModelFile):
+        engines.validate_model_file(engines.DT, write(b"{"))